@@ -1,221 +1,441 @@
-from flask import Flask, jsonify, request
-import json
+from flask import Flask, Response, jsonify, request, stream_with_context
 from flask_cors import CORS
-import math
-from shapely.geometry import shape, Point
 from datetime import datetime
+import hmac
+import importlib
+import logging
+import math
 import os
+import threading
+import time
+import uuid
+import numpy as np
+from biome_index import TESTS_BUCKETS, BiomeIndex
+import biome_risks
+from geo_store import GeoResultStore
+from geo_cache import QuantizedLRUCache
+from custom_asteroid_store import CustomAsteroidStore
+from simulation_store import SimulationJobStore
+import impact_physics
+import scenarios
+import simulation
+import footprint
+from asteroid_catalog import AsteroidCatalog, SORT_KEYS, parse_date
+from snapshot import file_hash, load_biomes_cached, load_catalog_cached, load_lod_cached
+from biome_raster import load_raster_for
+from response_cache import CachedBody, ResponseCache, cached_response
+import json_stream
+import observability
+from data_reload import (RELOAD_TARGETS, BiomeData, CatalogData, DataReloader, ReloadChannel, build_snapshots,
+                         check_targets, file_signature)
 
 app = Flask(__name__)
+# orjson для jsonify, если установлен (см. json_stream.py)
+app.json = json_stream.FastJSONProvider(app)
 CORS(app, origins=["http://localhost:3000", "http://127.0.0.1:3000"])
 
+# Файлы с исходными данными
+BIOMES_FILE = "biomes.geojson"
+ASTEROIDS_FILE = "asteroids.json"
+# Готовый колоночный каталог (python neows_ingest.py <выгрузки NeoWs>), имеет приоритет над ASTEROIDS_FILE
+ASTEROID_CATALOG_DIR = "nasa_catalog"
+# Необязательная растровая таблица биомов (python biome_raster.py build)
+BIOME_RASTER_FILE = "biome_raster.npy"
+# Допуск упрощённых контуров биомов в градусах (None — только точные полигоны)
+BIOME_LOD_TOLERANCE = 0.01
+
 # Файлы для хранения данных
+GEO_RESULTS_DB = "geo_results.db"
+# Шаг сетки теплокарты /api/geo/stats в градусах (при смене статистика пересчитывается по истории)
+GEO_STATS_CELL_DEG = 1.0
+# Старый формат истории (JSON-массив), переносится в GEO_RESULTS_DB при первом запуске
 GEO_RESULTS_FILE = "geo_result.json"
+CUSTOM_ASTEROIDS_DB = "custom_asteroids.db"
+# Старый формат кастомных астероидов, переносится в CUSTOM_ASTEROIDS_DB при первом запуске
 CUSTOM_ASTEROIDS_FILE = "custom_asteroids.json"
+# Состояние фоновых симуляций /api/simulations (общее для всех процессов serve.py)
+SIMULATIONS_DB = "simulations.db"
+# Одновременных симуляций на процесс (сверх — 429), процессов общего пула симуляций
+# (None — по числу CPU) и сколько секунд хранить завершённые задачи
+MAX_SIMULATION_JOBS = 2
+SIMULATION_POOL_WORKERS = None
+SIMULATION_JOB_TTL = 3600
 
-# Обновленный словарь климатических рисков
-BIOME_RISKS = {
-    # Тропические и субтропические леса
-    "1": {
-        "risk_level": "high",
-        "description": "Удар усугубит потерю биоразнообразия, засуху и сдвиги в растительности. Глобальное охлаждение от пыли может вызвать массовую гибель растений.",
-        "impact_factors": ["biodiversity loss", "drought", "ecosystem collapse", "deforestation"]
-    },
-    "2": {
-        "risk_level": "medium",
-        "description": "Сухие лиственные леса уязвимы к пожарам и эрозии почвы. Удар может вызвать опустынивание и потерю плодородного слоя.",
-        "impact_factors": ["fires", "soil erosion", "desertification", "habitat loss"]
-    },
-    "3": {
-        "risk_level": "medium",
-        "description": "Хвойные леса чувствительны к температурным изменениям и пожарам. Удар может нарушить водный баланс региона.",
-        "impact_factors": ["temperature changes", "fires", "water cycle disruption"]
-    },
-    # Умеренные леса
-    "4": {
-        "risk_level": "medium",
-        "description": "Увеличение вредителей и болезней, изменения в осадках. Астероидный удар добавит пожары и эрозию почвы.",
-        "impact_factors": ["pests and diseases", "fires", "soil erosion", "biodiversity loss"]
-    },
-    "5": {
-        "risk_level": "low",
-        "description": "Относительно устойчивые экосистемы. Основные риски - локальные пожары и изменения микроклимата.",
-        "impact_factors": ["local fires", "microclimate changes"]
-    },
-    # Засушливые регионы
-    "6": {
-        "risk_level": "low",
-        "description": "Пустынные экосистемы более устойчивы к ударам. Основной риск - долгосрочные пылевые бури.",
-        "impact_factors": ["dust storms", "temperature extremes"]
-    },
-    "7": {
-        "risk_level": "medium",
-        "description": "Полупустыни уязвимы к опустыниванию. Удар может разрушить хрупкий почвенный покров.",
-        "impact_factors": ["desertification", "soil degradation", "dust storms"]
-    },
-    # Затопленные луга
-    "8": {
-        "risk_level": "high",
-        "description": "Затопленные экосистемы критически важны для водного баланса. Удар может вызвать цунами и засоление почв.",
-        "impact_factors": ["tsunamis", "soil salinization", "wetland destruction"]
-    },
-    "9": {
-        "risk_level": "medium",
-        "description": "Речные экосистемы чувствительны к изменениям гидрологического режима.",
-        "impact_factors": ["flooding", "river ecosystem disruption"]
-    },
-    # Горные биомы
-    "10": {
-        "risk_level": "high",
-        "description": "Горные экосистемы уязвимы к оползням и изменениям ледникового покрова.",
-        "impact_factors": ["landslides", "glacial melt", "avalanches"]
-    },
-    # Полярные регионы
-    "11": {
-        "risk_level": "critical",
-        "description": "Таяние permafrost от пожаров и потепления, высвобождение метана. Удар ускорит климатические изменения.",
-        "impact_factors": ["permafrost melt", "methane release", "sea level rise", "global warming"]
-    },
-    "12": {
-        "risk_level": "high",
-        "description": "Тундровые экосистемы крайне чувствительны. Удар может вызвать необратимые изменения.",
-        "impact_factors": ["permafrost degradation", "ecosystem collapse", "arctic amplification"]
-    },
-    # Средиземноморские регионы
-    "13": {
-        "risk_level": "medium",
-        "description": "Пожароопасные экосистемы. Удар увеличит риск масштабных лесных пожаров.",
-        "impact_factors": ["wildfires", "soil erosion", "biodiversity loss"]
-    },
-    # Океанические зоны
-    "14": {
-        "risk_level": "high",
-        "description": "Мангровые леса критически важны для береговой защиты. Удар может вызвать цунами и разрушение экосистемы.",
-        "impact_factors": ["tsunamis", "coastal erosion", "ecosystem collapse"]
-    },
-    "99": {
-        "risk_level": "medium",
-        "description": "Океанические экосистемы. Риск цунами, изменения кислотности океана, нарушение морских пищевых цепей.",
-        "impact_factors": ["tsunamis", "ocean acidification", "marine ecosystem disruption"]
-    },
-    # Сельскохозяйственные земли
-    "15": {
-        "risk_level": "high",
-        "description": "Сельскохозяйственные земли критически важны для продовольственной безопасности. Удар может вызвать глобальный продовольственный кризис.",
-        "impact_factors": ["food security crisis", "soil contamination", "crop failure"]
-    },
-    # Городские территории
-    "16": {
-        "risk_level": "critical",
-        "description": "Удар по городской территории вызовет массовые разрушения, пожары и гуманитарный кризис.",
-        "impact_factors": ["mass destruction", "fires", "humanitarian crisis", "infrastructure collapse"]
-    },
-    "Unknown": {
-        "risk_level": "unknown",
-        "description": "Нет данных о рисках для этого типа биома.",
-        "impact_factors": []
-    }
-}
-
-# Загружаем данные астероидов NASA
-try:
-    with open("asteroids.json", "r") as f:
-        asteroids_data = json.load(f)
-except FileNotFoundError:
-    print("Warning: asteroids.json not found, using sample data")
-    asteroids_data = [
-        {
-            "name": "Sample Asteroid",
-            "date": "2024-01-01",
-            "hazardous": False,
-            "estimated_diameter_m": 100,
-            "velocity_km_s": 15,
-            "miss_distance_km": 5000000
-        }
+# Кэш /geo: точность округления координат (знаков после запятой, None — без кэша),
+# размер и время жизни записи в секундах
+GEO_CACHE_PRECISION = 4
+GEO_CACHE_MAX_ENTRIES = 50_000
+GEO_CACHE_TTL = 3600
+
+# Размер страницы /api/asteroids по умолчанию и максимальный
+DEFAULT_ASTEROID_PAGE = 100
+MAX_ASTEROID_PAGE = 1000
+
+# Форматы больших списков: json — один документ (как раньше),
+# stream — тот же документ по частям, ndjson — один объект на строку
+LIST_FORMATS = ("json", "stream", "ndjson")
+
+# Максимальное число точек в одном запросе /api/geo/batch
+MAX_GEO_BATCH_POINTS = 100_000
+
+# Максимальный размер сетки в /api/scenarios/sweep
+MAX_SWEEP_POINTS = 10_000_000
+
+# Логирование: уровень (DEBUG включает подробный лог /geo) и формат (text или json)
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "text")
+# Профилирование: запросы дольше PROFILE_SLOW_MS мс сохраняют вывод cProfile в PROFILE_DIR
+# (не задано — профилирование выключено, у каждого запроса с ним заметные накладные расходы)
+PROFILE_SLOW_MS = float(os.environ["PROFILE_SLOW_MS"]) if os.environ.get("PROFILE_SLOW_MS") else None
+PROFILE_DIR = "profiles"
+# Горячая перезагрузка данных: опрос исходных файлов раз в DATA_WATCH_INTERVAL секунд
+# (не задано — только POST /api/admin/reload или SIGHUP в serve.py);
+# /api/admin/* и POST /api/geo/stats/rebuild требуют заголовок X-Admin-Token, равный
+# ADMIN_TOKEN; без ADMIN_TOKEN они выключены (403)
+DATA_WATCH_INTERVAL = float(os.environ["DATA_WATCH_INTERVAL"]) if os.environ.get("DATA_WATCH_INTERVAL") else None
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
+# PID мастера serve.py и файл запросов перезагрузки (выставляет сам serve.py), см. reload_data_endpoint
+SERVE_MASTER_ENV = "ASTEROID_API_MASTER"
+SERVE_RELOAD_ENV = "ASTEROID_API_RELOAD_FILE"
+
+
+observability.setup_logging(LOG_LEVEL, LOG_FORMAT)
+log = logging.getLogger(__name__)
+
+# Метрики для /metrics (см. observability.py и collect_app_metrics)
+metrics = observability.Registry()
+STARTUP_SECONDS = metrics.gauge("startup_load_seconds", "Время загрузки данных при старте", ("stage",))
+STORE_SECONDS = metrics.histogram("store_operation_seconds", "Время операций хранилищ", ("store", "operation"))
+observability.instrument(
+    app, metrics,
+    observability.SlowRequestProfiler(PROFILE_SLOW_MS, PROFILE_DIR) if PROFILE_SLOW_MS is not None else None,
+)
+
+
+def catalog_source():
+    # Отпечаток исходника каталога NASA (None, если исходников нет)
+    if os.path.isdir(ASTEROID_CATALOG_DIR):
+        return ("dir", file_signature(os.path.join(ASTEROID_CATALOG_DIR, "meta.json")))
+    try:
+        return ("json", file_hash(ASTEROIDS_FILE))
+    except FileNotFoundError:
+        return None
+
+
+def load_catalog_data(version):
+    # Каталог астероидов NASA: готовый каталог из neows_ingest.py
+    # или asteroids.json через снапшот (см. snapshot.py)
+    source = catalog_source()
+    try:
+        catalog = AsteroidCatalog.load(ASTEROID_CATALOG_DIR) if os.path.isdir(ASTEROID_CATALOG_DIR) else None
+        if catalog is None:
+            catalog = load_catalog_cached(ASTEROIDS_FILE)
+    except FileNotFoundError:
+        log.warning("asteroids.json not found, using sample data")
+        catalog = AsteroidCatalog.from_records([
+            {
+                "name": "Sample Asteroid",
+                "date": "2024-01-01",
+                "hazardous": False,
+                "estimated_diameter_m": 100,
+                "velocity_km_s": 15,
+                "miss_distance_km": 5000000
+            }
+        ])
+    return CatalogData(catalog, source, version)
+
+
+def biome_source():
+    # Отпечаток исходников биомов: sha256 biomes.geojson и сигнатура растра;
+    # FileNotFoundError, если нет biomes.geojson
+    return (file_hash(BIOMES_FILE), file_signature(BIOME_RASTER_FILE))
+
+
+def load_biome_data(version, risks):
+    # Биомы из GeoJSON (через снапшот) и пространственный индекс к ним
+    # (STRtree + prepared-геометрии, растр при наличии) для find_biome
+    try:
+        source = biome_source()
+        biomes = load_biomes_cached(BIOMES_FILE, source_hash=source[0])
+        raster = load_raster_for(BIOME_RASTER_FILE, source[0])
+        lod = None
+        if BIOME_LOD_TOLERANCE and biomes:
+            lod = load_lod_cached(BIOMES_FILE, biomes, BIOME_LOD_TOLERANCE, source_hash=source[0])
+    except FileNotFoundError:
+        log.warning("biomes.geojson not found")
+        source, biomes, raster, lod = None, [], None, None
+    return BiomeData(biomes, BiomeIndex(biomes, raster=raster, lod=lod), risks, source, version)
+
+
+# Текущие снимки данных (см. data_reload.py). Обработчик читает ссылку на снимок
+# один раз за запрос; версия снимка инвалидирует geo_cache и catalog_cache
+started = time.perf_counter()
+catalog_data = load_catalog_data(0)
+STARTUP_SECONDS.set(time.perf_counter() - started, stage="asteroid_catalog")
+
+started = time.perf_counter()
+biome_data = load_biome_data(0, biome_risks.BIOME_RISKS)
+STARTUP_SECONDS.set(time.perf_counter() - started, stage="biomes")
+
+# Кэш find_biome по округлённым координатам для /geo
+geo_cache = QuantizedLRUCache(GEO_CACHE_PRECISION, GEO_CACHE_MAX_ENTRIES, GEO_CACHE_TTL) if GEO_CACHE_PRECISION is not None else None
+
+# История результатов /geo (append-only журнал в SQLite)
+geo_store = GeoResultStore(GEO_RESULTS_DB, legacy_json_path=GEO_RESULTS_FILE, cell_deg=GEO_STATS_CELL_DEG)
+
+# Кастомные астероиды: в памяти с индексом по id, изменения пишутся в SQLite
+custom_store = CustomAsteroidStore(CUSTOM_ASTEROIDS_DB, legacy_json_path=CUSTOM_ASTEROIDS_FILE)
+
+# Фоновые задачи Монте-Карло симуляции: состояние в SQLite, блоки считает общий пул процессов
+simulation_store = SimulationJobStore(SIMULATIONS_DB)
+simulation_pool = simulation.SimulationPool(SIMULATION_POOL_WORKERS)
+simulation_slots = threading.BoundedSemaphore(MAX_SIMULATION_JOBS)
+
+# Готовые ответы каталога (сериализованные и сжатые), см. get_all / get_all_asteroids_with_custom
+catalog_cache = ResponseCache()
+
+def collect_app_metrics():
+    # Метрики, которые считают сами модули: поиск биомов, кэши, объём данных.
+    # Счётчики поиска биомов принадлежат индексу и начинаются с нуля после перезагрузки биомов
+    biomes, catalog = biome_data, catalog_data
+    index_stats = biomes.index.stats()
+    cache_stats = catalog_cache.stats()
+    families = [
+        ("biome_lookups_total", "counter", "Поисков биома по точке", [("biome_lookups_total", {}, index_stats["lookups"])]),
+        ("biome_raster_hits_total", "counter", "Поисков, решённых растровой таблицей",
+         [("biome_raster_hits_total", {}, index_stats["raster_hits"])]),
+        ("biome_polygon_tests_total", "counter", "Проверенных полигонов-кандидатов",
+         [("biome_polygon_tests_total", {}, index_stats["polygon_tests"])]),
+        ("biome_polygon_tests_per_lookup", "histogram", "Проверенных полигонов на один поиск",
+         observability.histogram_samples("biome_polygon_tests_per_lookup", {}, TESTS_BUCKETS,
+                                         index_stats["tests_histogram"], index_stats["polygon_tests"])),
+        ("catalog_cache_requests_total", "counter", "Обращений к кэшу готовых ответов каталога", [
+            ("catalog_cache_requests_total", {"result": "hit"}, cache_stats["hits"]),
+            ("catalog_cache_requests_total", {"result": "miss"}, cache_stats["misses"]),
+        ]),
+        ("catalog_cache_entries", "gauge", "Записей в кэше ответов каталога",
+         [("catalog_cache_entries", {}, cache_stats["entries"])]),
+        ("data_records", "gauge", "Объём загруженных данных", [
+            ("data_records", {"dataset": "nasa_asteroids"}, len(catalog.catalog)),
+            ("data_records", {"dataset": "custom_asteroids"}, len(custom_store)),
+            ("data_records", {"dataset": "biomes"}, len(biomes.biomes)),
+        ]),
+        ("data_version", "gauge", "Версия загруженных данных (растёт при перезагрузке)", [
+            ("data_version", {"dataset": "nasa_asteroids"}, catalog.version),
+            ("data_version", {"dataset": "biomes"}, biomes.version),
+        ]),
     ]
+    if geo_cache is not None:
+        geo_stats = geo_cache.stats()
+        families += [
+            ("geo_cache_requests_total", "counter", "Обращений к кэшу /geo", [
+                ("geo_cache_requests_total", {"result": "hit"}, geo_stats["hits"]),
+                ("geo_cache_requests_total", {"result": "miss"}, geo_stats["misses"]),
+            ]),
+            ("geo_cache_removals_total", "counter", "Вытесненных и устаревших записей кэша /geo", [
+                ("geo_cache_removals_total", {"reason": "evicted"}, geo_stats["evictions"]),
+                ("geo_cache_removals_total", {"reason": "expired"}, geo_stats["expired"]),
+            ]),
+            ("geo_cache_invalidations_total", "counter", "Сбросов кэша /geo при смене версии биомов",
+             [("geo_cache_invalidations_total", {}, geo_stats["invalidations"])]),
+            ("geo_cache_entries", "gauge", "Записей в кэше /geo", [("geo_cache_entries", {}, geo_stats["size"])]),
+        ]
+    return families
 
-# Загружаем GeoJSON с биомами
-try:
-    with open("biomes.geojson", "r", encoding="utf-8") as f:
-        biome_data = json.load(f)
-    
-    biomes = []
-    for feature in biome_data["features"]:
-        geom = shape(feature["geometry"])
-        eco_name = feature["properties"].get("ECO_NAME", "Unknown")
-        biome_code = feature["properties"].get("BIOME", "Unknown")
-        # Преобразуем biome_code в строку без десятичной части
-        try:
-            if isinstance(biome_code, (int, float)):
-                biome_code = str(int(biome_code))
-            else:
-                biome_code = str(biome_code).strip() if biome_code is not None else "Unknown"
-        except Exception as e:
-            print(f"❌ Ошибка преобразования BIOME для {eco_name}: {e}")
-            biome_code = "Unknown"
-        realm = feature["properties"].get("REALM", "Unknown")
-        biomes.append((geom, eco_name, biome_code, realm))
-except FileNotFoundError:
-    print("Warning: biomes.geojson not found")
-    biomes = []
+metrics.register_collector(collect_app_metrics)
 
-# Функции для работы с файлами
-def load_geo_results():
-    if os.path.exists(GEO_RESULTS_FILE):
-        try:
-            with open(GEO_RESULTS_FILE, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                if isinstance(data, list):
-                    return data
-                elif isinstance(data, dict):
-                    return [data]
-                else:
-                    return []
-        except (json.JSONDecodeError, Exception) as e:
-            print(f"Warning: Could not load {GEO_RESULTS_FILE}: {e}")
-            return []
-    return []
+RELOAD_SECONDS = metrics.histogram("data_reload_seconds", "Время перезагрузки данных", ("target",),
+                                   buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120))
+RELOADS_TOTAL = metrics.counter("data_reloads_total", "Перезагрузок данных", ("result",))
+
+def reload_data(targets, force=False):
+    # Выполняется в фоновом потоке DataReloader. Новый снимок строится целиком
+    # (разбор исходников — в отдельном процессе snapshot.py, прогрев индексов и готовых
+    # ответов каталога — здесь) и подменяет текущий одним присваиванием. Неизменившиеся
+    # исходники пропускаются, если не задан force
+    global biome_data, catalog_data
+    timings = {}
+    try:
+        if "biomes" in targets or "risks" in targets:
+            started = time.perf_counter()
+            current = biome_data
+            risks = importlib.reload(biome_risks).BIOME_RISKS if "risks" in targets else current.risks
+            source = biome_source() if os.path.exists(BIOMES_FILE) else None
+            rebuild = "biomes" in targets and (force or source != current.source)
+            if rebuild:
+                if source is not None:
+                    build_snapshots(biomes=BIOMES_FILE, lod=BIOME_LOD_TOLERANCE)
+                new = load_biome_data(current.version + 1, risks)
+                new.index.warm()
+                biome_data = new
+                timings["biomes"] = time.perf_counter() - started
+            elif risks != current.risks:
+                # Только таблица рисков: геометрия и индекс остаются прежними
+                biome_data = BiomeData(current.biomes, current.index, risks, current.source, current.version + 1)
+                timings["risks"] = time.perf_counter() - started
+
+        if "catalog" in targets:
+            started = time.perf_counter()
+            current = catalog_data
+            source = catalog_source()
+            if force or source != current.source:
+                if source is not None and source[0] == "json":
+                    build_snapshots(asteroids=ASTEROIDS_FILE)
+                new = load_catalog_data(current.version + 1)
+                warm_catalog_cache(new)
+                catalog_data = new
+                timings["catalog"] = time.perf_counter() - started
+    except Exception:
+        RELOADS_TOTAL.inc(result="failed")
+        raise
+    for target, seconds in timings.items():
+        RELOAD_SECONDS.observe(seconds, target=target)
+    RELOADS_TOTAL.inc(result="ok" if timings else "unchanged")
+    return timings
+
+def warm_catalog_cache(current):
+    # Готовые ответы каталога, которые уже запрашивались, строятся для новой версии
+    # до подмены снимка: первый запрос после перезагрузки не платит за сериализацию
+    keys = catalog_cache.keys()
+    if "all" in keys:
+        catalog_cache.put("all", current.version, build_all_body(current))
+    if "all-with-custom" in keys:
+        catalog_cache.put("all-with-custom", (current.version, custom_store.version),
+                          build_all_with_custom_body(current))
 
+data_reloader = DataReloader(reload_data)
+
+# Под serve.py запрос перезагрузки из одного воркера доходит до всех через мастера
+reload_channel = (
+    ReloadChannel(os.environ[SERVE_RELOAD_ENV], int(os.environ[SERVE_MASTER_ENV]))
+    if os.environ.get(SERVE_MASTER_ENV) and os.environ.get(SERVE_RELOAD_ENV) else None
+)
+
+def reload_on_signal():
+    # SIGHUP в воркере serve.py: цели и force — из запросов в reload_channel
+    targets, force = reload_channel.receive() if reload_channel is not None else (RELOAD_TARGETS, False)
+    data_reloader.request(targets, force=force, reason="SIGHUP")
+
+def start_data_watch():
+    # Опрос исходных файлов; serve.py вызывает её в каждом воркере после fork
+    if DATA_WATCH_INTERVAL:
+        data_reloader.watch({
+            BIOMES_FILE: "biomes",
+            BIOME_RASTER_FILE: "biomes",
+            ASTEROIDS_FILE: "catalog",
+            os.path.join(ASTEROID_CATALOG_DIR, "meta.json"): "catalog",
+            biome_risks.__file__: "risks",
+        }, DATA_WATCH_INTERVAL)
+
+# Функции для работы с файлами
 def save_geo_result(result_data):
     try:
-        results = load_geo_results()
         result_data["timestamp"] = datetime.now().isoformat()
-        results.insert(0, result_data)
-        with open(GEO_RESULTS_FILE, "w", encoding="utf-8") as f:
-            json.dump(results, f, indent=2, ensure_ascii=False)
-        print(f"✅ Результат сохранен в {GEO_RESULTS_FILE}")
+        with STORE_SECONDS.time(store="geo_results", operation="append"):
+            geo_store.append(result_data)
+        log.debug("✅ Результат сохранен в %s", GEO_RESULTS_DB)
         return True
     except Exception as e:
-        print(f"❌ Ошибка при сохранении результата: {e}")
+        log.error(f"❌ Ошибка при сохранении результата: {e}")
         return False
 
-def load_custom_asteroids():
-    if os.path.exists(CUSTOM_ASTEROIDS_FILE):
-        try:
-            with open(CUSTOM_ASTEROIDS_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except (json.JSONDecodeError, Exception) as e:
-            print(f"Warning: Could not load {CUSTOM_ASTEROIDS_FILE}: {e}")
-            return []
-    return []
-
-def save_custom_asteroids(asteroids):
+def save_geo_results_batch(results_data):
+    # Сохраняет пачку результатов одной транзакцией
     try:
-        with open(CUSTOM_ASTEROIDS_FILE, "w", encoding="utf-8") as f:
-            json.dump(asteroids, f, indent=2, ensure_ascii=False)
+        timestamp = datetime.now().isoformat()
+        for result_data in results_data:
+            result_data["timestamp"] = timestamp
+        with STORE_SECONDS.time(store="geo_results", operation="append_many"):
+            geo_store.append_many(results_data)
+        log.debug(f"✅ {len(results_data)} результатов сохранено в {GEO_RESULTS_DB}")
         return True
     except Exception as e:
-        print(f"❌ Ошибка при сохранении кастомных астероидов: {e}")
+        log.error(f"❌ Ошибка при сохранении результатов: {e}")
         return False
 
+def load_custom_asteroids():
+    # Чтение из памяти, без обращения к диску
+    return custom_store.all()
+
 # Эндпоинты
 @app.route("/")
 def home():
     return jsonify({"message": "Asteroid API работает 🚀", "status": "ok"})
 
+@app.route("/api/asteroids", methods=["GET"])
+def query_asteroids():
+    # Фильтры, сортировка и постраничная выдача по индексам каталога
+    try:
+        try:
+            query = parse_asteroid_query(request.args)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        catalog = catalog_data.catalog
+        rows, total, next_cursor = catalog.query(**query)
+        return jsonify({
+            "count": total,
+            "asteroids": format_asteroids(catalog.records(rows)),
+            "next_cursor": next_cursor
+        })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+def parse_asteroid_query(args):
+    hazardous = args.get("hazardous")
+    if hazardous is not None:
+        if hazardous.lower() not in ("true", "false", "1", "0"):
+            raise ValueError("hazardous должен быть true или false")
+        hazardous = hazardous.lower() in ("true", "1")
+
+    ranges = {}
+    for key in SORT_KEYS:
+        if key == "date":
+            low, high = args.get("date_from"), args.get("date_to")
+            parse = parse_query_date
+        else:
+            low, high = args.get(f"min_{key}"), args.get(f"max_{key}")
+            parse = parse_query_number
+        if low is None and high is None:
+            continue
+        try:
+            ranges[key] = (None if low is None else parse(low), None if high is None else parse(high))
+        except ValueError:
+            raise ValueError(f"Некорректное значение фильтра {key}")
+
+    sort = args.get("sort")
+    if sort is not None and sort.lstrip("-") not in SORT_KEYS:
+        raise ValueError(f"sort: ожидается одно из {', '.join(SORT_KEYS)} (с '-' для убывания)")
+
+    try:
+        limit = int(args.get("limit", DEFAULT_ASTEROID_PAGE))
+    except ValueError:
+        raise ValueError("limit должен быть целым числом")
+    try:
+        cursor = int(args.get("cursor", 0))
+    except ValueError:
+        raise ValueError("cursor должен быть целым числом")
+    if limit < 1 or limit > MAX_ASTEROID_PAGE:
+        raise ValueError(f"limit должен быть от 1 до {MAX_ASTEROID_PAGE}")
+    if cursor < 0:
+        raise ValueError("cursor должен быть неотрицательным")
+    return {"hazardous": hazardous, "ranges": ranges, "sort": sort, "limit": limit, "cursor": cursor}
+
+def parse_query_number(text):
+    value = float(text)
+    if not math.isfinite(value):
+        raise ValueError(text)
+    return value
+
+def parse_query_date(text):
+    days = parse_date(text)
+    if days is None:
+        raise ValueError(text)
+    return days
+
 @app.route("/api/asteroids/hazardous", methods=["GET"])
 def get_hazardous():
-    hazardous = [a for a in asteroids_data if a.get("hazardous")]
+    catalog = catalog_data.catalog
+    hazardous = catalog.records(catalog.hazardous_rows().tolist())
     return jsonify({
         "count": len(hazardous),
         "asteroids": hazardous
@@ -224,31 +444,46 @@ def get_hazardous():
 @app.route("/api/asteroids/all", methods=["GET"])
 def get_all():
     try:
-        formatted_asteroids = [format_asteroid(a) for a in asteroids_data]
-        return jsonify({
-            "count": len(formatted_asteroids),
-            "asteroids": formatted_asteroids
-        })
+        current = catalog_data
+        cached = catalog_cache.get("all", current.version, lambda: build_all_body(current))
+        return cached_response(cached)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @app.route("/api/asteroids/<name>", methods=["GET"])
 def get_asteroid_by_name(name):
     try:
-        asteroid = next(
-            (
-                a for a in asteroids_data
-                if a.get("name", "").lower().replace(" ", "") == name.lower().replace(" ", "")
-            ),
-            None
-        )
-        if not asteroid:
+        asteroid = find_nasa_asteroid(name)
+        if asteroid is None:
             return jsonify({"error": "Asteroid not found"}), 404
         formatted_asteroid = format_asteroid(asteroid)
         return jsonify(formatted_asteroid)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+def custom_impact_effects(data):
+    # Параметры кастомного астероида и последствия удара. Параметры — конечные числа
+    # (не bool и не строки), последствия тоже должны быть конечными (без переполнения):
+    # иначе ValueError и 400, а не запись с null вместо массы и радиусов
+    params = []
+    for field in ("diameter", "density", "velocity", "angle"):
+        value = data[field]
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"{field} должен быть числом")
+        try:
+            finite = math.isfinite(value)
+        except OverflowError:
+            finite = False
+        if not finite:
+            raise ValueError(f"{field} должен быть конечным числом")
+        params.append(value)
+    with np.errstate(over="ignore", invalid="ignore"):
+        effects = impact_physics.impact_effects(*params)
+    for name in ("mass_kg", "kinetic_energy_joules", "crater_diameter", "ejecta_radius", "dust_height"):
+        if not np.isfinite(effects[name]):
+            raise ValueError(f"Параметры астероида дают бесконечный или неопределённый {name}")
+    return (*params, effects)
+
 @app.route("/api/asteroids/custom", methods=["POST"])
 def create_custom_asteroid():
     try:
@@ -258,26 +493,18 @@ def create_custom_asteroid():
             if field not in data:
                 return jsonify({"error": f"Missing required field: {field}"}), 400
         
-        diameter = data["diameter"]
-        density = data["density"]
-        velocity = data["velocity"]
-        angle = data["angle"]
-        
-        radius = diameter / 2
-        volume = (4 / 3) * math.pi * (radius ** 3)
-        mass_kg = volume * density
-        velocity_ms = velocity * 1000
-        kinetic_energy_joules = 0.5 * mass_kg * (velocity_ms ** 2)
-        angle_factor = math.sin(angle * math.pi / 180)
-        crater_diameter = diameter * 20 * angle_factor
-        ejecta_radius = crater_diameter * 1.2
-        dust_height = crater_diameter * 0.1
-        is_hazardous = kinetic_energy_joules > 1e12
-        
-        asteroid_id = f"custom-{int(datetime.now().timestamp() * 1000)}"
+        try:
+            diameter, density, velocity, angle, effects = custom_impact_effects(data)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        mass_kg = float(effects["mass_kg"])
+        kinetic_energy_joules = float(effects["kinetic_energy_joules"])
+        crater_diameter = float(effects["crater_diameter"])
+        ejecta_radius = float(effects["ejecta_radius"])
+        dust_height = float(effects["dust_height"])
+        is_hazardous = bool(effects["is_hazardous"])
         
-        custom_asteroid = {
-            "id": asteroid_id,
+        custom_fields = {
             "name": data["name"],
             "diameter": diameter,
             "density": density,
@@ -293,19 +520,21 @@ def create_custom_asteroid():
             "is_custom": True
         }
         
-        existing_asteroids = load_custom_asteroids()
-        existing_asteroids.append(custom_asteroid)
-        
-        if save_custom_asteroids(existing_asteroids):
-            print(f"✅ Кастомный астероид создан: {custom_asteroid['name']} (ID: {asteroid_id})")
-            return jsonify({
-                "message": "Custom asteroid created successfully",
-                "asteroid": custom_asteroid
-            }), 201
-        else:
+        try:
+            # id назначается хранилищем, чтобы одновременные запросы не получили одинаковый
+            with STORE_SECONDS.time(store="custom_asteroids", operation="create"):
+                custom_asteroid = custom_store.create(custom_fields)
+        except Exception as e:
+            log.error(f"❌ Ошибка при сохранении кастомных астероидов: {e}")
             return jsonify({"error": "Failed to save asteroid"}), 500
+
+        log.info(f"✅ Кастомный астероид создан: {custom_asteroid['name']} (ID: {custom_asteroid['id']})")
+        return jsonify({
+            "message": "Custom asteroid created successfully",
+            "asteroid": custom_asteroid
+        }), 201
     except Exception as e:
-        print(f"❌ Ошибка при создании астероида: {e}")
+        log.error(f"❌ Ошибка при создании астероида: {e}")
         return jsonify({"error": str(e)}), 500
 
 @app.route("/api/asteroids/custom", methods=["GET"])
@@ -322,8 +551,7 @@ def get_custom_asteroids():
 @app.route("/api/asteroids/custom/<asteroid_id>", methods=["GET"])
 def get_custom_asteroid(asteroid_id):
     try:
-        custom_asteroids = load_custom_asteroids()
-        asteroid = next((a for a in custom_asteroids if a["id"] == asteroid_id), None)
+        asteroid = custom_store.get(asteroid_id)
         if asteroid:
             return jsonify(asteroid)
         else:
@@ -334,14 +562,14 @@ def get_custom_asteroid(asteroid_id):
 @app.route("/api/asteroids/custom/<asteroid_id>", methods=["DELETE"])
 def delete_custom_asteroid(asteroid_id):
     try:
-        custom_asteroids = load_custom_asteroids()
-        initial_count = len(custom_asteroids)
-        custom_asteroids = [a for a in custom_asteroids if a["id"] != asteroid_id]
-        if len(custom_asteroids) < initial_count:
-            if save_custom_asteroids(custom_asteroids):
-                return jsonify({"message": "Asteroid deleted successfully"})
-            else:
-                return jsonify({"error": "Failed to save changes"}), 500
+        try:
+            with STORE_SECONDS.time(store="custom_asteroids", operation="delete"):
+                deleted = custom_store.delete(asteroid_id)
+        except Exception as e:
+            log.error(f"❌ Ошибка при сохранении кастомных астероидов: {e}")
+            return jsonify({"error": "Failed to save changes"}), 500
+        if deleted:
+            return jsonify({"message": "Asteroid deleted successfully"})
         else:
             return jsonify({"error": "Asteroid not found"}), 404
     except Exception as e:
@@ -350,46 +578,206 @@ def delete_custom_asteroid(asteroid_id):
 @app.route("/api/asteroids/all-with-custom", methods=["GET"])
 def get_all_asteroids_with_custom():
     try:
-        nasa_asteroids = [format_asteroid(a) for a in asteroids_data]
-        custom_asteroids = load_custom_asteroids()
-        formatted_custom_asteroids = []
-        for custom in custom_asteroids:
-            formatted_custom = {
-                "id": custom["id"],
-                "name": custom["name"],
-                "date": datetime.fromisoformat(custom["created_at"]).strftime("%Y-%m-%d"),
-                "is_potentially_hazardous_asteroid": custom["is_potentially_hazardous_asteroid"],
-                "estimated_diameter": {
-                    "meters": {
-                        "estimated_diameter_min": custom["diameter"],
-                        "estimated_diameter_max": custom["diameter"]
-                    }
-                },
-                "relative_velocity": {
-                    "kilometers_per_second": str(custom["velocity"])
-                },
-                "miss_distance": {
-                    "kilometers": "0"
-                },
-                "mass_kg": custom["mass_kg"],
-                "kinetic_energy_joules": custom["kinetic_energy_joules"],
-                "crater": {
-                    "diameter_m": custom["crater_diameter"],
-                    "dust_radius_m": custom["ejecta_radius"],
-                    "dust_height_m": custom["dust_height"]
-                },
-                "is_custom": True,
-                "custom_data": custom
-            }
-            formatted_custom_asteroids.append(formatted_custom)
-        
-        all_asteroids = nasa_asteroids + formatted_custom_asteroids
-        return jsonify({
-            "count": len(all_asteroids),
-            "nasa_count": len(nasa_asteroids),
-            "custom_count": len(custom_asteroids),
-            "asteroids": all_asteroids
-        })
+        fmt = request.args.get("format", "json")
+        limit = request.args.get("limit", type=int)
+        cursor = request.args.get("cursor", default=0, type=int)
+        if fmt not in LIST_FORMATS:
+            return jsonify({"error": f"format должен быть одним из {', '.join(LIST_FORMATS)}"}), 400
+        if (limit is not None and limit < 0) or cursor < 0:
+            return jsonify({"error": "limit и cursor должны быть неотрицательными"}), 400
+
+        if fmt == "json" and limit is None and not cursor:
+            # Полный список без параметров — готовый закэшированный ответ, как раньше
+            current = catalog_data
+            version = (current.version, custom_store.version)
+            cached = catalog_cache.get("all-with-custom", version, lambda: build_all_with_custom_body(current))
+            return cached_response(cached)
+
+        # cursor — смещение в общем списке (сначала NASA, затем кастомные)
+        catalog = catalog_data.catalog
+        custom = [format_custom_asteroid(c) for c in load_custom_asteroids()]
+        total = len(catalog) + len(custom)
+        stop = total if limit is None else min(total, cursor + limit)
+        head = {"count": total, "nasa_count": len(catalog), "custom_count": len(custom)}
+        items = iter_all_with_custom(catalog, custom, cursor, stop)
+        next_cursor = stop if stop < total else None
+        if fmt == "json":
+            return jsonify({**head, "asteroids": list(items), "next_cursor": next_cursor})
+        return stream_list(fmt, head, "asteroids", items, next_cursor)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+def iter_all_with_custom(catalog, custom, start, stop):
+    # Каталог NASA форматируется пачками, в памяти не бывает всего списка сразу
+    nasa_stop = min(stop, len(catalog))
+    for batch_start in range(start, nasa_stop, json_stream.STREAM_BATCH):
+        rows = range(batch_start, min(batch_start + json_stream.STREAM_BATCH, nasa_stop))
+        yield from format_asteroids(catalog.records(rows))
+    yield from custom[max(0, start - len(catalog)):max(0, stop - len(catalog))]
+
+class FormattedCatalog:
+    # Весь список (каталог NASA, затем кастомные) для json_list_body: при каждом обходе
+    # записи форматируются заново пачками, как в iter_all_with_custom, и не хранятся
+    def __init__(self, catalog, custom=()):
+        self.catalog = catalog
+        self.custom = list(custom)
+
+    def __len__(self):
+        return len(self.catalog) + len(self.custom)
+
+    def __iter__(self):
+        return iter_all_with_custom(self.catalog, self.custom, 0, len(self))
+
+def stream_list(fmt, head, key, items, next_cursor, encoded=False):
+    # Потоковый ответ: документ той же формы, что и json, или NDJSON;
+    # для NDJSON count и next_cursor передаются в заголовках
+    headers = {"X-Total-Count": str(head["count"])}
+    if next_cursor is not None:
+        headers["X-Next-Cursor"] = str(next_cursor)
+    if fmt == "ndjson":
+        body = json_stream.stream_ndjson(items, encoded)
+        mimetype = "application/x-ndjson"
+    else:
+        body = json_stream.stream_json(head, key, items, encoded, tail={"next_cursor": next_cursor})
+        mimetype = "application/json"
+    return Response(stream_with_context(body), mimetype=mimetype, headers=headers)
+
+def build_all_body(current):
+    # В кэше остаётся только готовое тело ответа, отформатированные записи — нет
+    nasa_asteroids = FormattedCatalog(current.catalog)
+    return CachedBody(json_list_body({"count": len(nasa_asteroids)}, "asteroids", nasa_asteroids))
+
+def build_all_with_custom_body(current):
+    custom_asteroids = load_custom_asteroids()
+    formatted_custom_asteroids = [format_custom_asteroid(custom) for custom in custom_asteroids]
+    all_asteroids = FormattedCatalog(current.catalog, formatted_custom_asteroids)
+    return CachedBody(json_list_body({
+        "count": len(all_asteroids),
+        "nasa_count": len(current.catalog),
+        "custom_count": len(custom_asteroids)
+    }, "asteroids", all_asteroids))
+
+@app.route("/api/scenarios/sweep", methods=["POST"])
+def sweep_scenarios():
+    # Перебор сценариев «что если» без сохранения в кастомные астероиды
+    try:
+        data = request.get_json(silent=True) or {}
+        try:
+            axes = scenarios.parse_axes(data)
+        except (TypeError, ValueError) as e:
+            return jsonify({"error": str(e)}), 400
+        size = scenarios.grid_size(axes)
+        if size > MAX_SWEEP_POINTS:
+            return jsonify({"error": f"Слишком большая сетка: {size} точек (максимум {MAX_SWEEP_POINTS})"}), 400
+
+        mode = data.get("mode", "summary")
+        if mode == "summary":
+            return jsonify(scenarios.summarize(axes))
+        elif mode == "stream":
+            return Response(
+                stream_with_context(scenarios.stream_ndjson(axes)),
+                mimetype="application/x-ndjson",
+                headers={"X-Total-Count": str(size)}
+            )
+        else:
+            return jsonify({"error": "mode должен быть summary или stream"}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/api/simulations", methods=["POST"])
+def start_simulation():
+    # Запускает Монте-Карло симуляцию в фоне; прогресс и результат — GET /api/simulations/<id>
+    try:
+        data = request.get_json(silent=True) or {}
+        try:
+            params = simulation.parse_params(data)
+        except (TypeError, ValueError, KeyError) as e:
+            return jsonify({"error": str(e)}), 400
+        # workers=1 — считать в потоке задачи без пула процессов
+        workers = data.get("workers")
+
+        if not simulation_slots.acquire(blocking=False):
+            response = jsonify({"error": f"Уже выполняется {MAX_SIMULATION_JOBS} симуляций, повторите позже"})
+            response.headers["Retry-After"] = "10"
+            return response, 429
+        try:
+            simulation_store.purge(SIMULATION_JOB_TTL)
+            job_id = uuid.uuid4().hex
+            job = simulation_store.create(job_id, data)
+        except Exception:
+            simulation_slots.release()
+            raise
+
+        def progress(done, total):
+            simulation_store.progress(job_id, done, total)
+
+        current = biome_data
+
+        def run():
+            try:
+                result = simulation.run_simulation(current.biomes, params, workers=workers, progress=progress,
+                                                   risks_table=current.risks, pool=simulation_pool,
+                                                   pool_key=current.version)
+                simulation_store.finish(job_id, result)
+            except Exception as e:
+                log.error(f"❌ Ошибка симуляции {job_id}: {e}")
+                simulation_store.fail(job_id, str(e))
+            finally:
+                simulation_slots.release()
+
+        threading.Thread(target=run, daemon=True).start()
+        return jsonify(job), 202
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/api/simulations/<job_id>", methods=["GET"])
+def get_simulation(job_id):
+    job = simulation_store.get(job_id)
+    if not job:
+        return jsonify({"error": "Simulation not found"}), 404
+    return jsonify(job)
+
+@app.route("/api/impact/footprint", methods=["GET"])
+def get_impact_footprint():
+    # Доли биомов внутри радиуса выброса астероида (NASA по имени или кастомный по id)
+    try:
+        lat = request.args.get("lat", type=float)
+        lon = request.args.get("lon", type=float)
+        asteroid_ref = request.args.get("asteroid")
+        radius_m = request.args.get("radius_m", type=float)
+        if lat is None or lon is None:
+            return jsonify({"error": "lat и lon обязательны"}), 400
+        if asteroid_ref is None and radius_m is None:
+            return jsonify({"error": "Нужен asteroid или radius_m"}), 400
+
+        asteroid_name = None
+        if asteroid_ref is not None:
+            custom = custom_store.get(asteroid_ref)
+            if custom:
+                asteroid_name = custom["name"]
+                asteroid_radius = custom["ejecta_radius"]
+            else:
+                asteroid = find_nasa_asteroid(asteroid_ref)
+                if not asteroid:
+                    return jsonify({"error": "Asteroid not found"}), 404
+                formatted = format_asteroid(asteroid)
+                if "crater" not in formatted:
+                    return jsonify({"error": formatted.get("error", "Failed to format asteroid data")}), 500
+                asteroid_name = formatted["name"]
+                asteroid_radius = formatted["crater"]["dust_radius_m"]
+            # Явный radius_m имеет приоритет над радиусом астероида
+            if radius_m is None:
+                radius_m = asteroid_radius
+
+        started = time.perf_counter()
+        try:
+            current = biome_data
+            result = footprint.analyze_footprint(current.index, lat, lon, radius_m, risks_table=current.risks)
+        except footprint.FootprintError as e:
+            return jsonify({"error": str(e)}), 400
+        result["asteroid"] = asteroid_name
+        result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        return jsonify(result)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -399,7 +787,11 @@ def get_geo():
     lon = request.args.get("lon", type=float)
     if lat is None or lon is None:
         return jsonify({"error": "lat и lon обязательны"}), 400
-    biome_info = find_biome(lat, lon)
+    current = biome_data
+    if geo_cache is not None:
+        biome_info = geo_cache.get(lat, lon, current.version, lambda la, lo: find_biome(la, lo, current))
+    else:
+        biome_info = find_biome(lat, lon, current)
     result_data = {
         "lat": lat,
         "lon": lon,
@@ -410,17 +802,41 @@ def get_geo():
         "risk_description": biome_info["risk_description"],
         "risk_factors": biome_info["risk_factors"]
     }
-    print(f"📤 Ответ /geo: {result_data}")  # Отладочный лог
+    log.debug("📤 Ответ /geo: %s", result_data)
     save_geo_result(result_data)
     return jsonify(result_data)
 
+@app.route("/api/geo/cache", methods=["GET"])
+def get_geo_cache_stats():
+    if geo_cache is None:
+        return jsonify({"enabled": False})
+    return jsonify({"enabled": True, **geo_cache.stats()})
+
 @app.route("/api/geo/results", methods=["GET"])
 def get_geo_results():
     try:
-        results = load_geo_results()
+        # Без параметров возвращается вся история, как раньше
+        fmt = request.args.get("format", "json")
+        limit = request.args.get("limit", type=int)
+        offset = request.args.get("offset", default=0, type=int)
+        cursor = request.args.get("cursor", type=int)
+        if fmt not in LIST_FORMATS:
+            return jsonify({"error": f"format должен быть одним из {', '.join(LIST_FORMATS)}"}), 400
+        if (limit is not None and limit < 0) or offset < 0:
+            return jsonify({"error": "limit и offset должны быть неотрицательными"}), 400
+        if fmt != "json":
+            # Записи отдаются готовым JSON-текстом из журнала, без разбора и повторной сериализации
+            rows = geo_store.iter_raw(limit=limit, offset=offset, cursor=cursor)
+            return stream_list(
+                fmt, {"count": geo_store.count()}, "results", (data for _, data in rows),
+                geo_store.next_cursor(limit, offset, cursor), encoded=True
+            )
+        with STORE_SECONDS.time(store="geo_results", operation="page"):
+            results, next_cursor = geo_store.page(limit=limit, offset=offset, cursor=cursor)
         return jsonify({
-            "count": len(results),
-            "results": results
+            "count": geo_store.count(),
+            "results": results,
+            "next_cursor": next_cursor
         })
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -428,27 +844,238 @@ def get_geo_results():
 @app.route("/api/geo/results/clear", methods=["DELETE"])
 def clear_geo_results():
     try:
-        with open(GEO_RESULTS_FILE, "w", encoding="utf-8") as f:
-            json.dump([], f, indent=2)
+        with STORE_SECONDS.time(store="geo_results", operation="clear"):
+            geo_store.clear()
         return jsonify({"message": "Все результаты очищены"})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route("/api/geo/stats", methods=["GET"])
+def get_geo_stats():
+    # Счётчики по биомам, регионам и уровням риска и теплокарта по истории /geo;
+    # ведутся при каждой записи в историю, ?heatmap=false — без сетки
+    try:
+        heatmap = request.args.get("heatmap", "true").lower() not in ("0", "false", "no")
+        with STORE_SECONDS.time(store="geo_results", operation="stats"):
+            stats = geo_store.stats(heatmap=heatmap)
+        return jsonify(stats)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/api/geo/stats/rebuild", methods=["POST"])
+def rebuild_geo_stats():
+    # Пересчёт статистики по всей сохранённой истории
+    if not check_admin_token():
+        return jsonify({"error": "Forbidden"}), 403
+    try:
+        started = time.perf_counter()
+        with STORE_SECONDS.time(store="geo_results", operation="rebuild_stats"):
+            total = geo_store.rebuild_stats()
+        return jsonify({"total": total, "elapsed_ms": round((time.perf_counter() - started) * 1000, 2)})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/api/geo/batch", methods=["POST"])
+def get_geo_batch():
+    try:
+        data = request.get_json(silent=True) or {}
+        try:
+            lats, lons = parse_geo_batch(data)
+        except (TypeError, ValueError, KeyError) as e:
+            return jsonify({"error": f"Некорректный формат точек: {e}"}), 400
+        if len(lats) > MAX_GEO_BATCH_POINTS:
+            return jsonify({"error": f"Слишком много точек (максимум {MAX_GEO_BATCH_POINTS})"}), 400
+
+        current = biome_data
+        if current.biomes:
+            indices = current.index.locate_many(lats, lons).tolist()
+        else:
+            indices = None
+
+        # Описание биома не зависит от координат — строим его один раз на полигон
+        described = {}
+        results = []
+        for i, (lat, lon) in enumerate(zip(lats, lons)):
+            if indices is None:
+                biome_info = find_biome(lat, lon, current)
+            else:
+                idx = indices[i] if indices[i] >= 0 else None
+                if idx not in described:
+                    described[idx] = describe_biome(idx, lat, lon, current, verbose=False)
+                biome_info = described[idx]
+            results.append({
+                "lat": lat,
+                "lon": lon,
+                "eco_name": biome_info["eco_name"],
+                "biome": biome_info["biome"],
+                "realm": biome_info["realm"],
+                "risk_level": biome_info["risk_level"],
+                "risk_description": biome_info["risk_description"],
+                "risk_factors": biome_info["risk_factors"]
+            })
+
+        # По умолчанию пакетные запросы не пишутся в историю
+        if data.get("save", False):
+            save_geo_results_batch(results)
+
+        return jsonify({
+            "count": len(results),
+            "results": results
+        })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+def parse_geo_batch(data):
+    # Поддерживаются два формата:
+    #   {"points": [[lat, lon], ...]} или {"points": [{"lat": .., "lon": ..}, ...]}
+    #   {"lat": [...], "lon": [...]} — колоночный формат
+    if "points" in data:
+        lats, lons = [], []
+        for p in data["points"]:
+            if isinstance(p, dict):
+                lats.append(float(p["lat"]))
+                lons.append(float(p["lon"]))
+            else:
+                lat, lon = p
+                lats.append(float(lat))
+                lons.append(float(lon))
+    else:
+        lats = [float(v) for v in data["lat"]]
+        lons = [float(v) for v in data["lon"]]
+        if len(lats) != len(lons):
+            raise ValueError("длины lat и lon не совпадают")
+    return lats, lons
+
+def check_admin_token():
+    # Без настроенного токена административные операции (перезагрузка данных, пересчёт
+    # статистики) недоступны никому: каждая из них дорогая
+    return bool(ADMIN_TOKEN) and hmac.compare_digest(request.headers.get("X-Admin-Token", ""), ADMIN_TOKEN)
+
+@app.route("/api/admin/reload", methods=["POST"])
+def reload_data_endpoint():
+    # Фоновая перезагрузка данных: {"targets": [...], "force": false, "wait": false}.
+    # Без wait отвечает 202 сразу, с wait — после окончания перезагрузки.
+    # Под serve.py перезагружаются все воркеры, wait не поддерживается (всегда 202)
+    if not check_admin_token():
+        return jsonify({"error": "Forbidden"}), 403
+    try:
+        data = request.get_json(silent=True) or {}
+        try:
+            targets = check_targets(data.get("targets", list(RELOAD_TARGETS)))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        if not targets:
+            return jsonify({"error": "targets не должен быть пустым"}), 400
+        force = bool(data.get("force"))
+        if reload_channel is not None:
+            # Запрос уходит всем воркерам через мастера; дождаться чужих воркеров этот процесс не может
+            reload_channel.send(targets, force)
+            body = {"broadcast": True, "targets": targets, "force": force}
+            if data.get("wait"):
+                body["wait"] = ("не поддерживается под serve.py: перезагрузка идёт в фоне в каждом воркере, "
+                                "состояние — GET /api/admin/reload")
+            return jsonify(body), 202
+        status = data_reloader.request(targets, force=force, reason="admin")
+        if data.get("wait"):
+            data_reloader.wait()
+            return jsonify(reload_status())
+        return jsonify(status), 202
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/api/admin/reload", methods=["GET"])
+def get_reload_status():
+    if not check_admin_token():
+        return jsonify({"error": "Forbidden"}), 403
+    return jsonify(reload_status())
+
+def reload_status():
+    return {
+        **data_reloader.status(),
+        "versions": {"biomes": biome_data.version, "catalog": catalog_data.version},
+    }
+
 # Вспомогательные функции
+def find_nasa_asteroid(name):
+    # Поиск через хэш-индекс по нормализованному имени
+    catalog = catalog_data.catalog
+    i = catalog.find(name)
+    return catalog.record(i) if i is not None else None
+
+def json_list_body(head, key, items):
+    # Тело jsonify({**head, key: items}) без одного долгого вызова сериализатора, см. FastJSONProvider.list_body
+    return app.json.list_body(head, key, items)
+
+def format_custom_asteroid(custom):
+    return {
+        "id": custom["id"],
+        "name": custom["name"],
+        "date": datetime.fromisoformat(custom["created_at"]).strftime("%Y-%m-%d"),
+        "is_potentially_hazardous_asteroid": custom["is_potentially_hazardous_asteroid"],
+        "estimated_diameter": {
+            "meters": {
+                "estimated_diameter_min": custom["diameter"],
+                "estimated_diameter_max": custom["diameter"]
+            }
+        },
+        "relative_velocity": {
+            "kilometers_per_second": str(custom["velocity"])
+        },
+        "miss_distance": {
+            "kilometers": "0"
+        },
+        "mass_kg": custom["mass_kg"],
+        "kinetic_energy_joules": custom["kinetic_energy_joules"],
+        "crater": {
+            "diameter_m": custom["crater_diameter"],
+            "dust_radius_m": custom["ejecta_radius"],
+            "dust_height_m": custom["dust_height"]
+        },
+        "is_custom": True,
+        "custom_data": custom
+    }
+
 def format_asteroid(a):
-    try:
+    return format_asteroids([a])[0]
+
+def format_asteroids(items):
+    # Физика удара считается одним векторным вызовом на весь список
+    columns = []
+    for a in items:
+        try:
+            diameter = a.get("estimated_diameter_m", 0)
+            mass = a.get("mass_kg", diameter**3 * 3000)
+            velocity = a.get("velocity_km_s", 20)
+            columns.append((float(diameter), float(mass), float(velocity)))
+        except Exception as e:
+            log.warning(f"Error formatting asteroid {a.get('name')}: {e}")
+            columns.append(None)
+
+    valid = [c for c in columns if c is not None]
+    effects = impact_physics.impact_effects(
+        [c[0] for c in valid],
+        None,
+        [c[2] for c in valid],
+        None,
+        mass=[c[1] for c in valid],
+        crater_model=impact_physics.CRATER_MODEL_ENERGY
+    )
+    kinetic_energy = effects["kinetic_energy_joules"].tolist()
+    crater_diameter = effects["crater_diameter"].tolist()
+    dust_radius = effects["ejecta_radius"].tolist()
+    dust_height = effects["dust_height"].tolist()
+
+    formatted = []
+    j = 0
+    for a, column in zip(items, columns):
+        if column is None:
+            formatted.append({
+                "name": a.get("name", "Unknown"),
+                "error": "Failed to format asteroid data"
+            })
+            continue
         diameter = a.get("estimated_diameter_m", 0)
-        mass = a.get("mass_kg", diameter**3 * 3000)
-        velocity = a.get("velocity_km_s", 20) * 1000
-        impact_angle = a.get("impact_angle_deg", 45)
-        KE = 0.5 * mass * velocity**2
-        k = 1.3
-        rho_surface = 2500
-        g = 9.81
-        crater_diameter = k * (KE / (rho_surface * g))**0.25
-        dust_height = 0.1 * crater_diameter
-        dust_radius = 1.2 * crater_diameter
-        return {
+        formatted.append({
             "name": a.get("name", "Unknown"),
             "date": a.get("date", "Unknown"),
             "is_potentially_hazardous_asteroid": a.get("hazardous", False),
@@ -464,24 +1091,21 @@ def format_asteroid(a):
             "miss_distance": {
                 "kilometers": str(a.get("miss_distance_km", 0))
             },
-            "mass_kg": mass,
-            "kinetic_energy_joules": KE,
+            "mass_kg": a.get("mass_kg", diameter**3 * 3000),
+            "kinetic_energy_joules": kinetic_energy[j],
             "crater": {
-                "diameter_m": crater_diameter,
-                "dust_radius_m": dust_radius,
-                "dust_height_m": dust_height
+                "diameter_m": crater_diameter[j],
+                "dust_radius_m": dust_radius[j],
+                "dust_height_m": dust_height[j]
             }
-        }
-    except Exception as e:
-        print(f"Error formatting asteroid {a.get('name')}: {e}")
-        return {
-            "name": a.get("name", "Unknown"),
-            "error": "Failed to format asteroid data"
-        }
+        })
+        j += 1
+    return formatted
 
-def find_biome(lat: float, lon: float):
-    if not biomes:
-        print(f"❌ Нет данных о биомах для lat={lat}, lon={lon}")
+def find_biome(lat: float, lon: float, current: BiomeData = None):
+    current = current or biome_data
+    if not current.biomes:
+        log.debug("❌ Нет данных о биомах для lat=%s, lon=%s", lat, lon)
         return {
             "eco_name": "No biome data available",
             "biome": "Unknown",
@@ -491,55 +1115,71 @@ def find_biome(lat: float, lon: float):
             "risk_factors": []
         }
     
-    point = Point(lon, lat)
-    for geom, eco_name, biome_code, realm in biomes:
-        if geom.contains(point):
-            try:
-                # Преобразуем biome_code в строку, убирая десятичную часть, если это число
-                if isinstance(biome_code, (int, float)):
-                    biome_key = str(int(biome_code))
-                else:
-                    biome_key = str(biome_code).strip() if biome_code is not None else "Unknown"
-                
-                print(f"🔍 Проверка биома: lat={lat}, lon={lon}, biome_code={biome_code!r}, type={type(biome_code)}, biome_key={biome_key!r}, eco_name={eco_name!r}")
-                
-                # Проверяем, есть ли ключ в BIOME_RISKS
-                if biome_key in BIOME_RISKS:
-                    risks = BIOME_RISKS[biome_key]
-                    print(f"✅ Найден биом: biome_key={biome_key!r}, eco_name={eco_name!r}, risk_level={risks['risk_level']}")
-                else:
-                    risks = BIOME_RISKS["Unknown"]
-                    print(f"⚠️ Ключ не найден в BIOME_RISKS: biome_key={biome_key!r}, eco_name={eco_name!r}, возвращаем 'Unknown'")
-                    print(f"📋 Доступные ключи BIOME_RISKS: {list(BIOME_RISKS.keys())}")
-                
-                return {
-                    "eco_name": eco_name,
-                    "biome": biome_code,
-                    "realm": realm,
-                    "risk_level": risks["risk_level"],
-                    "risk_description": risks["description"],
-                    "risk_factors": risks["impact_factors"]
-                }
-            except Exception as e:
-                print(f"❌ Ошибка обработки biome_code: {biome_code}, error={e}")
-                return {
-                    "eco_name": eco_name,
-                    "biome": biome_code,
-                    "realm": realm,
-                    "risk_level": "unknown",
-                    "risk_description": f"Ошибка обработки биома: {str(e)}",
-                    "risk_factors": []
-                }
-    
-    print(f"❌ Биом не найден для lat={lat}, lon={lon}, предполагается океан")
+    # Сначала отбираем кандидатов по bounding box, затем точная проверка contains
+    idx = current.index.locate(lat, lon)
+    # Подробный лог только на уровне DEBUG: на горячем пути форматирование строк не выполняется
+    return describe_biome(idx, lat, lon, current, verbose=log.isEnabledFor(logging.DEBUG))
+
+def describe_biome(idx, lat: float, lon: float, current: BiomeData = None, verbose: bool = True):
+    # Формирует ответ по индексу полигона в current.biomes (None — точка в океане)
+    current = current or biome_data
+    risks_table = current.risks
+    if idx is not None:
+        geom, eco_name, biome_code, realm = current.biomes[idx]
+        try:
+            # Преобразуем biome_code в строку, убирая десятичную часть, если это число
+            if isinstance(biome_code, (int, float)):
+                biome_key = str(int(biome_code))
+            else:
+                biome_key = str(biome_code).strip() if biome_code is not None else "Unknown"
+            
+            if verbose:
+                log.debug(f"🔍 Проверка биома: lat={lat}, lon={lon}, biome_code={biome_code!r}, type={type(biome_code)}, biome_key={biome_key!r}, eco_name={eco_name!r}")
+            
+            # Проверяем, есть ли ключ в BIOME_RISKS
+            if biome_key in risks_table:
+                risks = risks_table[biome_key]
+                if verbose:
+                    log.debug(f"✅ Найден биом: biome_key={biome_key!r}, eco_name={eco_name!r}, risk_level={risks['risk_level']}")
+            else:
+                risks = risks_table["Unknown"]
+                if verbose:
+                    log.debug(f"⚠️ Ключ не найден в BIOME_RISKS: biome_key={biome_key!r}, eco_name={eco_name!r}, возвращаем 'Unknown'")
+                    log.debug(f"📋 Доступные ключи BIOME_RISKS: {list(risks_table.keys())}")
+            
+            return {
+                "eco_name": eco_name,
+                "biome": biome_code,
+                "realm": realm,
+                "risk_level": risks["risk_level"],
+                "risk_description": risks["description"],
+                "risk_factors": risks["impact_factors"]
+            }
+        except Exception as e:
+            log.error(f"❌ Ошибка обработки biome_code: {biome_code}, error={e}")
+            return {
+                "eco_name": eco_name,
+                "biome": biome_code,
+                "realm": realm,
+                "risk_level": "unknown",
+                "risk_description": f"Ошибка обработки биома: {str(e)}",
+                "risk_factors": []
+            }
+
+    if verbose:
+        log.debug(f"❌ Биом не найден для lat={lat}, lon={lon}, предполагается океан")
     return {
         "eco_name": "Ocean",
         "biome": "99",
         "realm": "Oceanic",
-        "risk_level": BIOME_RISKS["99"]["risk_level"],
-        "risk_description": BIOME_RISKS["99"]["description"],
-        "risk_factors": BIOME_RISKS["99"]["impact_factors"]
+        "risk_level": risks_table["99"]["risk_level"],
+        "risk_description": risks_table["99"]["description"],
+        "risk_factors": risks_table["99"]["impact_factors"]
     }
 
 if __name__ == "__main__":
+    # В режиме debug модуль выполняется и в процессе-наблюдателе перезапуска werkzeug,
+    # опрос файлов нужен только в процессе, который обслуживает запросы
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        start_data_watch()
     app.run(debug=True, host='127.0.0.1', port=5000)
\ No newline at end of file
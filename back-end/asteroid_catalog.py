@@ -0,0 +1,333 @@
+import array
+import datetime
+import hashlib
+import json
+import os
+
+import numpy as np
+
+
+# Колоночное хранилище каталога NASA: вместо списка словарей — NumPy-массивы
+# по полям, хэш-индекс по нормализованному имени и отсортированные индексы
+# по дате, диаметру, скорости и расстоянию пролёта. Запросы фильтруются
+# и сортируются по индексам; словари строятся только для отдаваемой страницы.
+#
+# record(i) восстанавливает исходную запись: поля, которые не ложатся в колонки
+# (другой тип, отсутствие name/date/hazardous, неизвестные ключи), хранятся
+# отдельно в irregular.
+
+CATALOG_FORMAT = 1
+
+# Числовые поля записи -> имя колонки
+NUMERIC_FIELDS = (
+    ("estimated_diameter_m", "diameter"),
+    ("velocity_km_s", "velocity"),
+    ("miss_distance_km", "miss_distance"),
+    ("mass_kg", "mass"),
+)
+KNOWN_FIELDS = {"name", "date", "hazardous"} | {field for field, _ in NUMERIC_FIELDS}
+SORT_KEYS = ("date", "diameter", "velocity", "miss_distance")
+
+# Вид значения в числовой колонке
+ABSENT = 0
+FLOAT = 1
+INT = 2
+
+EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+
+def normalize_name(name):
+    # Та же нормализация, что и при поиске по имени в /api/asteroids/<name>
+    return name.lower().replace(" ", "")
+
+
+def name_hash(key):
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def parse_date(text):
+    # Дата YYYY-MM-DD -> дни от 1970-01-01; None, если строка в другом формате
+    if not isinstance(text, str):
+        return None
+    try:
+        date = datetime.date.fromisoformat(text)
+    except ValueError:
+        return None
+    if date.isoformat() != text:
+        return None
+    return date.toordinal() - EPOCH_ORDINAL
+
+
+def format_date(days):
+    return datetime.date.fromordinal(int(days) + EPOCH_ORDINAL).isoformat()
+
+
+class CatalogBuilder:
+    # Накопление записей по одной в компактных буферах (array/bytearray),
+    # без хранения самих словарей; build() строит индексы
+    def __init__(self):
+        self.name_blob = bytearray()
+        self.name_offsets = array.array("q", [0])
+        self.name_hashes = array.array("Q")
+        self.date = array.array("d")
+        self.hazardous = bytearray()
+        self.numeric = {column: array.array("d") for _, column in NUMERIC_FIELDS}
+        self.kinds = {column: bytearray() for _, column in NUMERIC_FIELDS}
+        self.irregular = {}
+
+    def __len__(self):
+        return len(self.hazardous)
+
+    def add(self, record):
+        i = len(self)
+        overrides = {}
+        absent = []
+
+        name = record.get("name")
+        if isinstance(name, str):
+            self.name_blob += name.encode("utf-8")
+        elif "name" in record:
+            overrides["name"] = name
+        else:
+            absent.append("name")
+        self.name_offsets.append(len(self.name_blob))
+        self.name_hashes.append(name_hash(normalize_name(name if isinstance(name, str) else "")))
+
+        days = parse_date(record.get("date"))
+        if days is None:
+            if "date" in record:
+                overrides["date"] = record["date"]
+            else:
+                absent.append("date")
+        self.date.append(float("nan") if days is None else days)
+
+        hazardous = record.get("hazardous")
+        if not isinstance(hazardous, bool):
+            if "hazardous" in record:
+                overrides["hazardous"] = hazardous
+            else:
+                absent.append("hazardous")
+        self.hazardous.append(1 if hazardous else 0)
+
+        for field, column in NUMERIC_FIELDS:
+            value = record.get(field)
+            kind = ABSENT
+            if field in record:
+                if isinstance(value, float):
+                    kind = FLOAT
+                elif isinstance(value, int) and not isinstance(value, bool) and abs(value) <= 2**53:
+                    kind = INT
+                else:
+                    overrides[field] = value
+            self.numeric[column].append(float(value) if kind != ABSENT else float("nan"))
+            self.kinds[column].append(kind)
+
+        for key, value in record.items():
+            if key not in KNOWN_FIELDS:
+                overrides[key] = value
+        if overrides or absent:
+            self.irregular[i] = (overrides, absent)
+
+    def build(self):
+        # Колонки — представления над буферами builder'а без копирования;
+        # после build() добавлять записи нельзя
+        columns = {
+            "name_blob": np.frombuffer(self.name_blob, dtype=np.uint8),
+            "name_offsets": np.frombuffer(self.name_offsets, dtype=np.int64),
+            "name_hash": np.frombuffer(self.name_hashes, dtype=np.uint64),
+            "date": np.frombuffer(self.date, dtype=np.float64),
+            "hazardous": np.frombuffer(self.hazardous, dtype=np.bool_),
+        }
+        for _, column in NUMERIC_FIELDS:
+            columns[column] = np.frombuffer(self.numeric[column], dtype=np.float64)
+            columns[f"{column}_kind"] = np.frombuffer(self.kinds[column], dtype=np.uint8)
+        build_indexes(columns)
+        return AsteroidCatalog(columns, self.irregular)
+
+
+def build_indexes(columns):
+    # Индексы строк: int32, если строк меньше 2^31
+    n = len(columns["hazardous"])
+    index_dtype = np.int32 if n < 2**31 else np.int64
+    columns["name_hash_order"] = np.argsort(columns["name_hash"], kind="stable").astype(index_dtype)
+    columns["name_hash_sorted"] = columns["name_hash"][columns["name_hash_order"]]
+    for key in SORT_KEYS:
+        # NaN (нет значения) оказываются в конце
+        order = np.argsort(columns[key], kind="stable").astype(index_dtype)
+        columns[f"order_{key}"] = order
+        columns[f"sorted_{key}"] = columns[key][order]
+
+
+class AsteroidCatalog:
+    def __init__(self, columns, irregular=None):
+        self.columns = columns
+        self.irregular = irregular or {}
+        self._count = len(columns["hazardous"])
+        self._valid = {key: int(np.count_nonzero(~np.isnan(columns[f"sorted_{key}"]))) for key in SORT_KEYS}
+        self._descending = {}
+
+    @classmethod
+    def from_records(cls, records):
+        builder = CatalogBuilder()
+        for record in records:
+            builder.add(record)
+        return builder.build()
+
+    def __len__(self):
+        return self._count
+
+    def name(self, i):
+        offsets = self.columns["name_offsets"]
+        return bytes(self.columns["name_blob"][offsets[i]:offsets[i + 1]]).decode("utf-8")
+
+    def record(self, i):
+        return self.records([int(i)])[0]
+
+    def records(self, rows=None):
+        # Записи строк rows (по умолчанию всех): колонки читаются срезами,
+        # словари собираются из готовых Python-списков
+        c = self.columns
+        rows = np.arange(self._count) if rows is None else np.asarray(rows, dtype=np.int64)
+        offsets = np.asarray(c["name_offsets"])
+        starts, stops = offsets[rows].tolist(), offsets[rows + 1].tolist()
+        blob = c["name_blob"]
+        low, high = (min(starts), max(stops)) if len(rows) else (0, 0)
+        if high - low <= 4 * sum(b - a for a, b in zip(starts, stops)) + 4096:
+            # Имена лежат рядом (страница подряд идущих строк): одно чтение из blob
+            text = bytes(blob[low:high])
+            names = [text[a - low:b - low].decode("utf-8") for a, b in zip(starts, stops)]
+        else:
+            names = [bytes(blob[a:b]).decode("utf-8") for a, b in zip(starts, stops)]
+        hazardous = c["hazardous"][rows].tolist()
+        dates = c["date"][rows].tolist()
+        numeric = [
+            (field, c[column][rows].tolist(), c[f"{column}_kind"][rows].tolist())
+            for field, column in NUMERIC_FIELDS
+        ]
+
+        result = []
+        for j, i in enumerate(rows.tolist()):
+            record = {"name": names[j], "hazardous": hazardous[j]}
+            if dates[j] == dates[j]:
+                record["date"] = format_date(dates[j])
+            for field, values, kinds in numeric:
+                kind = kinds[j]
+                if kind == FLOAT:
+                    record[field] = values[j]
+                elif kind == INT:
+                    record[field] = int(values[j])
+            extra = self.irregular.get(i)
+            if extra:
+                overrides, absent = extra
+                record.update(overrides)
+                for field in absent:
+                    record.pop(field, None)
+            result.append(record)
+        return result
+
+    def hazardous_rows(self):
+        return np.flatnonzero(self.columns["hazardous"])
+
+    def find(self, name):
+        # Первая (в порядке каталога) запись с тем же нормализованным именем
+        key = normalize_name(name)
+        h = np.uint64(name_hash(key))
+        sorted_hashes = self.columns["name_hash_sorted"]
+        start = np.searchsorted(sorted_hashes, h, side="left")
+        stop = np.searchsorted(sorted_hashes, h, side="right")
+        for i in sorted(self.columns["name_hash_order"][start:stop].tolist()):
+            candidate = self.record(i).get("name", "")
+            if isinstance(candidate, str) and normalize_name(candidate) == key:
+                return i
+        return None
+
+    def _order(self, sort):
+        # Порядок строк для sort ("date", "-diameter", ...; None — порядок каталога)
+        if sort is None:
+            return None
+        key = sort.lstrip("-")
+        order = self.columns[f"order_{key}"]
+        if not sort.startswith("-"):
+            return order
+        if key not in self._descending:
+            # По убыванию (равные — в порядке каталога), записи без значения по-прежнему в конце
+            self._descending[key] = np.argsort(-np.asarray(self.columns[key]), kind="stable").astype(order.dtype)
+        return self._descending[key]
+
+    def _range(self, key, low, high):
+        # Позиции [start, stop) в отсортированном индексе key для значений из [low, high]
+        if key not in SORT_KEYS:
+            raise ValueError(f"Фильтр по {key} не поддерживается")
+        sorted_values = self.columns[f"sorted_{key}"][:self._valid[key]]
+        start = 0 if low is None else int(np.searchsorted(sorted_values, low, side="left"))
+        stop = len(sorted_values) if high is None else int(np.searchsorted(sorted_values, high, side="right"))
+        return start, max(start, stop)
+
+    def query(self, hazardous=None, ranges=None, sort=None, limit=100, cursor=0):
+        # ranges: {колонка: (min, max)}, границы включительно, None — без границы.
+        # Возвращает (строки страницы, всего подходящих, следующий cursor или None);
+        # cursor — смещение в отфильтрованной и отсортированной выдаче.
+        # Равные значения идут в порядке каталога, записи без значения — в конце
+        c = self.columns
+        if sort is not None and sort.lstrip("-") not in SORT_KEYS:
+            raise ValueError(f"sort: ожидается одно из {', '.join(SORT_KEYS)} (с '-' для убывания)")
+        ranges = {key: self._range(key, low, high) for key, (low, high) in (ranges or {}).items()}
+
+        if not ranges and hazardous is None:
+            # Без фильтров страница — просто срез индекса
+            order = self._order(sort)
+            total = self._count
+            stop = min(cursor + limit, total)
+            rows = np.arange(cursor, stop) if order is None else order[cursor:stop]
+            return rows.tolist(), total, stop if stop < total else None
+
+        # Перебираем только самый узкий диапазон, остальные условия проверяем на нём
+        if ranges:
+            driver = min(ranges, key=lambda key: ranges[key][1] - ranges[key][0])
+            start, stop = ranges[driver]
+            matched = np.asarray(c[f"order_{driver}"][start:stop])
+            for key, (start, stop) in ranges.items():
+                if key != driver and len(matched):
+                    sorted_values = c[f"sorted_{key}"]
+                    values = c[key][matched]
+                    matched = matched[(values >= sorted_values[start]) & (values <= sorted_values[stop - 1])] if stop > start else matched[:0]
+            if hazardous is not None:
+                matched = matched[c["hazardous"][matched] == hazardous]
+        else:
+            driver = None
+            matched = np.flatnonzero(np.asarray(c["hazardous"]) == hazardous)
+
+        total = len(matched)
+        if sort is None:
+            matched = np.sort(matched)
+        elif sort != driver:
+            # Сортировка найденного: по значению, при равенстве — по номеру строки
+            values = c[sort.lstrip("-")][matched]
+            matched = matched[np.lexsort((matched, -values if sort.startswith("-") else values))]
+        rows = matched[cursor:cursor + limit]
+        next_cursor = cursor + limit if cursor + limit < total else None
+        return rows.tolist(), total, next_cursor
+
+    def save(self, directory):
+        for name, values in self.columns.items():
+            np.save(os.path.join(directory, f"{name}.npy"), values)
+        with open(os.path.join(directory, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({
+                "format": CATALOG_FORMAT,
+                "count": self._count,
+                "irregular": [[i, overrides, absent] for i, (overrides, absent) in self.irregular.items()],
+            }, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, directory):
+        # Колонки открываются через mmap и подгружаются с диска по мере обращения
+        with open(os.path.join(directory, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("format") != CATALOG_FORMAT:
+            return None
+        columns = {
+            entry[:-len(".npy")]: np.load(os.path.join(directory, entry), mmap_mode="r")
+            for entry in os.listdir(directory) if entry.endswith(".npy")
+        }
+        irregular = {i: (overrides, absent) for i, overrides, absent in meta["irregular"]}
+        return cls(columns, irregular)
@@ -0,0 +1,339 @@
+import argparse
+import datetime
+import http.client
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks.synthetic import (
+    make_asteroids, make_biomes_geojson, make_custom_asteroids, make_geo_results,
+)
+
+
+# Воспроизводимый бенчмарк API (app.py) на синтетических данных:
+#   startup — время импорта app в отдельном процессе: холодный старт (сборка снапшотов,
+#             перенос JSON-хранилищ в SQLite) и повторный с готовыми снапшотами;
+#   client  — последовательные запросы через Flask test client (без сети);
+#   load    — несколько потоков по HTTP к локальному многопоточному серверу werkzeug.
+# По каждому эндпоинту — p50/p90/p99 и пропускная способность. Результаты пишутся
+# в JSON (--output); с --baseline выводится сравнение с прошлым прогоном, и при
+# ухудшении больше --tolerance процесс завершается с кодом 1.
+#
+#   python benchmarks/bench_api.py --output base.json
+#   python benchmarks/bench_api.py --baseline base.json --output new.json
+STARTUP_PROBE = """
+import resource, sys, time
+sys.path.insert(0, {backend!r})
+t0 = time.perf_counter()
+import app
+print(time.perf_counter() - t0, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+CUSTOM_PAYLOAD = {"diameter": 120, "density": 3000, "velocity": 19, "angle": 45}
+
+
+def write_dataset(workdir, args):
+    # Исходные файлы в том виде, в каком их читает app.py при старте
+    files = {
+        "biomes.geojson": make_biomes_geojson(args.features, args.vertices, seed=args.seed),
+        "asteroids.json": make_asteroids(args.asteroids, seed=args.seed),
+        "custom_asteroids.json": make_custom_asteroids(args.custom, seed=args.seed),
+        "geo_result.json": make_geo_results(args.geo_results, seed=args.seed),
+    }
+    sizes = {}
+    for name, data in files.items():
+        path = os.path.join(workdir, name)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        sizes[name] = round(os.path.getsize(path) / 2**20, 2)
+    return sizes
+
+
+def measure_startup(workdir):
+    env = {**os.environ, "LOG_LEVEL": "WARNING"}
+    env.pop("PROFILE_SLOW_MS", None)
+    result = {}
+    for label in ("cold", "warm"):
+        out = subprocess.check_output(
+            [sys.executable, "-c", STARTUP_PROBE.format(backend=BACKEND_DIR)], cwd=workdir, env=env, text=True
+        )
+        elapsed, rss_kb = out.strip().splitlines()[-1].split()
+        result[f"{label}_s"] = round(float(elapsed), 4)
+        result[f"{label}_peak_rss_mb"] = round(int(rss_kb) / 1024, 1)
+    return result
+
+
+class TestClientTransport:
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, body=None):
+        response = self.client.open(path, method=method, json=body)
+        data = response.get_data()
+        response.close()
+        return response.status_code, data
+
+
+class HTTPTransport:
+    # Одно keep-alive соединение на поток (многопоточный сервер werkzeug отвечает по HTTP/1.1);
+    # соединение, закрытое сервером, открывается заново
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.connection = None
+
+    def request(self, method, path, body=None):
+        headers = {}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+        for attempt in range(2):
+            if self.connection is None:
+                self.connection = http.client.HTTPConnection(self.host, self.port, timeout=60)
+            try:
+                self.connection.request(method, path, body=payload, headers=headers)
+                response = self.connection.getresponse()
+                return response.status, response.read()
+            except (http.client.HTTPException, ConnectionError):
+                self.connection.close()
+                self.connection = None
+                if attempt:
+                    raise
+
+
+# Сценарии: call(метка, метод, путь, тело) выполняет запрос, замеряет его под меткой
+# и возвращает (статус, тело ответа)
+def scenario_geo(call, rng):
+    call("geo", "GET", f"/geo?lat={rng.uniform(-90, 90):.6f}&lon={rng.uniform(-180, 180):.6f}")
+
+
+def scenario_asteroids_all(call, rng):
+    call("asteroids_all", "GET", "/api/asteroids/all")
+
+
+def scenario_all_with_custom(call, rng):
+    call("all_with_custom", "GET", "/api/asteroids/all-with-custom")
+
+
+def scenario_custom_create_delete(call, rng):
+    status, body = call("custom_create", "POST", "/api/asteroids/custom",
+                        {"name": f"bench-{rng.getrandbits(32)}", **CUSTOM_PAYLOAD})
+    if status == 201:
+        asteroid_id = json.loads(body)["asteroid"]["id"]
+        call("custom_delete", "DELETE", f"/api/asteroids/custom/{asteroid_id}")
+
+
+# имя -> (сценарий, тяжёлый: отдаёт весь каталог, выполняется --heavy-requests раз)
+SCENARIOS = {
+    "geo": (scenario_geo, False),
+    "asteroids_all": (scenario_asteroids_all, True),
+    "all_with_custom": (scenario_all_with_custom, True),
+    "custom_create_delete": (scenario_custom_create_delete, False),
+}
+
+
+def run_scenario(make_transport, scenario, iterations, threads, seed):
+    # -> ({метка: [время запроса, с]}, {метка: число ошибок}, общее время прогона)
+    samples = {}
+    errors = {}
+    lock = threading.Lock()
+
+    def worker(n, count):
+        transport = make_transport()
+        rng = random.Random(seed * 1000 + n)
+
+        def call(label, method, path, body=None):
+            started = time.perf_counter()
+            try:
+                status, data = transport.request(method, path, body)
+            except Exception:
+                status, data = None, b""
+            elapsed = time.perf_counter() - started
+            with lock:
+                samples.setdefault(label, []).append(elapsed)
+                if status is None or status >= 400:
+                    errors[label] = errors.get(label, 0) + 1
+            return status, data
+
+        for _ in range(count):
+            scenario(call, rng)
+
+    per_thread = [iterations // threads + (1 if n < iterations % threads else 0) for n in range(threads)]
+    started = time.perf_counter()
+    workers = [threading.Thread(target=worker, args=(n, count)) for n, count in enumerate(per_thread)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    return samples, errors, time.perf_counter() - started
+
+
+def percentile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+def summarize(values, errors, wall):
+    ordered = sorted(values)
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+        "p90_ms": round(percentile(ordered, 90) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+        "throughput_rps": round(len(ordered) / wall, 1) if wall else 0.0,
+    }
+
+
+def run_phase(make_transport, args, threads, selected):
+    results = {}
+    for name in selected:
+        scenario, heavy = SCENARIOS[name]
+        iterations = args.heavy_requests if heavy else args.requests
+        # Прогрев: первый запрос строит кэши ответов и prepared-геометрии
+        run_scenario(make_transport, scenario, min(iterations, args.warmup), 1, args.seed + 1)
+        samples, errors, wall = run_scenario(make_transport, scenario, iterations, threads, args.seed)
+        results.update({label: summarize(values, errors.get(label, 0), wall) for label, values in samples.items()})
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# Сравнение с базовым прогоном: для задержек хуже — больше, для пропускной способности — меньше
+COMPARED = (("p50_ms", 1), ("p99_ms", 1), ("throughput_rps", -1))
+
+
+def compare(current, baseline, tolerance):
+    rows = []
+    for key in ("cold_s", "warm_s"):
+        if key in current["startup"] and key in baseline.get("startup", {}):
+            rows.append(("startup", key, baseline["startup"][key], current["startup"][key], 1))
+    for phase, endpoints in current["results"].items():
+        for endpoint, stats in endpoints.items():
+            old = baseline.get("results", {}).get(phase, {}).get(endpoint)
+            if old is None:
+                continue
+            for key, direction in COMPARED:
+                rows.append((f"{phase}/{endpoint}", key, old[key], stats[key], direction))
+
+    regressions = 0
+    print(f"\n{'':<34}{'metric':<16}{'baseline':>12}{'current':>12}{'change':>9}")
+    for name, key, old, new, direction in rows:
+        change = (new - old) / old if old else 0.0
+        worse = change * direction > tolerance
+        regressions += worse
+        print(f"{name:<34}{key:<16}{old:>12.3f}{new:>12.3f}{change:>+8.0%}{'  <-- regression' if worse else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк API на синтетических данных")
+    parser.add_argument("--features", type=int, default=300, help="полигонов в biomes.geojson")
+    parser.add_argument("--vertices", type=int, default=500, help="вершин на полигон")
+    parser.add_argument("--asteroids", type=int, default=20_000)
+    parser.add_argument("--custom", type=int, default=5_000, help="записей в custom_asteroids.json")
+    parser.add_argument("--geo-results", type=int, default=50_000, help="записей в geo_result.json")
+    parser.add_argument("--requests", type=int, default=500, help="итераций лёгких сценариев")
+    parser.add_argument("--heavy-requests", type=int, default=30, help="итераций сценариев со всем каталогом")
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--threads", type=int, default=8, help="потоков нагрузки в фазе load")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="через запятую: " + ", ".join(SCENARIOS))
+    parser.add_argument("--phases", default="client,load")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", help="каталог для данных (по умолчанию временный)")
+    parser.add_argument("--output", default="bench_api.json")
+    parser.add_argument("--baseline", help="JSON прошлого прогона для сравнения")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="допустимое ухудшение (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    selected = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in selected if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"неизвестные сценарии: {', '.join(unknown)}")
+    phases = [name.strip() for name in args.phases.split(",") if name.strip()]
+    output = os.path.abspath(args.output)
+    baseline_path = os.path.abspath(args.baseline) if args.baseline else None
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="api-bench-")
+    os.makedirs(workdir, exist_ok=True)
+    started = time.perf_counter()
+    sizes = write_dataset(workdir, args)
+    print(f"data in {workdir} ({time.perf_counter() - started:.1f}s): "
+          + ", ".join(f"{name} {size} MB" for name, size in sizes.items()))
+
+    startup = measure_startup(workdir)
+    print(f"startup  cold {startup['cold_s']:.2f}s ({startup['cold_peak_rss_mb']:.0f} MB)  "
+          f"warm {startup['warm_s']:.2f}s ({startup['warm_peak_rss_mb']:.0f} MB)")
+
+    # Сам app.py читает файлы относительно текущего каталога
+    os.chdir(workdir)
+    os.environ["LOG_LEVEL"] = "WARNING"
+    os.environ.pop("PROFILE_SLOW_MS", None)
+    import app as backend
+
+    results = {}
+    if "client" in phases:
+        results["client"] = run_phase(lambda: TestClientTransport(backend.app), args, 1, selected)
+    if "load" in phases:
+        from werkzeug.serving import make_server
+        server = make_server("127.0.0.1", 0, backend.app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            results["load"] = run_phase(lambda: HTTPTransport("127.0.0.1", server.server_port), args,
+                                        args.threads, selected)
+        finally:
+            server.shutdown()
+
+    report = {
+        "meta": {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "dataset": {"features": args.features, "vertices": args.vertices, "asteroids": args.asteroids,
+                        "custom": args.custom, "geo_results": args.geo_results, "seed": args.seed,
+                        "sizes_mb": sizes},
+            "requests": args.requests, "heavy_requests": args.heavy_requests, "threads": args.threads,
+        },
+        "startup": startup,
+        "results": results,
+    }
+
+    print(f"\n{'':<34}{'requests':>9}{'errors':>7}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'req/s':>10}")
+    for phase, endpoints in results.items():
+        for endpoint, stats in endpoints.items():
+            print(f"{phase + '/' + endpoint:<34}{stats['requests']:>9}{stats['errors']:>7}{stats['p50_ms']:>10.2f}"
+                  f"{stats['p90_ms']:>10.2f}{stats['p99_ms']:>10.2f}{stats['throughput_rps']:>10.1f}")
+
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\nresults: {output}")
+
+    if baseline_path:
+        with open(baseline_path, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        print(f"\n{regressions} regression(s) over {args.tolerance:.0%}")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from asteroid_catalog import AsteroidCatalog, parse_date
+
+
+# Поиск по имени и фильтрованная выборка: линейный проход по списку словарей
+# (как было в app.py) против колоночного AsteroidCatalog с индексами
+def make_records(n, seed=0):
+    rng = random.Random(seed)
+    return [
+        {
+            "name": f"({2000 + i % 500}) Synthetic {i}",
+            "date": f"20{rng.randint(10, 30)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "hazardous": rng.random() < 0.1,
+            "estimated_diameter_m": rng.uniform(5, 2000),
+            "velocity_km_s": rng.uniform(3, 40),
+            "miss_distance_km": rng.uniform(1e5, 7e7),
+        }
+        for i in range(n)
+    ]
+
+
+def timed(fn, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - started) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    records = make_records(args.n)
+    started = time.perf_counter()
+    catalog = AsteroidCatalog.from_records(records)
+    print(f"records={args.n}  catalog build={time.perf_counter() - started:.2f}s")
+
+    target = records[-1]["name"].upper()
+    key = target.lower().replace(" ", "")
+    linear, linear_t = timed(lambda: next(
+        (a for a in records if a.get("name", "").lower().replace(" ", "") == key), None), args.repeat)
+    indexed, indexed_t = timed(lambda: catalog.record(catalog.find(target)), args.repeat)
+    print(f"by name        linear={linear_t * 1000:9.2f} ms  catalog={indexed_t * 1000:9.3f} ms  "
+          f"same={linear == indexed}")
+
+    # hazardous=true, date_from=2025-01-01, min_diameter=500, sort=-diameter, limit=100
+    def linear_query():
+        rows = [a for a in records if a["hazardous"] and a["date"] >= "2025-01-01" and a["estimated_diameter_m"] >= 500]
+        rows.sort(key=lambda a: -a["estimated_diameter_m"])
+        return rows[:100]
+
+    def catalog_query():
+        rows, _, _ = catalog.query(
+            hazardous=True, ranges={"date": (parse_date("2025-01-01"), None), "diameter": (500, None)},
+            sort="-diameter", limit=100,
+        )
+        return catalog.records(rows)
+
+    linear, linear_t = timed(linear_query, args.repeat)
+    indexed, indexed_t = timed(catalog_query, args.repeat)
+    print(f"filtered page  linear={linear_t * 1000:9.2f} ms  catalog={indexed_t * 1000:9.3f} ms  "
+          f"same={linear == indexed}")
+
+
+if __name__ == "__main__":
+    main()
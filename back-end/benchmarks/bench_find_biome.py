@@ -0,0 +1,138 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import shapely
+from shapely.geometry import shape, Point
+
+from biome_index import BiomeIndex, build_lod
+from benchmarks.synthetic import make_biomes_geojson, random_points
+
+
+# Сравнение линейного перебора geom.contains с BiomeIndex (STRtree + prepared)
+# и с BiomeIndex с упрощёнными контурами (--lod): совпадение результатов,
+# задержка и число вершин, которые приходится просмотреть на один поиск
+def load_biomes(path):
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    else:
+        data = make_biomes_geojson()
+    return [
+        (shape(ft["geometry"]), ft["properties"].get("ECO_NAME"), ft["properties"].get("BIOME"), ft["properties"].get("REALM"))
+        for ft in data["features"]
+    ]
+
+
+def linear_locate(biomes, lat, lon):
+    point = Point(lon, lat)
+    for i, (geom, _, _, _) in enumerate(biomes):
+        if geom.contains(point):
+            return i
+    return None
+
+
+def boundary_points(biomes, n, spread, seed=1):
+    # Точки рядом с вершинами полигонов — худший случай для упрощённых контуров
+    rng = np.random.default_rng(seed)
+    coords = shapely.get_coordinates([geom for geom, _, _, _ in biomes])
+    picked = coords[rng.integers(0, len(coords), n)] + rng.uniform(-spread, spread, (n, 2))
+    return [(lat, lon) for lon, lat in picked.tolist()]
+
+
+def vertices_per_lookup(index, lat, lon):
+    # Повторяет логику BiomeIndex.locate, считая вершины проверенных контуров
+    point = Point(lon, lat)
+    total = 0
+    for i in index.candidates(point):
+        if index.inner is not None:
+            total += shapely.get_num_coordinates(index.inner[i])
+            if index.inner[i].contains(point):
+                return total
+            total += shapely.get_num_coordinates(index.outer[i])
+            if not index.outer[i].contains(point):
+                continue
+        total += shapely.get_num_coordinates(index.geoms[i])
+        if index.prepared[i].contains(point):
+            return total
+    return total
+
+
+def timed(fn, points):
+    # Прогревочный проход: prepared-геометрии строят свои индексы при первом обращении
+    for lat, lon in points:
+        fn(lat, lon)
+    samples = []
+    results = []
+    for lat, lon in points:
+        t0 = time.perf_counter()
+        results.append(fn(lat, lon))
+        samples.append((time.perf_counter() - t0) * 1e6)
+    return results, samples
+
+
+def report(label, samples):
+    if not samples:
+        print(f"{label:<22} n=0")
+        return
+    samples = sorted(samples)
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    print(f"{label:<22} n={len(samples):<6} p50={statistics.median(samples):9.1f} µs  p99={p99:9.1f} µs")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--geojson", help="путь к biomes.geojson (по умолчанию синтетические данные)")
+    parser.add_argument("--points", type=int, default=2000)
+    parser.add_argument("--lod", type=float, default=0.01, help="допуск упрощённых контуров, градусы")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    biomes = load_biomes(args.geojson)
+    t1 = time.perf_counter()
+    index = BiomeIndex(biomes)
+    t2 = time.perf_counter()
+    lod_index = BiomeIndex(biomes, lod=build_lod(biomes, args.lod))
+    t3 = time.perf_counter()
+    print(f"features={len(biomes)}  load={t1 - t0:.2f}s  index build={(t2 - t1) * 1000:.1f} ms  "
+          f"lod build={(t3 - t2) * 1000:.0f} ms")
+
+    points = random_points(args.points)
+    near = boundary_points(biomes, args.points, args.lod * 2)
+    linear, linear_t = timed(lambda lat, lon: linear_locate(biomes, lat, lon), points)
+    indexed, indexed_t = timed(index.locate, points)
+    lod, lod_t = timed(lod_index.locate, points)
+
+    # Корректность: LOD и индекс обязаны совпадать с точной проверкой везде,
+    # включая точки у самых границ и векторизованный путь
+    near_exact = [linear_locate(biomes, lat, lon) for lat, lon in near]
+    near_lod = [lod_index.locate(lat, lon) for lat, lon in near]
+    lats, lons = zip(*(points + near))
+    many = [None if i < 0 else i for i in lod_index.locate_many(lats, lons).tolist()]
+    mismatches = (
+        sum(1 for a, b in zip(linear, indexed) if a != b)
+        + sum(1 for a, b in zip(linear, lod) if a != b)
+        + sum(1 for a, b in zip(near_exact, near_lod) if a != b)
+        + sum(1 for a, b in zip(linear + near_exact, many) if a != b)
+    )
+    print(f"mismatches={mismatches} ({len(points)} random + {len(near)} near-boundary points)")
+
+    for name, samples in (("linear", linear_t), ("indexed", indexed_t), ("lod", lod_t)):
+        report(f"{name} land", [s for r, s in zip(linear, samples) if r is not None])
+        report(f"{name} ocean", [s for r, s in zip(linear, samples) if r is None])
+
+    for label, pts in (("random", points), ("near-boundary", near)):
+        exact_v = [vertices_per_lookup(index, lat, lon) for lat, lon in pts]
+        lod_v = [vertices_per_lookup(lod_index, lat, lon) for lat, lon in pts]
+        print(f"vertices/lookup {label:<14} exact mean={statistics.mean(exact_v):8.0f}  "
+              f"lod mean={statistics.mean(lod_v):8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from biome_index import BiomeIndex
+from geo_cache import QuantizedLRUCache
+from geo_store import GeoResultStore
+from benchmarks.bench_find_biome import load_biomes
+from benchmarks.synthetic import make_geo_results
+
+
+# Прогон координат из истории /geo через QuantizedLRUCache при разной точности
+# округления: доля попаданий, время на запрос и проверка, что ответ из кэша
+# совпадает с поиском по округлённой точке. История — из --history (по умолчанию
+# geo_result.json; также geo_results.db или JSON-массив в том же формате) или
+# синтетическая (--synthetic, --history-size записей).
+# --repeat повторяет историю несколько раз, --jitter-m добавляет к каждому клику
+# случайный сдвиг (как при повторном клике по тому же месту)
+def load_clicks(path, size, seed):
+    if path is None:
+        records = make_geo_results(size, seed)
+    elif path.endswith(".db"):
+        records, _ = GeoResultStore(path).page()
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            records = json.load(f)
+    return [(r["lat"], r["lon"]) for r in records if "lat" in r and "lon" in r]
+
+
+def replay(index, clicks, precision, max_entries):
+    cache = QuantizedLRUCache(precision, max_entries, ttl=None)
+    answers = []
+    started = time.perf_counter()
+    for lat, lon in clicks:
+        answers.append(cache.get(lat, lon, 0, index.locate))
+    elapsed = time.perf_counter() - started
+    mismatches = sum(1 for (lat, lon), a in zip(clicks, answers) if index.locate(*cache.quantize(lat, lon)) != a)
+    return cache.stats(), elapsed, mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--history", default=os.path.join(BACKEND_DIR, "geo_result.json"),
+                        help="geo_results.db или JSON-массив в формате geo_result.json")
+    parser.add_argument("--synthetic", action="store_true", help="синтетическая история вместо --history")
+    parser.add_argument("--history-size", type=int, default=2_000)
+    parser.add_argument("--geojson", help="путь к biomes.geojson (по умолчанию синтетические данные)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--jitter-m", type=float, default=5.0)
+    parser.add_argument("--max-entries", type=int, default=50_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    index = BiomeIndex(load_biomes(args.geojson))
+    history = load_clicks(None if args.synthetic else args.history, args.history_size, args.seed)
+    rng = random.Random(args.seed)
+    jitter = args.jitter_m / 111_320
+    clicks = []
+    for _ in range(args.repeat):
+        order = history[:]
+        rng.shuffle(order)
+        clicks += [(lat + rng.uniform(-jitter, jitter), lon + rng.uniform(-jitter, jitter)) for lat, lon in order]
+    print(f"history={len(history)} clicks  replayed={len(clicks)}  jitter={args.jitter_m} m")
+
+    # Без кэша: каждый клик — полный поиск
+    started = time.perf_counter()
+    for lat, lon in clicks:
+        index.locate(lat, lon)
+    uncached = time.perf_counter() - started
+    print(f"{'no cache':<14} {uncached / len(clicks) * 1e6:8.1f} µs/lookup")
+
+    for precision in (2, 3, 4, 5):
+        stats, elapsed, mismatches = replay(index, clicks, precision, args.max_entries)
+        print(f"precision={precision:<4} {elapsed / len(clicks) * 1e6:8.1f} µs/lookup  "
+              f"hit_rate={stats['hit_rate']:.3f}  size={stats['size']}  "
+              f"evictions={stats['evictions']}  mismatches={mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import argparse
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import impact_physics
+
+
+# Векторный impact_physics против прежнего цикла по записям
+def custom_loop(diameter, density, velocity, angle):
+    out = []
+    for d, rho, v, a in zip(diameter, density, velocity, angle):
+        radius = d / 2
+        volume = (4 / 3) * math.pi * (radius ** 3)
+        mass_kg = volume * rho
+        velocity_ms = v * 1000
+        ke = 0.5 * mass_kg * (velocity_ms ** 2)
+        crater = d * 20 * math.sin(a * math.pi / 180)
+        out.append((mass_kg, ke, crater, crater * 1.2, crater * 0.1, ke > 1e12))
+    return out
+
+
+def catalog_loop(diameter, velocity):
+    out = []
+    for d, v in zip(diameter, velocity):
+        mass = d**3 * 3000
+        ke = 0.5 * mass * (v * 1000)**2
+        crater = 1.3 * (ke / (2500 * 9.81))**0.25
+        out.append((mass, ke, crater, 1.2 * crater, 0.1 * crater))
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    diameter = rng.uniform(1, 2000, args.n)
+    density = rng.uniform(1000, 8000, args.n)
+    velocity = rng.uniform(11, 72, args.n)
+    angle = rng.uniform(5, 90, args.n)
+    lists = [c.tolist() for c in (diameter, density, velocity, angle)]
+
+    t0 = time.perf_counter()
+    loop = custom_loop(*lists)
+    t1 = time.perf_counter()
+    vec = impact_physics.impact_effects(diameter, density, velocity, angle)
+    t2 = time.perf_counter()
+    crater_loop = np.array([r[2] for r in loop])
+    max_rel = float(np.max(np.abs(vec["crater_diameter"] - crater_loop) / crater_loop))
+    print(f"custom  n={args.n}: loop {t1 - t0:.2f}s  vectorized {t2 - t1:.3f}s  "
+          f"x{(t1 - t0) / (t2 - t1):.0f}  max rel diff {max_rel:.1e}")
+
+    t0 = time.perf_counter()
+    loop = catalog_loop(lists[0], lists[2])
+    t1 = time.perf_counter()
+    mass = diameter**3 * 3000
+    vec = impact_physics.impact_effects(diameter, None, velocity, None, mass=mass,
+                                        crater_model=impact_physics.CRATER_MODEL_ENERGY)
+    t2 = time.perf_counter()
+    crater_loop = np.array([r[2] for r in loop])
+    max_rel = float(np.max(np.abs(vec["crater_diameter"] - crater_loop) / crater_loop))
+    print(f"catalog n={args.n}: loop {t1 - t0:.2f}s  vectorized {t2 - t1:.3f}s  "
+          f"x{(t1 - t0) / (t2 - t1):.0f}  max rel diff {max_rel:.1e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import argparse
+import datetime
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# Пропускная способность и пиковая RSS потоковой загрузки (neows_ingest.py)
+# на синтетической выгрузке NeoWs feed заданного размера. Выгрузка пишется
+# на диск потоково. С --compare-json-load для сравнения тот же файл читается
+# целиком через json.load (осторожно: на многогигабайтных файлах это десятки ГБ RAM)
+def make_neo(rng, i, day):
+    diameter = rng.uniform(5, 2000)
+    approaches = []
+    for k in range(rng.randint(1, 4)):
+        date = day if k == 0 else (datetime.date(2000, 1, 1) + datetime.timedelta(days=rng.randint(0, 20000))).isoformat()
+        approaches.append({
+            "close_approach_date": date,
+            "close_approach_date_full": f"{date} 12:00",
+            "epoch_date_close_approach": 1700000000000 + k,
+            "relative_velocity": {
+                "kilometers_per_second": f"{rng.uniform(3, 40):.10f}",
+                "kilometers_per_hour": f"{rng.uniform(1e4, 1.5e5):.10f}",
+                "miles_per_hour": f"{rng.uniform(1e4, 9e4):.10f}",
+            },
+            "miss_distance": {
+                "astronomical": f"{rng.uniform(0.001, 0.5):.10f}",
+                "lunar": f"{rng.uniform(1, 190):.10f}",
+                "kilometers": f"{rng.uniform(1e5, 7e7):.10f}",
+                "miles": f"{rng.uniform(1e5, 4e7):.10f}",
+            },
+            "orbiting_body": "Earth",
+        })
+    return {
+        "links": {"self": f"http://api.nasa.gov/neo/rest/v1/neo/{3000000 + i}?api_key=DEMO_KEY"},
+        "id": str(3000000 + i),
+        "neo_reference_id": str(3000000 + i),
+        "name": f"({2000 + i % 30} AB{i})",
+        "nasa_jpl_url": f"https://ssd.jpl.nasa.gov/tools/sbdb_lookup.html#/?sstr={3000000 + i}",
+        "absolute_magnitude_h": rng.uniform(15, 30),
+        "estimated_diameter": {
+            "kilometers": {"estimated_diameter_min": diameter * 0.9e-3, "estimated_diameter_max": diameter * 1.1e-3},
+            "meters": {"estimated_diameter_min": diameter * 0.9, "estimated_diameter_max": diameter * 1.1},
+            "miles": {"estimated_diameter_min": diameter * 0.56e-3, "estimated_diameter_max": diameter * 0.68e-3},
+            "feet": {"estimated_diameter_min": diameter * 2.95, "estimated_diameter_max": diameter * 3.6},
+        },
+        "is_potentially_hazardous_asteroid": rng.random() < 0.1,
+        "close_approach_data": approaches,
+        "is_sentry_object": False,
+    }
+
+
+def write_feed_dump(path, size_bytes, seed=0, per_day=500):
+    # {"links": ..., "element_count": N, "near_earth_objects": {"YYYY-MM-DD": [...], ...}}
+    rng = random.Random(seed)
+    count = 0
+    day = datetime.date(2024, 1, 1)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"links": {"self": "http://api.nasa.gov/neo/rest/v1/feed"}, "near_earth_objects": {')
+        first_day = True
+        while f.tell() < size_bytes:
+            f.write(("" if first_day else ", ") + json.dumps(day.isoformat()) + ": [")
+            f.write(", ".join(json.dumps(make_neo(rng, count + k, day.isoformat())) for k in range(per_day)))
+            f.write("]")
+            count += per_day
+            first_day = False
+            day += datetime.timedelta(days=1)
+        f.write('}, "element_count": %d}' % count)
+    return count
+
+
+def run(code, cwd):
+    out = subprocess.check_output([sys.executable, "-c", code], cwd=cwd, text=True)
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size-gb", type=float, default=2.0)
+    parser.add_argument("--dump", help="готовая выгрузка вместо синтетической")
+    parser.add_argument("--compare-json-load", action="store_true")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="ingest-bench-")
+    dump = args.dump
+    if dump is None:
+        dump = os.path.join(workdir, "feed.json")
+        started = time.perf_counter()
+        count = write_feed_dump(dump, int(args.size_gb * 2**30))
+        print(f"synthetic feed: {os.path.getsize(dump) / 2**30:.2f} GB, {count} NEOs, "
+              f"written in {time.perf_counter() - started:.0f}s")
+
+    stats = run(
+        "import json, sys\n"
+        f"sys.path.insert(0, {BACKEND_DIR!r})\n"
+        "from neows_ingest import ingest\n"
+        f"print(json.dumps(ingest([{os.path.abspath(dump)!r}], 'nasa_catalog')))\n",
+        workdir,
+    )
+    print(f"stream ingest  {stats['records']} records  {stats['elapsed_s']:.1f}s  "
+          f"{stats['mb_per_s']:.1f} MB/s  {stats['records_per_s']:,.0f} rec/s  "
+          f"peak RSS {stats['peak_rss_mb']:.0f} MB  skipped={stats['skipped']}")
+
+    if args.compare_json_load:
+        stats = run(
+            "import json, resource, time\n"
+            "t = time.perf_counter()\n"
+            f"data = json.load(open({os.path.abspath(dump)!r}, encoding='utf-8'))\n"
+            "print(json.dumps({'elapsed_s': time.perf_counter() - t,"
+            " 'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}))\n",
+            workdir,
+        )
+        print(f"json.load      {stats['elapsed_s']:.1f}s  peak RSS {stats['peak_rss_mb']:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
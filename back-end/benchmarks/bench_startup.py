@@ -0,0 +1,58 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks.synthetic import make_biomes_geojson
+
+
+# Время и пиковая RSS загрузки биомов: из GeoJSON и из бинарного снапшота.
+# Каждый замер — отдельный процесс, чтобы RSS не накапливалась
+PROBE = """
+import resource, sys, time
+sys.path.insert(0, {backend!r})
+t0 = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - t0
+print(elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def probe(code, cwd):
+    out = subprocess.check_output(
+        [sys.executable, "-c", PROBE.format(backend=BACKEND_DIR, code=code)], cwd=cwd, text=True
+    )
+    elapsed, rss_kb = out.strip().splitlines()[-1].split()
+    return float(elapsed), int(rss_kb) / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--features", type=int, default=850)
+    parser.add_argument("--vertices", type=int, default=2000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="startup-bench-")
+    path = os.path.join(workdir, "biomes.geojson")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(make_biomes_geojson(args.features, args.vertices), f)
+    print(f"biomes.geojson: {os.path.getsize(path) / 2**20:.0f} MB, {args.features} features")
+
+    geojson = probe("from biome_index import load_biomes; load_biomes('biomes.geojson')", workdir)
+    build = probe("from snapshot import load_biomes_cached; load_biomes_cached('biomes.geojson')", workdir)
+    cached = probe("from snapshot import load_biomes_cached; load_biomes_cached('biomes.geojson')", workdir)
+    baseline = probe("import snapshot", workdir)
+
+    print(f"{'':<18}{'time, s':>10}{'peak RSS, MB':>15}")
+    for label, (elapsed, rss) in (("imports only", baseline), ("geojson", geojson),
+                                  ("snapshot build", build), ("snapshot load", cached)):
+        print(f"{label:<18}{elapsed:>10.2f}{rss:>15.0f}")
+
+
+if __name__ == "__main__":
+    main()
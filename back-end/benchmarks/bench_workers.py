@@ -0,0 +1,161 @@
+import argparse
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks.bench_api import HTTPTransport, measure_startup, run_scenario, scenario_geo, summarize, write_dataset
+
+
+# Память и пропускная способность /geo при запуске через serve.py с разным числом
+# воркеров. Нагрузку дают несколько процессов (--load-procs) по --threads потоков,
+# чтобы генератор нагрузки не упирался в GIL. Память каждого процесса — из
+# /proc/<pid>/smaps_rollup: RSS, PSS (общие страницы делятся поровну между
+# процессами) и USS (только собственные страницы). С --compare-no-preload тот же
+# прогон повторяется, когда каждый воркер загружает данные сам.
+# Ускорение от числа воркеров ограничено числом ядер машины (см. cpus в выводе).
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def memory_mb(pid):
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup", "r") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].isdigit():
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return {
+        "rss_mb": round(fields.get("Rss", 0) / 1024, 1),
+        "pss_mb": round(fields.get("Pss", 0) / 1024, 1),
+        "uss_mb": round((fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)) / 1024, 1),
+    }
+
+
+def children(pid):
+    with open(f"/proc/{pid}/task/{pid}/children", "r") as f:
+        return [int(child) for child in f.read().split()]
+
+
+def wait_ready(port, workers, master, timeout=300):
+    transport = HTTPTransport("127.0.0.1", port)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if master.poll() is not None:
+            raise RuntimeError(f"serve.py завершился с кодом {master.returncode}")
+        try:
+            if transport.request("GET", "/geo?lat=0&lon=0")[0] == 200 and len(children(master.pid)) == workers:
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise TimeoutError("serve.py не ответил вовремя")
+
+
+def load_process(job):
+    port, iterations, threads, seed = job
+    samples, errors, _ = run_scenario(lambda: HTTPTransport("127.0.0.1", port), scenario_geo, iterations, threads, seed)
+    return samples.get("geo", []), errors.get("geo", 0)
+
+
+def run_load(port, requests, procs, threads, seed):
+    jobs = [(port, requests // procs + (1 if i < requests % procs else 0), threads, seed + i) for i in range(procs)]
+    started = time.perf_counter()
+    with ProcessPoolExecutor(procs) as pool:
+        parts = list(pool.map(load_process, jobs))
+    wall = time.perf_counter() - started
+    return summarize([t for samples, _ in parts for t in samples], sum(e for _, e in parts), wall)
+
+
+def measure(workdir, workers, preload, args):
+    port = free_port()
+    command = [sys.executable, os.path.join(BACKEND_DIR, "serve.py"), "--workers", str(workers), "--port", str(port)]
+    if not preload:
+        command.append("--no-preload")
+    env = {**os.environ, "LOG_LEVEL": "WARNING"}
+    env.pop("PROFILE_SLOW_MS", None)
+    master = subprocess.Popen(command, cwd=workdir, env=env)
+    try:
+        started = time.perf_counter()
+        wait_ready(port, workers, master)
+        ready_s = time.perf_counter() - started
+        # Прогрев: каждый воркер успевает обработать запросы, до замера памяти и скорости
+        run_load(port, workers * 50, args.load_procs, args.threads, args.seed + 100)
+        load = run_load(port, args.requests, args.load_procs, args.threads, args.seed)
+        worker_memory = [memory_mb(pid) for pid in children(master.pid)]
+        master_memory = memory_mb(master.pid)
+    finally:
+        master.send_signal(signal.SIGTERM)
+        master.wait(timeout=30)
+
+    def mean(key):
+        return round(sum(m[key] for m in worker_memory) / len(worker_memory), 1)
+
+    return {
+        "workers": workers,
+        "preload": preload,
+        "ready_s": round(ready_s, 2),
+        "geo": load,
+        "master": master_memory,
+        "worker_rss_mb": mean("rss_mb"),
+        "worker_pss_mb": mean("pss_mb"),
+        "worker_uss_mb": mean("uss_mb"),
+        # Вся память сервиса без двойного учёта общих страниц
+        "total_pss_mb": round(master_memory["pss_mb"] + sum(m["pss_mb"] for m in worker_memory), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RSS и пропускная способность /geo для serve.py")
+    parser.add_argument("--workers", default="1,4,8")
+    parser.add_argument("--features", type=int, default=850)
+    parser.add_argument("--vertices", type=int, default=1000)
+    parser.add_argument("--asteroids", type=int, default=200_000)
+    parser.add_argument("--custom", type=int, default=1_000)
+    parser.add_argument("--geo-results", type=int, default=10_000)
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--load-procs", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=8, help="потоков в каждом процессе нагрузки")
+    parser.add_argument("--compare-no-preload", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir")
+    parser.add_argument("--output", default="bench_workers.json")
+    args = parser.parse_args()
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="workers-bench-")
+    os.makedirs(workdir, exist_ok=True)
+    sizes = write_dataset(workdir, args)
+    print(f"data in {workdir}: " + ", ".join(f"{name} {size} MB" for name, size in sizes.items()))
+    # Снапшоты и перенос JSON в SQLite — один раз, до запуска воркеров
+    startup = measure_startup(workdir)
+    print(f"startup cold {startup['cold_s']:.2f}s, warm {startup['warm_s']:.2f}s  cpus={os.cpu_count()}")
+
+    results = []
+    print(f"\n{'mode':<11}{'workers':>8}{'req/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'master RSS':>12}"
+          f"{'worker RSS':>12}{'worker PSS':>12}{'worker USS':>12}{'total PSS':>11}")
+    for preload in (True, False) if args.compare_no_preload else (True,):
+        for workers in [int(n) for n in args.workers.split(",")]:
+            r = measure(workdir, workers, preload, args)
+            results.append(r)
+            print(f"{'preload' if preload else 'no-preload':<11}{workers:>8}{r['geo']['throughput_rps']:>9.0f}"
+                  f"{r['geo']['p50_ms']:>9.2f}{r['geo']['p99_ms']:>9.2f}{r['master']['rss_mb']:>12.0f}"
+                  f"{r['worker_rss_mb']:>12.0f}{r['worker_pss_mb']:>12.0f}{r['worker_uss_mb']:>12.0f}"
+                  f"{r['total_pss_mb']:>11.0f}")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"cpus": os.cpu_count(), "startup": startup, "dataset_mb": sizes, "results": results}, f, indent=2)
+    print(f"\nresults: {os.path.abspath(args.output)}")
+
+
+if __name__ == "__main__":
+    main()
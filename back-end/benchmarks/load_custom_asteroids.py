@@ -0,0 +1,57 @@
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+# Нагрузочный тест хранилища кастомных астероидов: пропускная способность
+# параллельных create/delete через Flask test client. Отсутствие потерянных
+# изменений проверяет tests/test_custom_asteroid_store.py.
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--per-thread", type=int, default=100)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="custom-load-")
+    os.chdir(workdir)
+    import app as backend
+
+    errors = []
+    payload = {"diameter": 100, "density": 3000, "velocity": 17, "angle": 45}
+
+    def worker(n):
+        client = backend.app.test_client()
+        for i in range(args.per_thread):
+            r = client.post("/api/asteroids/custom", json={"name": f"load-{n}-{i}", **payload})
+            if r.status_code != 201:
+                errors.append(("create", r.status_code))
+                continue
+            asteroid_id = r.get_json()["asteroid"]["id"]
+            # Каждый второй сразу удаляем
+            if i % 2:
+                r = client.delete(f"/api/asteroids/custom/{asteroid_id}")
+                if r.status_code != 200:
+                    errors.append(("delete", r.status_code))
+
+    t0 = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(args.threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+
+    ops = args.threads * args.per_thread * 1.5
+    print(f"threads={args.threads} ops={int(ops)} time={elapsed:.2f}s ({ops / elapsed:.0f} ops/s)")
+    print(f"errors={len(errors)} stored={len(backend.custom_store)}")
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import math
+import random
+
+
+# Синтетические данные для бенчмарков: "материки" из зубчатых полигонов
+# с заданным числом вершин, между ними остаются пустые ячейки ("океан").
+def make_biomes_geojson(n_features=850, vertices=2000, land_fraction=0.35, seed=42):
+    rng = random.Random(seed)
+    cols = max(1, int(math.ceil(math.sqrt(n_features / land_fraction * 2))))
+    rows = max(1, int(math.ceil(n_features / land_fraction / cols)))
+    cell_w = 360.0 / cols
+    cell_h = 180.0 / rows
+    cells = [(r, c) for r in range(rows) for c in range(cols)]
+    rng.shuffle(cells)
+
+    features = []
+    for i, (r, c) in enumerate(cells[:n_features]):
+        cx = -180 + (c + 0.5) * cell_w
+        cy = -90 + (r + 0.5) * cell_h
+        # Берег: несколько плавных гармоник плюс мелкий шум на каждой вершине
+        harmonics = [(rng.randint(2, 12), rng.uniform(0, 2 * math.pi), rng.uniform(0.02, 0.06)) for _ in range(4)]
+        ring = []
+        for k in range(vertices):
+            t = 2 * math.pi * k / vertices
+            jitter = 0.8 + sum(a * math.sin(f * t + p) for f, p, a in harmonics) + 0.005 * rng.random()
+            ring.append([
+                cx + math.cos(t) * cell_w / 2 * jitter,
+                cy + math.sin(t) * cell_h / 2 * jitter,
+            ])
+        ring.append(ring[0])
+        features.append({
+            "type": "Feature",
+            "properties": {
+                "ECO_NAME": f"Synthetic ecoregion {i}",
+                "BIOME": float(rng.randint(1, 14)),
+                "REALM": rng.choice(["AA", "AT", "IM", "NA", "NT", "OC", "PA"]),
+            },
+            "geometry": {"type": "Polygon", "coordinates": [ring]},
+        })
+    return {"type": "FeatureCollection", "features": features}
+
+
+def random_points(n, seed=0):
+    rng = random.Random(seed)
+    return [(rng.uniform(-90, 90), rng.uniform(-180, 180)) for _ in range(n)]
+
+
+def make_asteroids(n, seed=0):
+    # Записи в формате asteroids.json (поля, которые читает format_asteroid)
+    rng = random.Random(seed)
+    return [
+        {
+            "name": f"({2000 + i % 30}) Synthetic {i}",
+            "date": f"20{rng.randint(10, 30)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "hazardous": rng.random() < 0.1,
+            "estimated_diameter_m": rng.uniform(5, 2000),
+            "velocity_km_s": rng.uniform(3, 40),
+            "miss_distance_km": rng.uniform(1e5, 7e7),
+        }
+        for i in range(n)
+    ]
+
+
+def make_custom_asteroids(n, seed=0):
+    # Записи в формате старого custom_asteroids.json (как их создавал POST /api/asteroids/custom)
+    rng = random.Random(seed)
+    records = []
+    for i in range(n):
+        diameter = rng.uniform(10, 1000)
+        density = rng.choice([1500, 3000, 5000, 8000])
+        velocity = rng.uniform(11, 70)
+        mass = math.pi / 6 * diameter**3 * density
+        energy = 0.5 * mass * (velocity * 1000) ** 2
+        records.append({
+            "id": f"custom-{1700000000000 + i}",
+            "name": f"Custom {i}",
+            "diameter": diameter,
+            "density": density,
+            "velocity": velocity,
+            "angle": rng.uniform(15, 90),
+            "mass_kg": mass,
+            "kinetic_energy_joules": energy,
+            "crater_diameter": diameter * 14,
+            "ejecta_radius": diameter * 17,
+            "dust_height": diameter * 1.4,
+            "is_potentially_hazardous_asteroid": diameter > 140,
+            "created_at": f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T12:00:00",
+            "is_custom": True,
+        })
+    return records
+
+
+def make_geo_results(n, seed=0):
+    # Записи в формате старого geo_result.json: новые первыми, как их писал /geo
+    rng = random.Random(seed)
+    levels = ["low", "medium", "high", "extreme"]
+    return [
+        {
+            "lat": lat,
+            "lon": lon,
+            "eco_name": f"Synthetic ecoregion {rng.randint(0, 849)}",
+            "biome": str(rng.randint(1, 14)),
+            "realm": rng.choice(["AA", "AT", "IM", "NA", "NT", "OC", "PA"]),
+            "risk_level": rng.choice(levels),
+            "risk_description": "Синтетическая запись для бенчмарка.",
+            "risk_factors": rng.sample(["wildfires", "drought", "flooding", "soil erosion", "biodiversity loss"], 2),
+            "timestamp": f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:00:00",
+        }
+        for lat, lon in random_points(n, seed)
+    ]
@@ -0,0 +1,191 @@
+import bisect
+import json
+import logging
+
+import numpy as np
+import shapely
+from shapely import STRtree
+from shapely.geometry import Point, Polygon, shape
+from shapely.prepared import prep
+
+log = logging.getLogger(__name__)
+
+
+def normalize_biome_code(biome_code, eco_name=None):
+    # Преобразуем biome_code в строку без десятичной части
+    try:
+        if isinstance(biome_code, (int, float)):
+            return str(int(biome_code))
+        return str(biome_code).strip() if biome_code is not None else "Unknown"
+    except Exception as e:
+        log.error(f"❌ Ошибка преобразования BIOME для {eco_name}: {e}")
+        return "Unknown"
+
+
+def load_biomes(path):
+    # Читает GeoJSON экорегионов в список (geom, eco_name, biome_code, realm)
+    with open(path, "r", encoding="utf-8") as f:
+        biome_data = json.load(f)
+
+    biomes = []
+    for feature in biome_data["features"]:
+        geom = shape(feature["geometry"])
+        eco_name = feature["properties"].get("ECO_NAME", "Unknown")
+        biome_code = normalize_biome_code(feature["properties"].get("BIOME", "Unknown"), eco_name)
+        realm = feature["properties"].get("REALM", "Unknown")
+        biomes.append((geom, eco_name, biome_code, realm))
+    return biomes
+
+
+def build_lod(biomes, tolerance):
+    # inner = упростить(сжать полигон на tolerance), outer = упростить(расширить на tolerance).
+    # Дуги буфера аппроксимируются двумя хордами на четверть круга, что съедает не больше
+    # 8% запаса (1 - cos 22.5°), а упрощение с допуском tolerance/2 сдвигает границу
+    # меньше оставшегося запаса, поэтому inner ⊂ geom ⊂ outer: точка в inner точно
+    # внутри полигона, вне outer — точно снаружи.
+    geoms = np.array([geom for geom, _, _, _ in biomes], dtype=object)
+    valid = shapely.is_valid(geoms)
+    inner = shapely.simplify(shapely.buffer(geoms, -tolerance, quad_segs=2), tolerance / 2, preserve_topology=True)
+    outer = shapely.simplify(shapely.buffer(geoms, tolerance, quad_segs=2), tolerance / 2, preserve_topology=True)
+    # Для невалидных полигонов буфер ненадёжен: только bounding box как внешний контур
+    inner[~valid] = Polygon()
+    outer[~valid] = shapely.envelope(shapely.buffer(shapely.envelope(geoms[~valid]), tolerance))
+    return inner, outer
+
+
+# Пространственный индекс над списком биомов (geom, eco_name, biome_code, realm).
+# STRtree отсекает полигоны по bounding box, prepared-геометрии ускоряют
+# точную проверку contains для оставшихся кандидатов.
+# Необязательный растр (см. biome_raster.py) отвечает на большинство запросов
+# одним обращением к массиву, точная проверка нужна только для пограничных ячеек.
+# lod — пара массивов (inner, outer) из build_lod: упрощённые внутренний
+# ("точно внутри") и внешний ("возможно внутри") контуры каждого полигона.
+# Счётчики поисков и проверенных полигонов (для /metrics) обновляются без блокировки,
+# при параллельных запросах часть инкрементов может теряться.
+TESTS_BUCKETS = (0, 1, 2, 4, 8, 16, 32, 64)
+
+
+class BiomeIndex:
+    def __init__(self, biomes, raster=None, lod=None):
+        self.biomes = biomes
+        self.raster = raster
+        geoms = [geom for geom, _, _, _ in biomes]
+        self.geoms = np.array(geoms, dtype=object)
+        self.tree = STRtree(geoms) if geoms else None
+        self.prepared = [prep(geom) for geom in geoms]
+        self.lookups = 0
+        self.raster_hits = 0
+        self.polygon_tests = 0
+        # Распределение числа проверенных полигонов на поиск по границам TESTS_BUCKETS (+ выше всех)
+        self.tests_histogram = [0] * (len(TESTS_BUCKETS) + 1)
+        self.inner = self.outer = None
+        if lod is not None and geoms:
+            self.inner, self.outer = lod
+            shapely.prepare(self.inner)
+            shapely.prepare(self.outer)
+            shapely.prepare(self.geoms)
+
+    def warm(self):
+        # prepared-геометрии строят внутренний индекс при первой проверке точки;
+        # warm() делает это сразу для всех полигонов (и упрощённых контуров), чтобы
+        # процессы, запущенные через fork (serve.py), разделяли готовые индексы, а не строили свои
+        if self.tree is None:
+            return
+        for geoms in (self.geoms, self.inner, self.outer):
+            if geoms is not None:
+                shapely.prepare(geoms)
+                shapely.contains(geoms, shapely.point_on_surface(geoms))
+
+    def stats(self):
+        return {
+            "lookups": self.lookups,
+            "raster_hits": self.raster_hits,
+            "polygon_tests": self.polygon_tests,
+            "tests_histogram": list(self.tests_histogram),
+        }
+
+    def __len__(self):
+        return len(self.biomes)
+
+    def candidates(self, point):
+        # Индексы полигонов, чей bounding box содержит точку, в порядке списка biomes
+        if self.tree is None:
+            return []
+        return sorted(int(i) for i in self.tree.query(point))
+
+    def locate(self, lat: float, lon: float):
+        # Возвращает индекс первого полигона (в порядке biomes), содержащего точку,
+        # т.е. тот же результат, что и линейный перебор geom.contains(point)
+        self.lookups += 1
+        if self.raster is not None:
+            code = self.raster.lookup(lat, lon)
+            if code != self.raster.MIXED:
+                self.raster_hits += 1
+                self.tests_histogram[0] += 1
+                return code - 1 if code != self.raster.OCEAN else None
+        point = Point(lon, lat)
+        found = None
+        tests = 0
+        for i in self.candidates(point):
+            tests += 1
+            if self.inner is not None:
+                # Дешёвые контуры решают всё, кроме узкой полосы у границы
+                if self.inner[i].contains(point):
+                    found = i
+                    break
+                if not self.outer[i].contains(point):
+                    continue
+            if self.prepared[i].contains(point):
+                found = i
+                break
+        self.polygon_tests += tests
+        self.tests_histogram[bisect.bisect_left(TESTS_BUCKETS, tests)] += 1
+        return found
+
+    def locate_many(self, lats, lons):
+        # Векторизованный вариант locate: один запрос к STRtree для всех точек.
+        # Возвращает массив индексов полигонов, -1 там, где точка ни в один не попала
+        lats = np.asarray(lats, dtype=float)
+        lons = np.asarray(lons, dtype=float)
+        self.lookups += len(lats)
+        if self.raster is not None:
+            codes = self.raster.lookup_many(lats, lons)
+            mixed = codes == self.raster.MIXED
+            resolved = len(lats) - int(np.count_nonzero(mixed))
+            self.raster_hits += resolved
+            self.tests_histogram[0] += resolved
+            result = codes.astype(np.int64) - 1
+            result[mixed] = self._locate_many_exact(lats[mixed], lons[mixed])
+            return result
+        return self._locate_many_exact(lats, lons)
+
+    def _count_tests(self, n, point_idx):
+        # Учёт проверок пакетного поиска: кандидатов по bounding box на каждую точку
+        per_point = np.bincount(point_idx, minlength=n)
+        self.polygon_tests += int(per_point.sum())
+        slots = np.searchsorted(TESTS_BUCKETS, per_point, side="left")
+        for slot, count in enumerate(np.bincount(slots, minlength=len(self.tests_histogram)).tolist()):
+            self.tests_histogram[slot] += count
+
+    def _locate_many_exact(self, lats, lons):
+        result = np.full(len(lats), -1, dtype=np.int64)
+        if self.tree is None or len(lats) == 0:
+            return result
+        points = shapely.points(lons, lats)
+        if self.inner is not None:
+            point_idx, geom_idx = self.tree.query(points)
+            self._count_tests(len(lats), point_idx)
+            hit = shapely.contains(self.inner[geom_idx], points[point_idx])
+            maybe = ~hit & shapely.contains(self.outer[geom_idx], points[point_idx])
+            hit[maybe] = shapely.contains(self.geoms[geom_idx[maybe]], points[point_idx[maybe]])
+            point_idx, geom_idx = point_idx[hit], geom_idx[hit]
+        else:
+            self._count_tests(len(lats), self.tree.query(points)[0])
+            # predicate="within": точка внутри полигона <=> geom.contains(point)
+            point_idx, geom_idx = self.tree.query(points, predicate="within")
+        # Как и при линейном переборе, выигрывает первый полигон в порядке biomes
+        first = np.full(len(lats), len(self.biomes), dtype=np.int64)
+        np.minimum.at(first, point_idx, geom_idx)
+        hit = first < len(self.biomes)
+        result[hit] = first[hit]
+        return result
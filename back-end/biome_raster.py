@@ -0,0 +1,248 @@
+import argparse
+import json
+import logging
+import math
+import os
+import tempfile
+import time
+
+import numpy as np
+import shapely
+
+from biome_index import BiomeIndex
+from snapshot import file_hash, load_biomes_cached
+
+log = logging.getLogger(__name__)
+
+
+# Глобальная растровая таблица lat/lon -> индекс полигона биома для O(1) поиска.
+# Значение ячейки: 0 — ни один полигон не пересекает ячейку (океан),
+# MIXED — ячейка на границе (нужна точная проверка), иначе индекс полигона + 1.
+# Ячейка получает индекс i, только если полигон i строго содержит её целиком
+# и он первый (в порядке biomes) из всех пересекающих ячейку полигонов —
+# тогда ответ совпадает с точной проверкой для любой точки ячейки.
+
+OCEAN = 0
+MIXED = np.iinfo(np.uint16).max
+DEFAULT_RESOLUTION = 0.05
+# Ячейки расширяются на EPSILON градусов, чтобы округление при вычислении
+# номера ячейки не могло увести точку за её границу
+EPSILON = 1e-9
+# Размер стартового блока квадродерева (в ячейках, степень двойки)
+TOP_BLOCK_CELLS = 256
+
+
+def grid_shape(resolution):
+    # (rows, cols) сетки: ячейка (row, col) — [row * resolution - 90, (row + 1) * resolution - 90]
+    # по широте и так же по долготе от -180. Последние строка и столбец выходят за 90/180,
+    # если resolution не делит 180 нацело, — так покрыт весь диапазон координат
+    if not 0 < resolution <= 180:
+        raise ValueError("resolution должен быть в (0, 180]")
+    return math.ceil(180 / resolution - EPSILON), math.ceil(360 / resolution - EPSILON)
+
+
+class BiomeRaster:
+    OCEAN = OCEAN
+    MIXED = MIXED
+
+    def __init__(self, grid, resolution, source_hash=None):
+        self.grid = grid
+        self.resolution = resolution
+        self.source_hash = source_hash
+        self.rows, self.cols = grid.shape
+
+    @classmethod
+    def load(cls, path):
+        with open(path + ".json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        grid = np.load(path, mmap_mode="r")
+        if grid.shape != grid_shape(meta["resolution"]):
+            # Растр построен с другой геометрией сетки (старой версией build) — нужен build заново
+            raise ValueError(f"размер сетки {grid.shape} не соответствует resolution {meta['resolution']}")
+        return cls(grid, meta["resolution"], meta.get("source_hash"))
+
+    def save(self, path):
+        # Оба файла пишутся во временные рядом с path и подменяются через os.replace:
+        # читатель видит либо старый, либо новый файл целиком
+        meta = {
+            "resolution": self.resolution,
+            "rows": self.rows,
+            "cols": self.cols,
+            "source_hash": self.source_hash,
+        }
+        _replace_atomic(path, lambda f: np.save(f, np.asarray(self.grid)))
+        _replace_atomic(path + ".json", lambda f: f.write(json.dumps(meta).encode("utf-8")))
+
+    def lookup(self, lat, lon):
+        # Код ячейки для одной точки; точки вне диапазона — MIXED (точная проверка)
+        if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+            return MIXED
+        row = min(int((lat + 90) / self.resolution), self.rows - 1)
+        col = min(int((lon + 180) / self.resolution), self.cols - 1)
+        return int(self.grid[row, col])
+
+    def lookup_many(self, lats, lons):
+        lats = np.asarray(lats, dtype=float)
+        lons = np.asarray(lons, dtype=float)
+        codes = np.full(len(lats), MIXED, dtype=np.uint16)
+        valid = (lats >= -90) & (lats <= 90) & (lons >= -180) & (lons <= 180)
+        rows = np.minimum(((lats[valid] + 90) / self.resolution).astype(np.int64), self.rows - 1)
+        cols = np.minimum(((lons[valid] + 180) / self.resolution).astype(np.int64), self.cols - 1)
+        codes[valid] = self.grid[rows, cols]
+        return codes
+
+    def stats(self):
+        grid = np.asarray(self.grid)
+        total = grid.size
+        ocean = int(np.count_nonzero(grid == OCEAN))
+        mixed = int(np.count_nonzero(grid == MIXED))
+        return {
+            "resolution": self.resolution,
+            "cells": total,
+            "ocean_fraction": ocean / total,
+            "mixed_fraction": mixed / total,
+            "pure_fraction": (total - ocean - mixed) / total,
+        }
+
+
+def _replace_atomic(path, write):
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), prefix=os.path.basename(path) + ".")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def build_raster(biomes, resolution=DEFAULT_RESOLUTION, source_hash=None, progress=None):
+    # Квадродерево по уровням: для всех блоков уровня одним запросом к STRtree
+    # находим пересекающие полигоны, решённые блоки заливаем, остальные делим на 4
+    if len(biomes) >= MIXED - 1:
+        raise ValueError(f"Слишком много полигонов для uint16: {len(biomes)}")
+    rows, cols = grid_shape(resolution)
+    grid = np.full((rows, cols), MIXED, dtype=np.uint16)
+
+    geoms = np.array([geom for geom, _, _, _ in biomes], dtype=object)
+    shapely.prepare(geoms)
+    tree = shapely.STRtree(geoms)
+
+    size = TOP_BLOCK_CELLS
+    r0, c0 = np.meshgrid(np.arange(0, rows, size), np.arange(0, cols, size), indexing="ij")
+    r0, c0 = r0.ravel(), c0.ravel()
+    while len(r0):
+        r1 = np.minimum(r0 + size, rows)
+        c1 = np.minimum(c0 + size, cols)
+        boxes = shapely.box(
+            c0 * resolution - 180 - EPSILON, r0 * resolution - 90 - EPSILON,
+            c1 * resolution - 180 + EPSILON, r1 * resolution - 90 + EPSILON,
+        )
+        block_idx, geom_idx = tree.query(boxes, predicate="intersects")
+
+        first = np.full(len(boxes), len(geoms), dtype=np.int64)
+        np.minimum.at(first, block_idx, geom_idx)
+        ocean = first == len(geoms)
+
+        candidates = np.flatnonzero(~ocean)
+        pure = np.zeros(len(boxes), dtype=bool)
+        if len(candidates):
+            pure[candidates] = shapely.contains_properly(geoms[first[candidates]], boxes[candidates])
+
+        values = np.where(ocean, OCEAN, first + 1)
+        if size == 1:
+            decided = ocean | pure
+            grid[r0[decided], c0[decided]] = values[decided]
+        else:
+            for i in np.flatnonzero(ocean | pure):
+                grid[r0[i]:r1[i], c0[i]:c1[i]] = values[i]
+
+        undecided = ~(ocean | pure)
+        if progress:
+            progress(size, int(np.count_nonzero(undecided)))
+        if size == 1:
+            # Оставшиеся ячейки пересекают границу — остаются MIXED
+            break
+        half = size // 2
+        r0, c0 = r0[undecided], c0[undecided]
+        r0 = np.concatenate([r0, r0, r0 + half, r0 + half])
+        c0 = np.concatenate([c0, c0 + half, c0, c0 + half])
+        keep = (r0 < rows) & (c0 < cols)
+        r0, c0 = r0[keep], c0[keep]
+        size = half
+
+    return BiomeRaster(grid, resolution, source_hash)
+
+
+def load_raster_for(path, source_hash):
+    # Растр используется, только если он построен по текущему biomes.geojson
+    if not os.path.exists(path):
+        return None
+    try:
+        raster = BiomeRaster.load(path)
+    except Exception as e:
+        log.warning(f"Could not load {path}: {e}")
+        return None
+    if raster.source_hash != source_hash:
+        log.warning(f"{path} построен для другой версии биомов, растр не используется")
+        return None
+    return raster
+
+
+def accuracy_report(biomes, raster, points=100_000, seed=0):
+    # Сравнение поиска через растр с точным find_biome на случайных точках
+    rng = np.random.default_rng(seed)
+    lats = np.degrees(np.arcsin(rng.uniform(-1, 1, points)))
+    lons = rng.uniform(-180, 180, points)
+
+    exact_index = BiomeIndex(biomes)
+    raster_index = BiomeIndex(biomes, raster=raster)
+
+    started = time.perf_counter()
+    exact = [exact_index.locate(lat, lon) for lat, lon in zip(lats.tolist(), lons.tolist())]
+    exact_time = time.perf_counter() - started
+    started = time.perf_counter()
+    fast = [raster_index.locate(lat, lon) for lat, lon in zip(lats.tolist(), lons.tolist())]
+    raster_time = time.perf_counter() - started
+
+    codes = raster.lookup_many(lats, lons)
+    return {
+        **raster.stats(),
+        "points": points,
+        "mismatches": sum(1 for a, b in zip(exact, fast) if a != b),
+        "resolved_by_raster": float(np.count_nonzero(codes != MIXED)) / points,
+        "exact_us_per_lookup": exact_time / points * 1e6,
+        "raster_us_per_lookup": raster_time / points * 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Растровая таблица биомов")
+    parser.add_argument("command", choices=["build", "report"])
+    parser.add_argument("--biomes", default="biomes.geojson")
+    parser.add_argument("--output", default="biome_raster.npy")
+    parser.add_argument("--resolution", type=float, default=DEFAULT_RESOLUTION)
+    parser.add_argument("--points", type=int, default=100_000)
+    args = parser.parse_args()
+
+    biomes = load_biomes_cached(args.biomes)
+    source_hash = file_hash(args.biomes)
+
+    if args.command == "build":
+        started = time.perf_counter()
+        raster = build_raster(
+            biomes, args.resolution, source_hash,
+            progress=lambda size, left: print(f"блок {size}: нерешённых {left}")
+        )
+        raster.save(args.output)
+        print(f"✅ {args.output}: {raster.rows}x{raster.cols}, {time.perf_counter() - started:.1f} с")
+        print(json.dumps(raster.stats(), indent=2))
+    else:
+        raster = load_raster_for(args.output, source_hash)
+        if raster is None:
+            raise SystemExit(f"❌ {args.output} не найден или устарел, сначала выполните build")
+        print(json.dumps(accuracy_report(biomes, raster, args.points), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# Обновленный словарь климатических рисков
+BIOME_RISKS = {
+    # Тропические и субтропические леса
+    "1": {
+        "risk_level": "high",
+        "description": "Удар усугубит потерю биоразнообразия, засуху и сдвиги в растительности. Глобальное охлаждение от пыли может вызвать массовую гибель растений.",
+        "impact_factors": ["biodiversity loss", "drought", "ecosystem collapse", "deforestation"]
+    },
+    "2": {
+        "risk_level": "medium",
+        "description": "Сухие лиственные леса уязвимы к пожарам и эрозии почвы. Удар может вызвать опустынивание и потерю плодородного слоя.",
+        "impact_factors": ["fires", "soil erosion", "desertification", "habitat loss"]
+    },
+    "3": {
+        "risk_level": "medium",
+        "description": "Хвойные леса чувствительны к температурным изменениям и пожарам. Удар может нарушить водный баланс региона.",
+        "impact_factors": ["temperature changes", "fires", "water cycle disruption"]
+    },
+    # Умеренные леса
+    "4": {
+        "risk_level": "medium",
+        "description": "Увеличение вредителей и болезней, изменения в осадках. Астероидный удар добавит пожары и эрозию почвы.",
+        "impact_factors": ["pests and diseases", "fires", "soil erosion", "biodiversity loss"]
+    },
+    "5": {
+        "risk_level": "low",
+        "description": "Относительно устойчивые экосистемы. Основные риски - локальные пожары и изменения микроклимата.",
+        "impact_factors": ["local fires", "microclimate changes"]
+    },
+    # Засушливые регионы
+    "6": {
+        "risk_level": "low",
+        "description": "Пустынные экосистемы более устойчивы к ударам. Основной риск - долгосрочные пылевые бури.",
+        "impact_factors": ["dust storms", "temperature extremes"]
+    },
+    "7": {
+        "risk_level": "medium",
+        "description": "Полупустыни уязвимы к опустыниванию. Удар может разрушить хрупкий почвенный покров.",
+        "impact_factors": ["desertification", "soil degradation", "dust storms"]
+    },
+    # Затопленные луга
+    "8": {
+        "risk_level": "high",
+        "description": "Затопленные экосистемы критически важны для водного баланса. Удар может вызвать цунами и засоление почв.",
+        "impact_factors": ["tsunamis", "soil salinization", "wetland destruction"]
+    },
+    "9": {
+        "risk_level": "medium",
+        "description": "Речные экосистемы чувствительны к изменениям гидрологического режима.",
+        "impact_factors": ["flooding", "river ecosystem disruption"]
+    },
+    # Горные биомы
+    "10": {
+        "risk_level": "high",
+        "description": "Горные экосистемы уязвимы к оползням и изменениям ледникового покрова.",
+        "impact_factors": ["landslides", "glacial melt", "avalanches"]
+    },
+    # Полярные регионы
+    "11": {
+        "risk_level": "critical",
+        "description": "Таяние permafrost от пожаров и потепления, высвобождение метана. Удар ускорит климатические изменения.",
+        "impact_factors": ["permafrost melt", "methane release", "sea level rise", "global warming"]
+    },
+    "12": {
+        "risk_level": "high",
+        "description": "Тундровые экосистемы крайне чувствительны. Удар может вызвать необратимые изменения.",
+        "impact_factors": ["permafrost degradation", "ecosystem collapse", "arctic amplification"]
+    },
+    # Средиземноморские регионы
+    "13": {
+        "risk_level": "medium",
+        "description": "Пожароопасные экосистемы. Удар увеличит риск масштабных лесных пожаров.",
+        "impact_factors": ["wildfires", "soil erosion", "biodiversity loss"]
+    },
+    # Океанические зоны
+    "14": {
+        "risk_level": "high",
+        "description": "Мангровые леса критически важны для береговой защиты. Удар может вызвать цунами и разрушение экосистемы.",
+        "impact_factors": ["tsunamis", "coastal erosion", "ecosystem collapse"]
+    },
+    "99": {
+        "risk_level": "medium",
+        "description": "Океанические экосистемы. Риск цунами, изменения кислотности океана, нарушение морских пищевых цепей.",
+        "impact_factors": ["tsunamis", "ocean acidification", "marine ecosystem disruption"]
+    },
+    # Сельскохозяйственные земли
+    "15": {
+        "risk_level": "high",
+        "description": "Сельскохозяйственные земли критически важны для продовольственной безопасности. Удар может вызвать глобальный продовольственный кризис.",
+        "impact_factors": ["food security crisis", "soil contamination", "crop failure"]
+    },
+    # Городские территории
+    "16": {
+        "risk_level": "critical",
+        "description": "Удар по городской территории вызовет массовые разрушения, пожары и гуманитарный кризис.",
+        "impact_factors": ["mass destruction", "fires", "humanitarian crisis", "infrastructure collapse"]
+    },
+    "Unknown": {
+        "risk_level": "unknown",
+        "description": "Нет данных о рисках для этого типа биома.",
+        "impact_factors": []
+    }
+}
@@ -0,0 +1,114 @@
+import json
+import sqlite3
+from datetime import datetime
+
+from sqlite_store import SQLiteStore
+
+
+# Хранилище кастомных астероидов: все записи держатся в памяти (индекс id -> запись),
+# изменения сначала фиксируются в SQLite, потом применяются в памяти.
+# Запись сериализуется блокировкой, между процессами (serve.py) — блокировкой записи SQLite.
+# Изменения, сделанные другими процессами, видны по PRAGMA data_version: если она
+# изменилась, записи в памяти перечитываются из базы перед следующим обращением.
+class CustomAsteroidStore(SQLiteStore):
+    def __init__(self, db_path, legacy_json_path=None):
+        super().__init__(db_path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS custom_asteroids ("
+            " seq INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " id TEXT NOT NULL UNIQUE,"
+            " data TEXT NOT NULL)"
+        )
+        self._conn.commit()
+        if legacy_json_path:
+            self.migrate_json(legacy_json_path)
+        # Увеличивается при каждом изменении — по нему инвалидируются кэши ответов
+        self._version = 0
+        self._data_version = None
+        self._by_id = {}
+        with self._lock:
+            self._sync()
+
+    def _reopened(self):
+        self._data_version = None
+        self._sync()
+
+    def _sync(self):
+        # Вызывается под блокировкой: перечитывает записи, если базу изменило другое соединение
+        data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if data_version == self._data_version:
+            return
+        by_id = {}
+        for (data,) in self._conn.execute("SELECT data FROM custom_asteroids ORDER BY seq"):
+            record = json.loads(data)
+            by_id[record["id"]] = record
+        if self._data_version is not None:
+            self._version += 1
+        self._by_id = by_id
+        self._data_version = data_version
+
+    @property
+    def version(self):
+        with self._lock:
+            self._sync()
+            return self._version
+
+    def _import_legacy(self, data):
+        # Старый custom_asteroids.json: массив записей с id
+        if not isinstance(data, list):
+            data = []
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO custom_asteroids (id, data) VALUES (?, ?)",
+            [(a["id"], json.dumps(a, ensure_ascii=False)) for a in data if "id" in a]
+        )
+        return len(data)
+
+    def __len__(self):
+        with self._lock:
+            self._sync()
+            return len(self._by_id)
+
+    def all(self):
+        # Снимок списка в порядке создания
+        with self._lock:
+            self._sync()
+            return list(self._by_id.values())
+
+    def get(self, asteroid_id):
+        with self._lock:
+            self._sync()
+            return self._by_id.get(asteroid_id)
+
+    def create(self, fields):
+        # Присваивает уникальный id вида custom-<мс> и сохраняет запись
+        with self._lock:
+            self._sync()
+            millis = int(datetime.now().timestamp() * 1000)
+            while True:
+                while f"custom-{millis}" in self._by_id:
+                    millis += 1
+                record = {"id": f"custom-{millis}", **fields}
+                try:
+                    with self._conn:
+                        self._conn.execute(
+                            "INSERT INTO custom_asteroids (id, data) VALUES (?, ?)",
+                            (record["id"], json.dumps(record, ensure_ascii=False))
+                        )
+                    break
+                except sqlite3.IntegrityError:
+                    # Тот же id только что занял другой процесс
+                    millis += 1
+            self._by_id[record["id"]] = record
+            self._version += 1
+            return record
+
+    def delete(self, asteroid_id):
+        with self._lock:
+            self._sync()
+            if asteroid_id not in self._by_id:
+                return False
+            with self._conn:
+                deleted = self._conn.execute("DELETE FROM custom_asteroids WHERE id = ?", (asteroid_id,)).rowcount
+            del self._by_id[asteroid_id]
+            self._version += 1
+            return deleted > 0
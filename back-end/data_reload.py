@@ -0,0 +1,238 @@
+import datetime
+import json
+import logging
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+# Горячая перезагрузка данных API без перезапуска. Данные живут в неизменяемых
+# снимках (BiomeData, CatalogData): новый снимок строится целиком в фоновом потоке
+# и подменяет старый одним присваиванием. Запрос берёт ссылку на снимок один раз
+# и до конца работает с ней, поэтому запросы, начатые до подмены, дорабатывают
+# на старых данных. Тяжёлый разбор исходных JSON выполняется в отдельном процессе
+# (snapshot.py), чтобы не занимать GIL потоков, обслуживающих запросы.
+RELOAD_TARGETS = ("biomes", "catalog", "risks")
+
+
+class BiomeData:
+    # Биомы, пространственный индекс и таблица рисков одной версии.
+    # source — отпечаток исходников (хэш biomes.geojson и сигнатура растра)
+    __slots__ = ("biomes", "index", "risks", "source", "version")
+
+    def __init__(self, biomes, index, risks, source, version):
+        self.biomes = biomes
+        self.index = index
+        self.risks = risks
+        self.source = source
+        self.version = version
+
+
+class CatalogData:
+    __slots__ = ("catalog", "source", "version")
+
+    def __init__(self, catalog, source, version):
+        self.catalog = catalog
+        self.source = source
+        self.version = version
+
+
+def check_targets(targets):
+    # Проверка списка целей из запроса; ValueError — ответ 400
+    if not isinstance(targets, (list, tuple)) or not all(isinstance(t, str) for t in targets):
+        raise ValueError("targets должен быть списком строк")
+    unknown = set(targets) - set(RELOAD_TARGETS)
+    if unknown:
+        raise ValueError(f"Неизвестные цели перезагрузки: {', '.join(sorted(unknown))}")
+    return sorted(set(targets))
+
+
+class ReloadChannel:
+    # Запросы перезагрузки от одного воркера serve.py ко всем. send() дописывает строку
+    # {"targets", "force"} в общий файл path (O_APPEND: строка попадает в файл целиком)
+    # и шлёт SIGHUP мастеру, мастер пересылает его воркерам. По SIGHUP воркер вызывает
+    # receive(): объединение строк, появившихся после его прошлого чтения. SIGHUP без
+    # новых строк (kill -HUP мастеру вручную или несколько сигналов, слившихся в один) —
+    # перезагрузка всех целей без force: неизменившиеся исходники пропускаются
+    def __init__(self, path, master_pid):
+        self.path = path
+        self.master_pid = master_pid
+        self._lock = threading.Lock()
+        self._offset = 0
+        self.skip()
+
+    def skip(self):
+        # Запросы, отправленные до этого момента, не нужны (воркер запущен взамен упавшего)
+        with self._lock:
+            try:
+                self._offset = os.path.getsize(self.path)
+            except OSError:
+                self._offset = 0
+
+    def send(self, targets, force=False):
+        line = json.dumps({"targets": sorted(targets), "force": bool(force)}) + "\n"
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        try:
+            os.write(fd, line.encode("utf-8"))
+        finally:
+            os.close(fd)
+        os.kill(self.master_pid, signal.SIGHUP)
+
+    def receive(self):
+        # (targets, force) новых запросов
+        with self._lock:
+            try:
+                with open(self.path, "rb") as f:
+                    f.seek(self._offset)
+                    data = f.read()
+            except FileNotFoundError:
+                data = b""
+            # Строку, которая ещё дописывается, прочитаем со следующим сигналом
+            data = data[:data.rfind(b"\n") + 1]
+            self._offset += len(data)
+        targets, force = set(), False
+        for line in data.splitlines():
+            try:
+                item = json.loads(line)
+                targets.update(check_targets(item["targets"]))
+                force = force or bool(item.get("force"))
+            except (KeyError, TypeError, ValueError) as e:
+                log.warning(f"Пропущен запрос перезагрузки {line[:200]!r}: {e}")
+        if not targets:
+            return list(RELOAD_TARGETS), False
+        return sorted(targets), force
+
+
+def file_signature(path):
+    # Дешёвый признак изменения файла или каталога (None, если его нет)
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def build_snapshots(biomes=None, asteroids=None, lod=None):
+    # Сборка снапшотов через CLI snapshot.py в отдельном процессе; готовые снапшоты
+    # затем загружаются в этом процессе за доли секунды
+    command = [sys.executable, os.path.join(BACKEND_DIR, "snapshot.py")]
+    command += ["--biomes", biomes] if biomes else ["--no-biomes"]
+    command += ["--asteroids", asteroids] if asteroids else ["--no-asteroids"]
+    if biomes and lod:
+        command += ["--lod", str(lod)]
+    result = subprocess.run(command, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"snapshot.py: {result.stderr.strip().splitlines()[-1:] or result.returncode}")
+
+
+class DataReloader:
+    # Запускает reload(targets, force) -> {цель: время, с} в фоновом потоке.
+    # Одновременно идёт не больше одной перезагрузки; запросы, пришедшие во время
+    # неё, объединяются и выполняются следующим проходом
+    def __init__(self, reload):
+        self._reload = reload
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pending = set()
+        self._force = False
+        self._reasons = []
+        self.last = None
+        self.reloads = 0
+
+    def request(self, targets=RELOAD_TARGETS, force=False, reason="admin"):
+        targets = check_targets(targets)
+        with self._lock:
+            self._pending |= set(targets)
+            self._force = self._force or force
+            self._reasons.append(reason)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="data-reload", daemon=True)
+                self._thread.start()
+            return self._status()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._thread = None
+                    return
+                targets, force, reasons = self._pending, self._force, self._reasons
+                self._pending, self._force, self._reasons = set(), False, []
+            started = time.perf_counter()
+            result = {
+                "targets": sorted(targets),
+                "reasons": reasons,
+                "started_at": datetime.datetime.now().isoformat(),
+            }
+            try:
+                result["timings_s"] = {k: round(v, 3) for k, v in self._reload(targets, force).items()}
+                result["status"] = "ok"
+            except Exception as e:
+                log.error(f"❌ Ошибка перезагрузки данных ({', '.join(sorted(targets))}): {e}")
+                result["status"] = "failed"
+                result["error"] = str(e)
+            result["duration_s"] = round(time.perf_counter() - started, 3)
+            log.info(f"🔄 Перезагрузка {', '.join(result['targets'])}: {result['status']} за {result['duration_s']} с",
+                     extra={"fields": {"timings_s": result.get("timings_s")}})
+            with self._lock:
+                self.last = result
+                self.reloads += 1
+
+    def wait(self, timeout=None):
+        # Ждёт окончания текущей перезагрузки (для тестов и бенчмарков)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                thread = self._thread
+            if thread is None:
+                return True
+            thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+            if deadline is not None and time.monotonic() >= deadline:
+                with self._lock:
+                    return self._thread is None
+
+    def _status(self):
+        return {
+            "running": self._thread is not None,
+            "pending": sorted(self._pending),
+            "reloads": self.reloads,
+            "last": self.last,
+        }
+
+    def status(self):
+        with self._lock:
+            return self._status()
+
+    def watch(self, paths, interval):
+        # paths: {путь: цель}. Изменение засчитывается, когда сигнатура файла отличается
+        # от прежней и не менялась между двумя опросами (файл дописан до конца)
+        seen = {path: file_signature(path) for path in paths}
+        candidates = {}
+
+        def poll():
+            while True:
+                time.sleep(interval)
+                changed = set()
+                for path, target in paths.items():
+                    signature = file_signature(path)
+                    if signature == seen[path]:
+                        candidates.pop(path, None)
+                    elif candidates.get(path) == signature:
+                        seen[path] = signature
+                        candidates.pop(path, None)
+                        changed.add(target)
+                    else:
+                        candidates[path] = signature
+                if changed:
+                    self.request(sorted(changed), reason="watch")
+
+        thread = threading.Thread(target=poll, name="data-watch", daemon=True)
+        thread.start()
+        return thread
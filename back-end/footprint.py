@@ -0,0 +1,140 @@
+import math
+
+import numpy as np
+import shapely
+from shapely.geometry import Polygon
+
+from biome_risks import BIOME_RISKS
+
+
+# Анализ площади поражения: геодезический круг радиуса выброса вокруг точки удара,
+# доли площади каждого пересечённого биома и взвешенные по площади уровни риска.
+
+EARTH_RADIUS_M = 6_371_008.8
+DISC_SEGMENTS = 128
+
+
+class FootprintError(ValueError):
+    pass
+
+
+def geodesic_disc(lat, lon, radius_m, segments=DISC_SEGMENTS):
+    # Круг на сфере: точки на расстоянии radius_m по азимутам 0..360.
+    # Долготы не нормализуются, чтобы контур оставался непрерывным через ±180
+    delta = radius_m / EARTH_RADIUS_M
+    phi1 = math.radians(lat)
+    if delta >= math.pi / 2 - abs(phi1):
+        raise FootprintError("Площадь поражения накрывает полюс, анализ не поддерживается")
+    theta = np.linspace(0, 2 * np.pi, segments, endpoint=False)
+    sin_phi2 = math.sin(phi1) * math.cos(delta) + math.cos(phi1) * math.sin(delta) * np.cos(theta)
+    phi2 = np.arcsin(sin_phi2)
+    dlon = np.arctan2(
+        np.sin(theta) * math.sin(delta) * math.cos(phi1),
+        math.cos(delta) - math.sin(phi1) * sin_phi2
+    )
+    return Polygon(np.column_stack([lon + np.degrees(dlon), np.degrees(phi2)]))
+
+
+def wrap_to_world(geom):
+    # Части, вышедшие за ±180, переносятся на другую сторону карты
+    pieces = []
+    for dx in (-360, 0, 360):
+        piece = shapely.clip_by_rect(shapely.transform(geom, lambda c, dx=dx: c + (dx, 0)), -180, -90, 180, 90)
+        if not piece.is_empty:
+            pieces.append(piece)
+    return shapely.union_all(pieces)
+
+
+def equal_area_projector(lat0, lon0):
+    # Азимутальная равновеликая проекция Ламберта с центром в точке удара
+    phi0 = math.radians(lat0)
+    lam0 = math.radians(lon0)
+    sin_phi0, cos_phi0 = math.sin(phi0), math.cos(phi0)
+
+    def project(coords):
+        lam = np.radians(coords[:, 0]) - lam0
+        phi = np.radians(coords[:, 1])
+        cos_c = sin_phi0 * np.sin(phi) + cos_phi0 * np.cos(phi) * np.cos(lam)
+        k = np.sqrt(2 / np.maximum(1 + cos_c, 1e-12))
+        x = EARTH_RADIUS_M * k * np.cos(phi) * np.sin(lam)
+        y = EARTH_RADIUS_M * k * (cos_phi0 * np.sin(phi) - sin_phi0 * np.cos(phi) * np.cos(lam))
+        return np.column_stack([x, y])
+
+    return lambda geom: shapely.area(shapely.transform(geom, project))
+
+
+def analyze_footprint(biome_index, lat, lon, radius_m, risks_table=BIOME_RISKS):
+    # nan и inf не проходят сравнения диапазонов и до shapely не доходят
+    if not (-90 <= lat <= 90):
+        raise FootprintError("lat должен быть в диапазоне [-90, 90]")
+    if not (-180 <= lon <= 180):
+        raise FootprintError("lon должен быть в диапазоне [-180, 180]")
+    if not (math.isfinite(radius_m) and radius_m > 0):
+        raise FootprintError("radius_m должен быть конечным числом > 0")
+    disc = wrap_to_world(geodesic_disc(lat, lon, radius_m))
+    shapely.prepare(disc)
+    area_of = equal_area_projector(lat, lon)
+    total_area = area_of(disc)
+    xmin, ymin, xmax, ymax = disc.bounds
+
+    # Кандидаты по bounding box, в порядке biomes: при перекрытии полигонов
+    # площадь достаётся первому, как и в find_biome
+    candidates = biome_index.candidates(disc)
+    remaining = disc
+    parts = []
+    for i in candidates:
+        geom = biome_index.biomes[i][0]
+        prepared = biome_index.prepared[i]
+        if biome_index.outer is not None and not biome_index.outer[i].intersects(remaining):
+            # Упрощённый внешний контур не задет — полигон точно не пересекается
+            continue
+        if biome_index.inner is not None and biome_index.inner[i].contains(remaining):
+            part = remaining
+        elif not prepared.intersects(remaining):
+            continue
+        elif prepared.contains(remaining):
+            # Грубая проверка: остаток целиком внутри полигона, точное пересечение не нужно
+            part = remaining
+        else:
+            # Точное пересечение только с вырезанным по bbox куском полигона
+            part = shapely.intersection(shapely.clip_by_rect(geom, xmin, ymin, xmax, ymax), remaining)
+        if part.is_empty:
+            continue
+        parts.append((i, area_of(part)))
+        remaining = shapely.difference(remaining, part) if part is not remaining else Polygon()
+        if remaining.is_empty:
+            break
+
+    biomes_out = []
+    by_risk = {}
+    land_area = 0.0
+    for i, area in parts:
+        _, eco_name, biome_code, realm = biome_index.biomes[i]
+        risks = risks_table.get(biome_code, risks_table["Unknown"])
+        fraction = area / total_area
+        land_area += area
+        biomes_out.append({
+            "eco_name": eco_name,
+            "biome": biome_code,
+            "realm": realm,
+            "risk_level": risks["risk_level"],
+            "area_km2": area / 1e6,
+            "fraction": fraction,
+        })
+        by_risk[risks["risk_level"]] = by_risk.get(risks["risk_level"], 0.0) + fraction
+
+    ocean_fraction = max(0.0, 1 - land_area / total_area)
+    if ocean_fraction > 0:
+        ocean_risk = risks_table["99"]["risk_level"]
+        by_risk[ocean_risk] = by_risk.get(ocean_risk, 0.0) + ocean_fraction
+
+    biomes_out.sort(key=lambda b: -b["fraction"])
+    return {
+        "lat": lat,
+        "lon": lon,
+        "radius_m": radius_m,
+        "area_km2": total_area / 1e6,
+        "ocean_fraction": ocean_fraction,
+        "biomes": biomes_out,
+        "risk_levels": dict(sorted(by_risk.items(), key=lambda item: -item[1])),
+    }
@@ -0,0 +1,90 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+# LRU-кэш результатов find_biome с ключом по координатам, округлённым до precision
+# знаков после запятой (4 знака ≈ 11 м). Результат всегда вычисляется для
+# округлённой точки, поэтому ответ зависит только от ключа и не зависит от того,
+# был ли промах или попадание. Записи живут не дольше ttl секунд; при смене
+# version (перезагрузка биомов) кэш очищается целиком. Версии только растут:
+# запрос, начатый до перезагрузки (со старой версией), считается без кэша
+# и не сбрасывает кэш новой версии.
+class QuantizedLRUCache:
+    def __init__(self, precision=4, max_entries=50_000, ttl=3600.0):
+        if max_entries < 1:
+            raise ValueError("max_entries должен быть >= 1")
+        self.precision = precision
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+        self.invalidations = 0
+
+    def quantize(self, lat, lon):
+        # + 0.0 превращает -0.0 в 0.0, чтобы у точки был ровно один ключ
+        return round(lat, self.precision) + 0.0, round(lon, self.precision) + 0.0
+
+    def get(self, lat, lon, version, compute):
+        # compute(lat, lon) вызывается для округлённой точки только при промахе
+        key = self.quantize(lat, lon)
+        now = time.monotonic()
+        stale = False
+        with self._lock:
+            if self._version is not None and version < self._version:
+                self.misses += 1
+                stale = True
+            elif version != self._version:
+                if self._entries:
+                    self.invalidations += 1
+                self._entries.clear()
+                self._version = version
+            if not stale:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    if self.ttl is None or now - entry[0] < self.ttl:
+                        self._entries.move_to_end(key)
+                        self.hits += 1
+                        return entry[1]
+                    del self._entries[key]
+                    self.expired += 1
+                self.misses += 1
+
+        # Вычисление вне блокировки: параллельные промахи по одному ключу
+        # посчитают одно и то же, в кэше останется последний результат
+        value = compute(*key)
+        with self._lock:
+            if version == self._version:
+                self._entries[key] = (now, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "precision": self.precision,
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expired": self.expired,
+                "invalidations": self.invalidations,
+            }
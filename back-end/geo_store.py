@@ -0,0 +1,242 @@
+import json
+import logging
+import math
+from collections import Counter
+
+from sqlite_store import SQLiteStore
+
+log = logging.getLogger(__name__)
+
+# Поля результата /geo, по которым ведутся счётчики статистики
+STATS_DIMENSIONS = ("biome", "realm", "risk_level")
+# Ключ для записей без значения — как в самих ответах /geo: "Unknown" у биома и реалма,
+# "unknown" у уровня риска (см. biome_risks)
+STATS_UNKNOWN = {"biome": "Unknown", "realm": "Unknown", "risk_level": "unknown"}
+
+_UPSERT_STAT = (
+    "INSERT INTO geo_stats (dimension, key, count) VALUES (?, ?, ?)"
+    " ON CONFLICT (dimension, key) DO UPDATE SET count = count + excluded.count"
+)
+_UPSERT_CELL = (
+    "INSERT INTO geo_heatmap (row, col, count) VALUES (?, ?, ?)"
+    " ON CONFLICT (row, col) DO UPDATE SET count = count + excluded.count"
+)
+
+
+def stat_key(value, dimension=None):
+    # Коды биомов бывают и числами (9.0), и строками ("9") — приводим к одному виду;
+    # уровни риска — в нижнем регистре, как в biome_risks
+    unknown = STATS_UNKNOWN.get(dimension, "Unknown")
+    if value is None:
+        return unknown
+    if isinstance(value, (int, float)):
+        return str(int(value)) if math.isfinite(value) else unknown
+    key = str(value).strip()
+    if dimension == "risk_level":
+        key = key.lower()
+    return key or unknown
+
+
+def heatmap_cell(lat, lon, cell_deg):
+    # (строка, столбец) ячейки сетки cell_deg x cell_deg от (-90, -180); None без координат
+    if not isinstance(lat, (int, float)) or not isinstance(lon, (int, float)):
+        return None
+    if not (math.isfinite(lat) and math.isfinite(lon)):
+        return None
+    rows, cols = math.ceil(180 / cell_deg), math.ceil(360 / cell_deg)
+    row = min(max(int((lat + 90) // cell_deg), 0), rows - 1)
+    col = min(max(int((lon + 180) // cell_deg), 0), cols - 1)
+    return row, col
+
+
+# Журнал результатов /geo в SQLite: запись — один INSERT (O(1), атомарно,
+# без перезаписи файла), чтение — от новых к старым постранично.
+# Статистика по истории (счётчики по STATS_DIMENSIONS и сетка-теплокарта с шагом
+# cell_deg градусов) хранится в тех же транзакциях, что и сами записи: чтение
+# не зависит от длины истории, а все процессы serve.py видят одни и те же числа.
+class GeoResultStore(SQLiteStore):
+    def __init__(self, db_path, legacy_json_path=None, cell_deg=1.0):
+        if not 0 < cell_deg <= 180:
+            raise ValueError("cell_deg должен быть в (0, 180]")
+        super().__init__(db_path)
+        self.cell_deg = cell_deg
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS geo_results ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " timestamp TEXT,"
+            " data TEXT NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS geo_stats ("
+            " dimension TEXT NOT NULL,"
+            " key TEXT NOT NULL,"
+            " count INTEGER NOT NULL,"
+            " PRIMARY KEY (dimension, key)) WITHOUT ROWID"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS geo_heatmap ("
+            " row INTEGER NOT NULL,"
+            " col INTEGER NOT NULL,"
+            " count INTEGER NOT NULL,"
+            " PRIMARY KEY (row, col)) WITHOUT ROWID"
+        )
+        self._conn.commit()
+        # История, записанная до появления статистики или с другим шагом сетки
+        with self._lock:
+            stored_cell_deg = self._get_meta("cell_deg")
+        if stored_cell_deg is None or float(stored_cell_deg) != cell_deg:
+            self.rebuild_stats()
+        if legacy_json_path:
+            self.migrate_json(legacy_json_path)
+
+    def _import_legacy(self, data):
+        # Старый geo_result.json: массив, новые записи первыми (в журнале — последними)
+        if isinstance(data, dict):
+            data = [data]
+        elif not isinstance(data, list):
+            data = []
+        self._insert(reversed(data))
+        return len(data)
+
+    def append(self, result_data):
+        self.append_many([result_data])
+
+    def append_many(self, results_data):
+        with self._lock, self._conn:
+            self._insert(results_data)
+
+    def _insert(self, results_data):
+        # Вызывается под блокировкой, внутри транзакции записи
+        rows = []
+        stats, cells = Counter(), Counter()
+        for r in results_data:
+            rows.append((r.get("timestamp"), json.dumps(r, ensure_ascii=False)))
+            self._count(r, stats, cells)
+        self._conn.executemany(
+            "INSERT INTO geo_results (timestamp, data) VALUES (?, ?)", rows
+        )
+        self._add_stats(stats, cells)
+
+    def _count(self, result, stats, cells):
+        stats["total", ""] += 1
+        for dimension in STATS_DIMENSIONS:
+            stats[dimension, stat_key(result.get(dimension), dimension)] += 1
+        cell = heatmap_cell(result.get("lat"), result.get("lon"), self.cell_deg)
+        if cell is not None:
+            cells[cell] += 1
+
+    def _add_stats(self, stats, cells):
+        # Вызывается внутри транзакции записи
+        self._conn.executemany(_UPSERT_STAT, [(d, k, n) for (d, k), n in stats.items()])
+        self._conn.executemany(_UPSERT_CELL, [(r, c, n) for (r, c), n in cells.items()])
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM geo_results").fetchone()[0]
+
+    def page(self, limit=None, offset=0, cursor=None):
+        # Возвращает (results, next_cursor), новые записи первыми.
+        # cursor — id последней записи предыдущей страницы
+        query = "SELECT id, data FROM geo_results"
+        params = []
+        if cursor is not None:
+            query += " WHERE id < ?"
+            params.append(cursor)
+        query += " ORDER BY id DESC LIMIT ? OFFSET ?"
+        params += [-1 if limit is None else limit, offset]
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        results = [json.loads(data) for _, data in rows]
+        next_cursor = rows[-1][0] if rows and limit is not None and len(rows) == limit else None
+        return results, next_cursor
+
+    def iter_raw(self, limit=None, offset=0, cursor=None, batch=1000):
+        # То же, что page(), но пачками и без разбора JSON: (id, текст записи),
+        # новые первыми. Записи, добавленные во время обхода, не попадают
+        last = cursor
+        left = limit
+        while left is None or left > 0:
+            size = batch if left is None else min(batch, left)
+            query = "SELECT id, data FROM geo_results"
+            params = []
+            if last is not None:
+                query += " WHERE id < ?"
+                params.append(last)
+            query += " ORDER BY id DESC LIMIT ? OFFSET ?"
+            params += [size, offset]
+            with self._lock:
+                rows = self._conn.execute(query, params).fetchall()
+            yield from rows
+            if len(rows) < size:
+                return
+            last = rows[-1][0]
+            offset = 0
+            if left is not None:
+                left -= len(rows)
+
+    def next_cursor(self, limit, offset=0, cursor=None):
+        # next_cursor страницы page(limit, offset, cursor) без чтения самой страницы
+        if limit is None or limit <= 0:
+            return None
+        query = "SELECT id FROM geo_results"
+        params = []
+        if cursor is not None:
+            query += " WHERE id < ?"
+            params.append(cursor)
+        query += " ORDER BY id DESC LIMIT 1 OFFSET ?"
+        params.append(offset + limit - 1)
+        with self._lock:
+            row = self._conn.execute(query, params).fetchone()
+        return row[0] if row else None
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM geo_results")
+            self._conn.execute("DELETE FROM geo_stats")
+            self._conn.execute("DELETE FROM geo_heatmap")
+
+    def stats(self, heatmap=True):
+        # Чтение статистики: объём пропорционален числу различных значений и непустых
+        # ячеек сетки, а не длине истории
+        with self._lock, self._conn:
+            # Счётчики и сетка из одного снимка БД
+            self._conn.execute("BEGIN")
+            counts = self._conn.execute("SELECT dimension, key, count FROM geo_stats").fetchall()
+            cells = self._conn.execute(
+                "SELECT row, col, count FROM geo_heatmap ORDER BY row, col"
+            ).fetchall() if heatmap else None
+        result = {"total": 0, **{f"by_{d}": {} for d in STATS_DIMENSIONS}}
+        for dimension, key, count in sorted(counts, key=lambda c: -c[2]):
+            if dimension == "total":
+                result["total"] = count
+            elif dimension in STATS_DIMENSIONS:
+                result[f"by_{dimension}"][key] = count
+        if cells is not None:
+            deg = self.cell_deg
+            result["heatmap"] = {
+                "cell_deg": deg,
+                # lat, lon — юго-западный угол ячейки
+                "columns": ["lat", "lon", "count"],
+                "cells": [[round(-90 + row * deg, 6), round(-180 + col * deg, 6), count] for row, col, count in cells],
+            }
+        return result
+
+    def rebuild_stats(self, batch=10_000):
+        # Пересчёт статистики по всей истории (после смены cell_deg или для проверки).
+        # Одна транзакция: записи других процессов ждут её окончания
+        stats, cells = Counter(), Counter()
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            rows = self._conn.execute("SELECT data FROM geo_results")
+            while True:
+                chunk = rows.fetchmany(batch)
+                if not chunk:
+                    break
+                for (data,) in chunk:
+                    self._count(json.loads(data), stats, cells)
+            self._conn.execute("DELETE FROM geo_stats")
+            self._conn.execute("DELETE FROM geo_heatmap")
+            self._add_stats(stats, cells)
+            self._set_meta("cell_deg", repr(self.cell_deg))
+        log.info(f"✅ Статистика истории пересчитана: {stats['total', '']} записей")
+        return stats["total", ""]
@@ -0,0 +1,99 @@
+import gc
+import logging
+import os
+import signal
+import tempfile
+import threading
+
+log = logging.getLogger(__name__)
+
+
+# Продакшен-запуск API под gunicorn с предзагрузкой приложения:
+#
+#   gunicorn -c gunicorn.conf.py
+#
+# Те же шаги, что у serve.py (сервер для бенчмарков): мастер один раз импортирует
+# app.py (preload_app) и прогревает индексы биомов; перед каждым fork — gc.freeze()
+# и закрытие хранилищ SQLite, в воркере после fork — reopen хранилищ и
+# start_data_watch(). Воркеры разделяют загруженные данные с мастером (copy-on-write).
+#
+# SIGHUP мастеру, как и в serve.py, — перезагрузка данных: мастер пересылает его
+# воркерам, а /api/admin/reload в любом воркере доходит до всех через
+# data_reload.ReloadChannel. Стандартный для gunicorn плавный перезапуск воркеров по
+# SIGHUP здесь не нужен: с preload_app новые воркеры получили бы те же данные мастера.
+# Число воркеров и потоков, адрес — из WEB_CONCURRENCY, GUNICORN_THREADS, BIND.
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+chdir = BACKEND_DIR
+wsgi_app = "app:app"
+preload_app = True
+bind = os.environ.get("BIND", "127.0.0.1:5000")
+workers = int(os.environ.get("WEB_CONCURRENCY", os.cpu_count() or 1))
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+timeout = 120
+graceful_timeout = 30
+
+# Конфиг исполняется в мастере до предзагрузки app.py: по этим переменным app.py
+# создаёт reload_channel (см. serve.py)
+_fd, RELOAD_FILE = tempfile.mkstemp(prefix="asteroid-api-reload-", suffix=".jsonl")
+os.close(_fd)
+os.environ["ASTEROID_API_MASTER"] = str(os.getpid())
+os.environ["ASTEROID_API_RELOAD_FILE"] = RELOAD_FILE
+
+
+def when_ready(server):
+    import app as backend
+
+    backend.biome_data.index.warm()
+
+    def handle_hup():
+        log.info(f"🔄 Перезагрузка данных в {len(server.WORKERS)} воркерах")
+        for pid in list(server.WORKERS):
+            try:
+                os.kill(pid, signal.SIGHUP)
+            except ProcessLookupError:
+                pass
+
+    # Arbiter вызывает обработчик сигнала как атрибут handle_<сигнал>
+    server.handle_hup = handle_hup
+
+
+def pre_fork(server, worker):
+    import app as backend
+
+    # Соединения SQLite не переживают fork: каждый воркер откроет свои
+    backend.geo_store.close()
+    backend.custom_store.close()
+    backend.simulation_store.close()
+    gc.collect()
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    import app as backend
+
+    backend.geo_store.reopen()
+    backend.custom_store.reopen()
+    backend.simulation_store.reopen()
+    if worker.age > server.num_workers:
+        # Воркер запущен взамен упавшего: данные мастера могли устареть
+        backend.data_reloader.request(reason="respawn")
+    if backend.reload_channel is not None:
+        backend.reload_channel.skip()
+    backend.start_data_watch()
+
+
+def post_worker_init(worker):
+    import app as backend
+
+    # Воркер gunicorn сбрасывает SIGHUP в SIG_DFL; обработчик не берёт блокировки сам
+    signal.signal(signal.SIGHUP, lambda signum, frame: threading.Thread(
+        target=backend.reload_on_signal, daemon=True).start())
+
+
+def on_exit(server):
+    try:
+        os.remove(RELOAD_FILE)
+    except OSError:
+        pass
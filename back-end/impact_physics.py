@@ -0,0 +1,73 @@
+import math
+
+import numpy as np
+
+
+# Физика удара, общая для каталога NASA (format_asteroid) и кастомных астероидов.
+# Все функции принимают скаляры или колонки (массивы NumPy) и считают их одним
+# векторным вызовом.
+
+# Параметры скейлинга кратера по энергии (каталог NASA)
+CRATER_K = 1.3
+SURFACE_DENSITY = 2500  # кг/м³
+GRAVITY = 9.81  # м/с²
+
+# Множители для кастомных астероидов: кратер = диаметр * 20 * sin(угол)
+CRATER_DIAMETER_FACTOR = 20
+
+# Производные от диаметра кратера
+EJECTA_RADIUS_FACTOR = 1.2
+DUST_HEIGHT_FACTOR = 0.1
+
+# Порог кинетической энергии, после которого астероид считается опасным, Дж
+HAZARDOUS_ENERGY_J = 1e12
+
+# Модели диаметра кратера
+CRATER_MODEL_ENERGY = "energy"
+CRATER_MODEL_ANGLE = "angle"
+
+
+def sphere_mass(diameter, density):
+    radius = np.asarray(diameter, dtype=float) / 2
+    volume = (4 / 3) * math.pi * (radius ** 3)
+    return volume * density
+
+
+def kinetic_energy(mass, velocity_km_s):
+    velocity_ms = np.asarray(velocity_km_s, dtype=float) * 1000
+    return 0.5 * np.asarray(mass, dtype=float) * (velocity_ms ** 2)
+
+
+def crater_from_energy(kinetic_energy_joules):
+    ke = np.asarray(kinetic_energy_joules, dtype=float)
+    return CRATER_K * (ke / (SURFACE_DENSITY * GRAVITY)) ** 0.25
+
+
+def crater_from_angle(diameter, angle_deg):
+    angle_factor = np.sin(np.asarray(angle_deg, dtype=float) * math.pi / 180)
+    return np.asarray(diameter, dtype=float) * CRATER_DIAMETER_FACTOR * angle_factor
+
+
+def impact_effects(diameter, density, velocity, angle, mass=None, crater_model=CRATER_MODEL_ANGLE):
+    # diameter — м, density — кг/м³, velocity — км/с, angle — градусы.
+    # mass можно передать явно (каталог NASA хранит свою массу), иначе масса шара.
+    # Возвращает словарь колонок NumPy
+    if mass is None:
+        mass = sphere_mass(diameter, density)
+    else:
+        mass = np.asarray(mass, dtype=float)
+    ke = kinetic_energy(mass, velocity)
+    if crater_model == CRATER_MODEL_ENERGY:
+        crater_diameter = crater_from_energy(ke)
+    elif crater_model == CRATER_MODEL_ANGLE:
+        crater_diameter = crater_from_angle(diameter, angle)
+    else:
+        raise ValueError(f"Unknown crater model: {crater_model}")
+    return {
+        "mass_kg": mass,
+        "kinetic_energy_joules": ke,
+        "crater_diameter": crater_diameter,
+        "ejecta_radius": crater_diameter * EJECTA_RADIUS_FACTOR,
+        "dust_height": crater_diameter * DUST_HEIGHT_FACTOR,
+        "is_hazardous": ke > HAZARDOUS_ENERGY_J,
+    }
@@ -0,0 +1,83 @@
+import json
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Сериализация JSON для ответов API: orjson, если установлен (в разы быстрее
+# стандартного json), и генераторы для потоковой отдачи больших списков —
+# NDJSON или JSON-документ, который пишется по частям.
+
+STREAM_BATCH = 1000
+
+
+def dumps(obj) -> bytes:
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            # Типы, которых orjson не знает (Decimal, int > 64 бит) — через стандартный json
+            pass
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=DefaultJSONProvider.default).encode("utf-8")
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    # jsonify и app.json.response через dumps(); форматирование с отступами
+    # (debug-режим) по-прежнему делает стандартный json
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs.get("indent") is not None:
+            return super().dumps(obj, **kwargs)
+        return dumps(obj).decode("utf-8")
+
+    def list_body(self, head, key, items):
+        # Тело ответа jsonify({**head, key: items}) байт в байт, но с orjson элементы
+        # сериализуются по одному: один вызов orjson на сотни тысяч записей держал бы GIL,
+        # и остальные запросы ждали бы его сотни миллисекунд. Когда jsonify пошёл бы
+        # другим путём (без orjson, отступы в debug-режиме, key уже есть в head, элемент,
+        # который orjson не сериализует) — через response() целиком. items — список или
+        # коллекция, которую можно обойти повторно: в быстром пути она обходится один раз
+        # и в памяти остаются только байты, запасному пути нужен полный список
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        if orjson is None or indent or key in head:
+            return self.response({**head, key: list(items)}).get_data()
+        option = orjson.OPT_NON_STR_KEYS
+        try:
+            parts = [orjson.dumps(head, option=option)[:-1] + (b"," if head else b"") + orjson.dumps(key) + b":["]
+            for i, item in enumerate(items):
+                parts.append(b"," + orjson.dumps(item, option=option) if i else orjson.dumps(item, option=option))
+        except TypeError:
+            return self.response({**head, key: list(items)}).get_data()
+        parts.append(b"]}\n")
+        return b"".join(parts)
+
+
+def _batches(items, encoded):
+    # Элементы, сериализованные и склеенные пачками по STREAM_BATCH
+    batch = []
+    for item in items:
+        batch.append(item.encode("utf-8") if encoded and isinstance(item, str) else item if encoded else dumps(item))
+        if len(batch) >= STREAM_BATCH:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def stream_ndjson(items, encoded=False):
+    # Одна строка JSON на элемент; encoded=True — элементы уже сериализованы
+    for batch in _batches(items, encoded):
+        yield b"\n".join(batch) + b"\n"
+
+
+def stream_json(head, key, items, encoded=False, tail=None):
+    # {**head, key: [items...], **tail} по частям: список не собирается в памяти целиком
+    yield dumps(head)[:-1] + (b"," if head else b"") + dumps(key) + b":["
+    first = True
+    for batch in _batches(items, encoded):
+        yield (b"" if first else b",") + b",".join(batch)
+        first = False
+    yield b"]" + (b"," + dumps(tail)[1:] if tail else b"}")
@@ -0,0 +1,256 @@
+import argparse
+import datetime
+import json
+import os
+import resource
+import shutil
+import sys
+import time
+
+from asteroid_catalog import CatalogBuilder
+
+
+# Потоковая загрузка выгрузок NASA NeoWs в колоночный каталог (asteroid_catalog.py).
+# Файл читается кусками, в памяти одновременно лежит только буфер и один объект,
+# сам каталог копится в компактных колонках CatalogBuilder.
+# Поддерживаются:
+#   feed   — {"near_earth_objects": {"2024-01-01": [neo, ...], ...}, ...}
+#   browse — {"near_earth_objects": [neo, ...], "page": {...}, ...}
+#   JSON-массив объектов (в т.ч. asteroids.json в формате format_asteroid)
+#   JSONL/NDJSON — один объект на строку (*.jsonl, *.ndjson)
+
+CHUNK_SIZE = 1 << 20
+WHITESPACE = " \t\r\n"
+
+_decoder = json.JSONDecoder()
+
+
+class _Reader:
+    # Буфер поверх текстового файла: значения JSON разбираются по одному через raw_decode,
+    # недостающий хвост дочитывается из файла
+    def __init__(self, f, chunk_size=CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        # Следующий значащий символ ("" в конце файла)
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Ожидался '{char}', найдено {found!r}")
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+                # Значение, упёршееся в конец буфера (например, число), может продолжаться
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+
+    def items(self):
+        # Элементы массива по одному
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.peek() == ",":
+                self.pos += 1
+                continue
+            self.expect("]")
+            return
+
+    def keys(self):
+        # Ключи объекта по одному; значение каждого ключа разбирает вызывающий код
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            if self.peek() == ",":
+                self.pos += 1
+                continue
+            self.expect("}")
+            return
+
+
+class BadLine:
+    # Строка JSONL, которую не удалось разобрать (например, обрезанная последняя строка
+    # недокачанного файла): iter_objects отдаёт её вместо объекта, iter_records пропускает и считает
+    __slots__ = ("lineno", "error")
+
+    def __init__(self, lineno, error):
+        self.lineno = lineno
+        self.error = error
+
+
+def iter_objects(path):
+    # (объект, дата из feed или None) по одному из файла любого поддерживаемого формата.
+    # В JSONL каждая строка разбирается отдельно, битая строка — (BadLine, None)
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith((".jsonl", ".ndjson")):
+            for lineno, line in enumerate(f, 1):
+                if line.strip():
+                    try:
+                        obj = json.loads(line)
+                    except ValueError as e:
+                        obj = BadLine(lineno, e)
+                    yield obj, None
+            return
+
+        reader = _Reader(f)
+        if reader.peek() == "[":
+            for obj in reader.items():
+                yield obj, None
+            return
+        for key in reader.keys():
+            if key != "near_earth_objects":
+                reader.value()
+            elif reader.peek() == "[":
+                for obj in reader.items():
+                    yield obj, None
+            else:
+                for day in reader.keys():
+                    for obj in reader.items():
+                        yield obj, day
+
+
+def pick_approach(approaches, feed_date=None, reference_date=None):
+    # Сближение с Землёй: в feed — за дату выгрузки, иначе ближайшее начиная
+    # с reference_date (по умолчанию сегодня), а если таких нет — последнее
+    earth = [a for a in approaches if a.get("orbiting_body", "Earth") == "Earth"] or approaches
+    if not earth:
+        return None
+    if feed_date is not None:
+        for approach in earth:
+            if approach.get("close_approach_date") == feed_date:
+                return approach
+    reference = reference_date or datetime.date.today().isoformat()
+    upcoming = [a for a in earth if a.get("close_approach_date", "") >= reference]
+    if upcoming:
+        return min(upcoming, key=lambda a: a["close_approach_date"])
+    return max(earth, key=lambda a: a.get("close_approach_date", ""))
+
+
+def normalize_neo(neo, feed_date=None, reference_date=None):
+    # Объект NeoWs -> запись в формате asteroids.json (поля, которые читает format_asteroid).
+    # Записи, уже приведённые к этому формату, возвращаются как есть
+    if "estimated_diameter" not in neo and "close_approach_data" not in neo:
+        return neo
+    meters = neo["estimated_diameter"]["meters"]
+    record = {
+        "name": neo.get("name", "Unknown"),
+        "hazardous": bool(neo.get("is_potentially_hazardous_asteroid", False)),
+        "estimated_diameter_m": (float(meters["estimated_diameter_min"]) + float(meters["estimated_diameter_max"])) / 2,
+    }
+    approach = pick_approach(neo.get("close_approach_data") or [], feed_date, reference_date)
+    if approach is not None:
+        record["date"] = approach["close_approach_date"]
+        record["velocity_km_s"] = float(approach["relative_velocity"]["kilometers_per_second"])
+        record["miss_distance_km"] = float(approach["miss_distance"]["kilometers"])
+    elif feed_date is not None:
+        record["date"] = feed_date
+    return record
+
+
+def iter_records(path, reference_date=None, errors=None):
+    # Нормализованные записи; битые объекты и строки JSONL пропускаются (счётчик в errors["skipped"])
+    for obj, feed_date in iter_objects(path):
+        if isinstance(obj, BadLine):
+            _skip(errors, f"{path}:{obj.lineno}: {obj.error!r}")
+            continue
+        try:
+            yield normalize_neo(obj, feed_date, reference_date)
+        except (KeyError, TypeError, ValueError, AttributeError) as e:
+            _skip(errors, f"{path}: {e!r}")
+
+
+def _skip(errors, message):
+    if errors is not None:
+        errors["skipped"] = errors.get("skipped", 0) + 1
+        errors.setdefault("first_error", message)
+
+
+def ingest(paths, output, reference_date=None, progress=None, progress_every=100_000):
+    started = time.perf_counter()
+    errors = {}
+    builder = CatalogBuilder()
+    for path in paths:
+        for record in iter_records(path, reference_date, errors):
+            builder.add(record)
+            if progress and len(builder) % progress_every == 0:
+                progress(len(builder), time.perf_counter() - started)
+    catalog = builder.build()
+    del builder
+
+    # Каталог публикуется целиком: сначала во временный каталог, затем переименование
+    tmp = output.rstrip("/") + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    catalog.save(tmp)
+    shutil.rmtree(output, ignore_errors=True)
+    os.replace(tmp, output)
+
+    elapsed = time.perf_counter() - started
+    size = sum(os.path.getsize(p) for p in paths)
+    return {
+        "records": len(catalog),
+        "skipped": errors.get("skipped", 0),
+        "first_error": errors.get("first_error"),
+        "input_mb": size / 2**20,
+        "elapsed_s": elapsed,
+        "mb_per_s": size / 2**20 / elapsed if elapsed else 0.0,
+        "records_per_s": len(catalog) / elapsed if elapsed else 0.0,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Потоковая загрузка выгрузок NASA NeoWs в колоночный каталог")
+    parser.add_argument("paths", nargs="+", help="файлы feed/browse JSON, JSON-массивы или JSONL")
+    parser.add_argument("--output", default="nasa_catalog")
+    parser.add_argument("--reference-date", help="для browse: брать сближение начиная с этой даты (YYYY-MM-DD)")
+    args = parser.parse_args()
+
+    def progress(count, elapsed):
+        print(f"\r{count} записей, {count / elapsed:,.0f} записей/с", end="", file=sys.stderr, flush=True)
+
+    stats = ingest(args.paths, args.output, args.reference_date, progress)
+    print(file=sys.stderr)
+    print(f"✅ {args.output}: {stats['records']} записей, пропущено {stats['skipped']}")
+    print(json.dumps(stats, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
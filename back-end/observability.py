@@ -0,0 +1,295 @@
+import cProfile
+import datetime
+import io
+import json
+import logging
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import Response, g, request
+
+
+# Наблюдаемость API: уровневое структурированное логирование, метрики
+# в текстовом формате Prometheus (/metrics) и профилирование медленных запросов.
+# Дополнительные поля записи лога передаются через extra={"fields": {...}}.
+
+DEFAULT_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record):
+        text = super().format(record)
+        fields = getattr(record, "fields", None)
+        if fields:
+            text += " " + " ".join(f"{key}={value!r}" for key, value in fields.items())
+        return text
+
+
+class JsonFormatter(logging.Formatter):
+    # Одна JSON-строка на запись — для сборщиков логов
+    def format(self, record):
+        entry = {
+            "ts": datetime.datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", None) or {})
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def setup_logging(level="INFO", fmt="text"):
+    # Обработчик на корневом логгере ставится один раз, повторный вызов только меняет уровень
+    root = logging.getLogger()
+    root.setLevel(level.upper() if isinstance(level, str) else level)
+    handler = next((h for h in root.handlers if getattr(h, "_asteroid_api", False)), None)
+    if handler is None:
+        handler = logging.StreamHandler(sys.stderr)
+        handler._asteroid_api = True
+        root.addHandler(handler)
+    handler.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+    # werkzeug сам выставляет своему логгеру INFO, если уровень не задан: журнал
+    # запросов сервера подчиняется тому же уровню, что и остальные сообщения
+    logging.getLogger("werkzeug").setLevel(root.level)
+
+
+# Метрики. Значения хранятся по кортежу значений меток; collect() возвращает
+# (имя, тип, описание, [(имя сэмпла, метки, значение), ...])
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    type = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def collect(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [(self.name, dict(zip(self.labelnames, key)), value) for key, value in items]
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def set(self, value, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram:
+    type = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        # метки -> [счётчики по корзинам (не накопительные)..., +Inf, сумма]
+        self._values = {}
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        slot = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                slot = i
+                break
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                counts = self._values[key] = [0] * (len(self.buckets) + 2)
+            counts[slot] += 1
+            counts[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def collect(self):
+        with self._lock:
+            items = [(key, list(counts)) for key, counts in self._values.items()]
+        samples = []
+        for key, counts in items:
+            labels = dict(zip(self.labelnames, key))
+            samples += histogram_samples(self.name, labels, self.buckets, counts[:-1], counts[-1])
+        return samples
+
+
+def histogram_samples(name, labels, buckets, counts, total):
+    # counts — число наблюдений по корзинам (последняя — выше всех границ)
+    samples = []
+    cumulative = 0
+    for bound, count in zip(list(buckets) + [float("inf")], counts):
+        cumulative += count
+        samples.append((f"{name}_bucket", {**labels, "le": _format_value(float(bound))}, cumulative))
+    samples.append((f"{name}_sum", labels, total))
+    samples.append((f"{name}_count", labels, cumulative))
+    return samples
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def counter(self, name, help, labelnames=()):
+        return self._add(Counter(name, help, labelnames))
+
+    def gauge(self, name, help, labelnames=()):
+        return self._add(Gauge(name, help, labelnames))
+
+    def histogram(self, name, help, labelnames=(), buckets=DEFAULT_LATENCY_BUCKETS):
+        return self._add(Histogram(name, help, labelnames, buckets))
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collect):
+        # collect() -> [(имя, тип, описание, [(имя сэмпла, метки, значение), ...]), ...];
+        # вызывается при каждом запросе /metrics, для данных, которые считают другие модули
+        self._collectors.append(collect)
+
+    def render(self):
+        families = [(m.name, m.type, m.help, m.collect()) for m in self._metrics]
+        for collect in self._collectors:
+            try:
+                families += collect()
+            except Exception as e:
+                logging.getLogger(__name__).warning("Ошибка сборщика метрик: %s", e)
+        lines = []
+        for name, kind, help, samples in families:
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for sample_name, labels, value in samples:
+                label_text = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+                lines.append(f"{sample_name}{{{label_text}}} {_format_value(value)}" if label_text
+                             else f"{sample_name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+class SlowRequestProfiler:
+    # cProfile на запрос; профиль сохраняется, только если запрос дольше threshold_ms.
+    # Для потоковых ответов учитывается время до начала отдачи тела.
+    # Профилируется один запрос за раз: с Python 3.12 cProfile — общий на процесс
+    # инструмент sys.monitoring, и enable() во втором потоке падает с "Another profiling
+    # tool is already active". Запросы, пришедшие во время профилирования, идут без профиля
+    # (счётчик skipped)
+    def __init__(self, threshold_ms, directory, top=25):
+        self.threshold_ms = threshold_ms
+        self.directory = directory
+        self.top = top
+        self.skipped = 0
+        self._active = threading.Lock()
+
+    def start(self):
+        # Включённый профилировщик для текущего запроса или None, если профилируется другой
+        if not self._active.acquire(blocking=False):
+            self.skipped += 1
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Профилирование уже включено кем-то ещё (отладчик, coverage)
+            self._active.release()
+            self.skipped += 1
+            return None
+        return profile
+
+    def stop(self, profile):
+        profile.disable()
+        self._active.release()
+
+    def dump(self, profile, elapsed_ms, endpoint):
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        base = os.path.join(self.directory, f"{stamp}-{re.sub(r'[^A-Za-z0-9_.-]+', '_', endpoint).strip('_')}")
+        profile.dump_stats(base + ".prof")
+        text = io.StringIO()
+        pstats.Stats(profile, stream=text).sort_stats("cumulative").print_stats(self.top)
+        with open(base + ".txt", "w", encoding="utf-8") as f:
+            f.write(f"{request.method} {request.full_path} {elapsed_ms:.1f} ms\n")
+            f.write(text.getvalue())
+        return base + ".prof"
+
+
+def instrument(app, registry, profiler=None):
+    # Время каждого запроса по шаблону маршрута, методу и статусу; /metrics с текущими значениями
+    log = logging.getLogger(__name__)
+    latency = registry.histogram(
+        "http_request_duration_seconds", "Время обработки запроса (до начала отдачи тела)",
+        ("endpoint", "method", "status"),
+    )
+
+    @app.before_request
+    def _start_timer():
+        g._request_started = time.perf_counter()
+        if profiler is not None:
+            profile = profiler.start()
+            if profile is not None:
+                g._profile = profile
+
+    @app.after_request
+    def _observe(response):
+        started = g.pop("_request_started", None)
+        if started is None:
+            return response
+        elapsed = time.perf_counter() - started
+        endpoint = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+        latency.observe(elapsed, endpoint=endpoint, method=request.method, status=response.status_code)
+        profile = g.pop("_profile", None)
+        if profile is not None:
+            profiler.stop(profile)
+            if elapsed * 1000 >= profiler.threshold_ms:
+                path = profiler.dump(profile, elapsed * 1000, endpoint)
+                log.warning("🐢 Медленный запрос", extra={"fields": {
+                    "endpoint": endpoint, "elapsed_ms": round(elapsed * 1000, 1), "profile": path,
+                }})
+        return response
+
+    @app.teardown_request
+    def _stop_profile(exc):
+        # Если after_request не дошёл до профиля (ошибка), профилировщик всё равно выключается
+        profile = g.pop("_profile", None)
+        if profile is not None:
+            profiler.stop(profile)
+
+    @app.route("/metrics", methods=["GET"])
+    def metrics():
+        return Response(registry.render(), mimetype="text/plain; version=0.0.4")
@@ -0,0 +1,77 @@
+import gzip
+import hashlib
+import threading
+
+from flask import Response, request
+
+
+# Кэш готовых (сериализованных) JSON-ответов для редко меняющихся данных.
+# Запись живёт, пока не изменится version, переданная вызывающим кодом.
+# Версии только растут: ответ для версии старше закэшированной (запрос, начатый
+# до перезагрузки данных) строится, но не вытесняет более новую запись.
+class CachedBody:
+    __slots__ = ("body", "gzip_body", "etag")
+
+    def __init__(self, body: bytes, compress: bool = True):
+        self.body = body
+        self.gzip_body = gzip.compress(body, compresslevel=6) if compress else None
+        self.etag = hashlib.sha256(body).hexdigest()[:32]
+
+
+class ResponseCache:
+    def __init__(self):
+        # RLock: build() может сам обращаться к кэшу за другими ключами
+        self._lock = threading.RLock()
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, version, build):
+        # build() вызывается только при промахе или смене версии
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            value = build()
+            if entry is None or entry[0] < version:
+                self._entries[key] = (version, value)
+            return value
+
+    def put(self, key, version, value):
+        # Запись, построенная заранее (вне блокировки), например при перезагрузке данных
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < version:
+                self._entries[key] = (version, value)
+
+    def keys(self):
+        with self._lock:
+            return list(self._entries)
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def cached_response(cached: CachedBody, mimetype="application/json"):
+    # Отдаёт 304, если клиент прислал актуальный ETag, иначе тело (gzip, если клиент его принимает)
+    use_gzip = cached.gzip_body is not None and request.accept_encodings["gzip"] > 0
+    etag = f"{cached.etag}-gz" if use_gzip else cached.etag
+
+    if request.if_none_match.contains(cached.etag) or request.if_none_match.contains(f"{cached.etag}-gz"):
+        response = Response(status=304)
+    else:
+        response = Response(cached.gzip_body if use_gzip else cached.body, mimetype=mimetype)
+        if use_gzip:
+            response.headers["Content-Encoding"] = "gzip"
+    response.set_etag(etag)
+    response.headers["Vary"] = "Accept-Encoding"
+    # Клиент может хранить ответ, но обязан перепроверять его по ETag
+    response.headers["Cache-Control"] = "no-cache"
+    return response
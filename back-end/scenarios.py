@@ -0,0 +1,143 @@
+import math
+
+import numpy as np
+
+import impact_physics
+
+
+# Перебор сценариев удара по сетке параметров (декартово произведение осей).
+# Сетка не материализуется целиком: точки генерируются блоками по плоскому индексу.
+
+SWEEP_AXES = ("diameter", "density", "velocity", "angle")
+SWEEP_OUTPUTS = ("mass_kg", "kinetic_energy_joules", "crater_diameter", "ejecta_radius", "dust_height")
+SUMMARY_PERCENTILES = (5, 25, 50, 75, 95)
+# Размер выборки для перцентилей в summarize (точки больших сеток не хранятся целиком)
+SUMMARY_SAMPLE = 200_000
+
+
+def parse_axis(name, spec):
+    # Ось задаётся числом, списком значений, {"values": [...]}
+    # или диапазоном {"min": .., "max": .., "steps": ..}
+    if isinstance(spec, (int, float)) and not isinstance(spec, bool):
+        values = [spec]
+    elif isinstance(spec, list):
+        values = spec
+    elif isinstance(spec, dict) and "values" in spec:
+        values = spec["values"]
+    elif isinstance(spec, dict) and "min" in spec and "max" in spec:
+        steps = int(spec.get("steps", 10))
+        if steps < 1:
+            raise ValueError(f"{name}: steps должен быть >= 1")
+        values = np.linspace(float(spec["min"]), float(spec["max"]), steps)
+    else:
+        raise ValueError(f"{name}: ожидается число, список или {{min, max, steps}}")
+    values = np.asarray(values, dtype=float)
+    if values.ndim != 1 or len(values) == 0:
+        raise ValueError(f"{name}: пустой список значений")
+    if not np.isfinite(values).all():
+        raise ValueError(f"{name}: значения должны быть конечными числами")
+    return values
+
+
+def parse_axes(data):
+    missing = [name for name in SWEEP_AXES if name not in data]
+    if missing:
+        raise ValueError(f"Missing required field: {missing[0]}")
+    return {name: parse_axis(name, data[name]) for name in SWEEP_AXES}
+
+
+def grid_size(axes):
+    size = 1
+    for name in SWEEP_AXES:
+        size *= len(axes[name])
+    return size
+
+
+def sweep_chunks(axes, chunk_size=65536):
+    # Генерирует (индексы по осям, параметры, эффекты) блоками по chunk_size точек
+    shape = tuple(len(axes[name]) for name in SWEEP_AXES)
+    total = grid_size(axes)
+    for start in range(0, total, chunk_size):
+        flat = np.arange(start, min(start + chunk_size, total))
+        idx = np.unravel_index(flat, shape)
+        params = {name: axes[name][i] for name, i in zip(SWEEP_AXES, idx)}
+        effects = impact_physics.impact_effects(
+            params["diameter"], params["density"], params["velocity"], params["angle"]
+        )
+        yield idx, params, effects
+
+
+def summarize(axes, sample_size=SUMMARY_SAMPLE, seed=0):
+    # Один проход по сетке: min, max и среднее — по всем точкам, перцентили — по
+    # равномерной выборке из sample_size точек (по всей сетке, если она не больше).
+    # В памяти одновременно только блок сетки и выборка, а не все выходные колонки
+    count = grid_size(axes)
+    if count <= sample_size:
+        sample = None
+    else:
+        sample = np.sort(np.random.default_rng(seed).choice(count, sample_size, replace=False))
+    running = {name: {"min": np.inf, "max": -np.inf, "sum": 0.0} for name in SWEEP_OUTPUTS}
+    picked = {name: [] for name in SWEEP_OUTPUTS}
+    hazardous = 0
+    start = 0
+    for _, _, effects in sweep_chunks(axes, chunk_size=1 << 18):
+        size = len(effects["is_hazardous"])
+        if sample is not None:
+            rows = sample[np.searchsorted(sample, start):np.searchsorted(sample, start + size)] - start
+        for name in SWEEP_OUTPUTS:
+            values = effects[name]
+            stats = running[name]
+            stats["min"] = min(stats["min"], float(values.min()))
+            stats["max"] = max(stats["max"], float(values.max()))
+            stats["sum"] += float(values.sum())
+            picked[name].append(values if sample is None else values[rows])
+        hazardous += int(np.count_nonzero(effects["is_hazardous"]))
+        start += size
+
+    summary = {}
+    for name in SWEEP_OUTPUTS:
+        stats = running[name]
+        values = np.concatenate(picked[name])
+        summary[name] = {"min": stats["min"], "max": stats["max"], "mean": stats["sum"] / count}
+        for p, v in zip(SUMMARY_PERCENTILES, np.percentile(values, SUMMARY_PERCENTILES)):
+            summary[name][f"p{p}"] = float(v)
+        # Переполнение (inf) и его следствия (nan) в JSON — null
+        summary[name] = {k: (v if math.isfinite(v) else None) for k, v in summary[name].items()}
+    return {
+        "count": count,
+        "hazardous_count": hazardous,
+        "hazardous_fraction": hazardous / count if count else 0.0,
+        "axes": {name: len(axes[name]) for name in SWEEP_AXES},
+        # Число точек, по которым посчитаны перцентили (count — точные перцентили)
+        "percentile_sample": count if sample is None else len(sample),
+        "summary": summary,
+    }
+
+
+_ROW_TEMPLATE = (
+    '{"diameter": %s, "density": %s, "velocity": %s, "angle": %s, '
+    '"mass_kg": %s, "kinetic_energy_joules": %s, "crater_diameter": %s, '
+    '"ejecta_radius": %s, "dust_height": %s, "is_potentially_hazardous_asteroid": %s}\n'
+)
+
+
+def _number_text(values):
+    # repr конечного float — корректное число JSON; inf и nan (переполнение при
+    # экстремальных параметрах) в JSON не бывает, вместо них null
+    text = [repr(v) for v in values.tolist()]
+    bad = ~np.isfinite(values)
+    if bad.any():
+        for i in np.flatnonzero(bad).tolist():
+            text[i] = "null"
+    return text
+
+
+def stream_ndjson(axes, chunk_size=65536):
+    # Одна строка JSON на точку сетки; блок форматируется целиком и отдаётся одним куском.
+    # Значения осей повторяются, поэтому их repr считается один раз
+    axis_text = [[repr(v) for v in axes[name].tolist()] for name in SWEEP_AXES]
+    for idx, _, effects in sweep_chunks(axes, chunk_size=chunk_size):
+        columns = [[text[i] for i in ix.tolist()] for text, ix in zip(axis_text, idx)]
+        columns += [_number_text(effects[name]) for name in SWEEP_OUTPUTS]
+        columns.append(["true" if h else "false" for h in effects["is_hazardous"].tolist()])
+        yield "".join(_ROW_TEMPLATE % row for row in zip(*columns))
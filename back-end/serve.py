@@ -0,0 +1,172 @@
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+from werkzeug.serving import make_server
+
+log = logging.getLogger(__name__)
+
+
+# Запуск API в несколько процессов (pre-fork) для бенчмарков (benchmarks/bench_workers.py)
+# и локальной проверки многопроцессной работы:
+#
+#   python serve.py --workers 4 --port 5000
+#
+# Это не продакшен-сервер: запросы обслуживает werkzeug make_server (сервер
+# разработки), нет таймаутов запросов и плавной остановки — SIGTERM обрывает
+# запросы на середине. В продакшене — gunicorn с gunicorn.conf.py (preload_app,
+# тот же выигрыш copy-on-write), его хуки повторяют шаги отсюда: gc.freeze() и
+# закрытие хранилищ до fork (preload), reopen хранилищ и start_data_watch()
+# в воркере после fork (run_worker).
+#
+# Мастер один раз загружает данные (импорт app.py): биомы со всеми prepared-индексами,
+# растр и колоночный каталог NASA (memory-mapped снапшоты), затем открывает сокет
+# и запускает воркеры через fork. Воркеры разделяют эти данные с мастером
+# (copy-on-write) и только читают их; gc.freeze() не даёт сборщику мусора
+# переписывать заголовки унаследованных объектов и тем самым копировать страницы.
+# Записи в хранилища (geo_results.db, custom_asteroids.db, simulations.db) сериализует блокировка
+# записи SQLite: в каждый момент пишет один процесс, остальные ждут (busy timeout),
+# кастомные астероиды, созданные в одном воркере, сразу видны в остальных.
+# Каждый воркер держит свои кэши (/geo, готовые ответы каталога) и свои метрики:
+# /metrics показывает воркер, который ответил на запрос. Фоновую симуляцию
+# (/api/simulations) считает воркер, принявший задачу (в своём пуле процессов),
+# а её состояние лежит в simulations.db: GET отвечает из любого воркера.
+# --no-preload — каждый воркер загружает данные сам (для сравнения памяти).
+#
+# Перезагрузка данных: kill -HUP <мастер> (все цели) или POST /api/admin/reload в любой
+# воркер (цели и force из запроса передаются через общий файл, см.
+# data_reload.ReloadChannel) — мастер рассылает SIGHUP всем воркерам, каждый
+# перестраивает свой снимок данных в фоне (см. data_reload.py). Новые снимки уже не общие между воркерами: память
+# снова делится только после перезапуска serve.py.
+def preload():
+    import app as backend
+
+    started = time.perf_counter()
+    backend.biome_data.index.warm()
+    log.info(f"✅ Индексы биомов прогреты за {time.perf_counter() - started:.2f} с")
+    # Соединения SQLite не переживают fork: каждый воркер откроет свои
+    backend.geo_store.close()
+    backend.custom_store.close()
+    backend.simulation_store.close()
+    gc.collect()
+    gc.freeze()
+    return backend
+
+
+def run_worker(sock, host, port, backend, threads, refresh=False):
+    # Тело процесса-воркера; не возвращается. refresh — воркер запущен взамен упавшего:
+    # данные мастера могли устареть, проверяем исходники сразу
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    try:
+        if backend is None:
+            import app as backend
+        else:
+            backend.geo_store.reopen()
+            backend.custom_store.reopen()
+            backend.simulation_store.reopen()
+            if refresh:
+                backend.data_reloader.request(reason="respawn")
+        if backend.reload_channel is not None:
+            backend.reload_channel.skip()
+        # Обработчик сигнала не берёт блокировки сам: прерванный им поток может их держать
+        signal.signal(signal.SIGHUP, lambda signum, frame: threading.Thread(
+            target=backend.reload_on_signal, daemon=True).start())
+        backend.start_data_watch()
+        server = make_server(host, port, backend.app, threaded=threads, fd=sock.fileno())
+        log.info(f"👷 Воркер {os.getpid()} готов")
+        server.serve_forever()
+    except Exception as e:
+        log.error(f"❌ Воркер {os.getpid()} остановлен: {e}")
+        os._exit(1)
+    os._exit(0)
+
+
+def spawn(sock, host, port, backend, threads, refresh=False):
+    pid = os.fork()
+    if pid == 0:
+        run_worker(sock, host, port, backend, threads, refresh)
+    return pid
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Запуск API в несколько процессов с общими данными (для бенчмарков, не для продакшена)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--no-threads", action="store_true", help="воркер обрабатывает запросы по одному")
+    parser.add_argument("--no-preload", action="store_true", help="каждый воркер загружает данные сам")
+    args = parser.parse_args()
+
+    # По этим переменным /api/admin/reload в воркере находит мастера и файл запросов
+    # перезагрузки, общий для всех воркеров (см. app.py, data_reload.ReloadChannel)
+    fd, reload_file = tempfile.mkstemp(prefix="asteroid-api-reload-", suffix=".jsonl")
+    os.close(fd)
+    os.environ["ASTEROID_API_MASTER"] = str(os.getpid())
+    os.environ["ASTEROID_API_RELOAD_FILE"] = reload_file
+    backend = None if args.no_preload else preload()
+    if backend is None:
+        import observability
+        observability.setup_logging(os.environ.get("LOG_LEVEL", "INFO"), os.environ.get("LOG_FORMAT", "text"))
+
+    sock = socket.create_server((args.host, args.port), backlog=1024)
+    sock.set_inheritable(True)
+    threads = not args.no_threads
+
+    workers = set()
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def reload(signum, frame):
+        log.info(f"🔄 Перезагрузка данных в {len(workers)} воркерах")
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGHUP)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGHUP, reload)
+
+    for _ in range(args.workers):
+        workers.add(spawn(sock, args.host, args.port, backend, threads))
+    log.info(f"🚀 http://{args.host}:{args.port}: {args.workers} воркеров, мастер {os.getpid()}"
+             + (", без общей загрузки данных" if args.no_preload else ""))
+    log.warning("serve.py — сервер для бенчмарков на werkzeug: без таймаутов запросов и плавной остановки; "
+                "в продакшене — gunicorn -c gunicorn.conf.py")
+
+    # Упавший воркер перезапускается, пока мастер не получил сигнал остановки
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        workers.discard(pid)
+        if not stopping:
+            log.warning(f"Воркер {pid} завершился (статус {status}), запускаем новый")
+            workers.add(spawn(sock, args.host, args.port, backend, threads, refresh=True))
+    sock.close()
+    os.remove(reload_file)
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
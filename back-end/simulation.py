@@ -0,0 +1,287 @@
+import argparse
+import json
+import math
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+import impact_physics
+from biome_index import BiomeIndex, load_biomes
+from biome_risks import BIOME_RISKS
+
+
+# Монте-Карло симуляция места удара: N точек с разбросом вокруг цели (или равномерно
+# по земному шару) и N наборов параметров астероида. Точки классифицируются по биомам,
+# результат — распределение вероятностей по кодам биомов и уровням риска
+# плюс перцентили диаметра кратера. Блоки считаются в ProcessPoolExecutor,
+# у каждого блока свой seed из SeedSequence, поэтому результат зависит только от seed.
+
+MAX_SIMULATION_SAMPLES = 10_000_000
+DEFAULT_CHUNK_SIZE = 100_000
+CRATER_PERCENTILES = (5, 25, 50, 75, 95, 99)
+KM_PER_DEGREE = 111.32
+
+# Параметры по умолчанию — типичный каменный астероид
+DEFAULT_PARAMETERS = {
+    "diameter": {"mean": 100, "std": 20},
+    "density": {"mean": 3000, "std": 300},
+    "velocity": {"mean": 17, "std": 3},
+    "angle": {"min": 15, "max": 90},
+}
+PARAMETER_BOUNDS = {
+    "diameter": (1e-3, None),
+    "density": (1.0, None),
+    "velocity": (0.1, None),
+    "angle": (0.0, 90.0),
+}
+
+
+def parse_distribution(name, spec):
+    # Число — константа, {"mean", "std"} — нормальное, {"min", "max"} — равномерное
+    if isinstance(spec, (int, float)) and not isinstance(spec, bool):
+        return {"value": float(spec)}
+    if isinstance(spec, dict) and "mean" in spec:
+        std = float(spec.get("std", 0))
+        if std < 0:
+            raise ValueError(f"{name}: std должен быть >= 0")
+        return {"mean": float(spec["mean"]), "std": std}
+    if isinstance(spec, dict) and "min" in spec and "max" in spec:
+        low, high = float(spec["min"]), float(spec["max"])
+        if low > high:
+            raise ValueError(f"{name}: min больше max")
+        return {"min": low, "max": high}
+    raise ValueError(f"{name}: ожидается число, {{mean, std}} или {{min, max}}")
+
+
+def parse_params(data):
+    n = int(data.get("n", 10_000))
+    if n < 1 or n > MAX_SIMULATION_SAMPLES:
+        raise ValueError(f"n должен быть от 1 до {MAX_SIMULATION_SAMPLES}")
+    params = {
+        "n": n,
+        "seed": int(data.get("seed", 0)),
+        "lat": None,
+        "lon": None,
+        "sigma_km": float(data.get("sigma_km", 100)),
+        "distributions": {},
+    }
+    # Без lat/lon точки удара равномерно распределены по поверхности Земли
+    if data.get("lat") is not None or data.get("lon") is not None:
+        params["lat"] = float(data["lat"])
+        params["lon"] = float(data["lon"])
+        if not -90 <= params["lat"] <= 90:
+            raise ValueError("lat должен быть в диапазоне [-90, 90]")
+    if params["sigma_km"] < 0:
+        raise ValueError("sigma_km должен быть >= 0")
+    for name, default in DEFAULT_PARAMETERS.items():
+        params["distributions"][name] = parse_distribution(name, data.get(name, default))
+    return params
+
+
+def sample_distribution(rng, dist, n, bounds):
+    if "value" in dist:
+        values = np.full(n, dist["value"])
+    elif "mean" in dist:
+        values = rng.normal(dist["mean"], dist["std"], n)
+    else:
+        values = rng.uniform(dist["min"], dist["max"], n)
+    low, high = bounds
+    return np.clip(values, low, high)
+
+
+def sample_points(rng, params, n):
+    if params["lat"] is None:
+        # Равномерно по площади сферы
+        lats = np.degrees(np.arcsin(rng.uniform(-1, 1, n)))
+        lons = rng.uniform(-180, 180, n)
+        return lats, lons
+    sigma_deg = params["sigma_km"] / KM_PER_DEGREE
+    lats = params["lat"] + rng.normal(0, sigma_deg, n)
+    cos_lat = max(math.cos(math.radians(params["lat"])), 1e-6)
+    lons = params["lon"] + rng.normal(0, sigma_deg / cos_lat, n)
+    # Переход через полюс отражает широту и разворачивает долготу
+    over = np.abs(lats) > 90
+    lats = np.where(lats > 90, 180 - lats, np.where(lats < -90, -180 - lats, lats))
+    lons = np.where(over, lons + 180, lons)
+    lons = (lons + 180) % 360 - 180
+    return lats, lons
+
+
+# Индекс биомов в процессе-воркере пула (задаётся initializer'ом пула). Без пула
+# индекс передаётся в simulate_chunk явно: в одном процессе параллельно могут идти
+# несколько симуляций по разным версиям биомов
+_worker_index = None
+
+
+def _init_worker(biomes):
+    global _worker_index
+    _worker_index = BiomeIndex(biomes)
+
+
+def simulate_chunk(params, seed_seq, n, index=None):
+    # Возвращает частичные агрегаты блока: счётчики по индексу полигона
+    # (последняя ячейка — океан), диаметры кратеров и число опасных ударов.
+    # index — индекс биомов (по умолчанию индекс процесса-воркера пула)
+    rng = np.random.default_rng(seed_seq)
+    lats, lons = sample_points(rng, params, n)
+    draws = {
+        name: sample_distribution(rng, dist, n, PARAMETER_BOUNDS[name])
+        for name, dist in params["distributions"].items()
+    }
+    effects = impact_physics.impact_effects(draws["diameter"], draws["density"], draws["velocity"], draws["angle"])
+
+    if index is None:
+        index = _worker_index
+    idx = index.locate_many(lats, lons)
+    counts = np.bincount(np.where(idx < 0, len(index), idx), minlength=len(index) + 1)
+    return counts, effects["crater_diameter"], int(np.count_nonzero(effects["is_hazardous"]))
+
+
+class SimulationPool:
+    # Общий пул процессов для всех симуляций процесса API: сколько бы задач ни шло
+    # одновременно, процессов не больше max_workers. Воркеры пула держат индекс биомов
+    # одной версии (key); блоки с другой версией запускают новый пул, а старый
+    # досчитывает уже отправленные блоки и закрывается
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._lock = threading.Lock()
+        self._pool = None
+        self._key = None
+
+    def submit_chunks(self, biomes, key, params, sizes, seeds):
+        with self._lock:
+            if self._pool is None or key != self._key:
+                if self._pool is not None:
+                    self._pool.shutdown(wait=False)
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                                 initargs=(biomes,))
+                self._key = key
+            return [self._pool.submit(simulate_chunk, params, seed, size) for size, seed in zip(sizes, seeds)]
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+def run_simulation(biomes, params, workers=None, chunk_size=DEFAULT_CHUNK_SIZE, progress=None,
+                   risks_table=BIOME_RISKS, pool=None, pool_key=None):
+    # pool — общий SimulationPool (в API), pool_key — версия biomes для него;
+    # без pool блоки считаются в собственном пуле из workers процессов (CLI)
+    started = time.perf_counter()
+    n = params["n"]
+    sizes = [min(chunk_size, n - start) for start in range(0, n, chunk_size)]
+    seeds = np.random.SeedSequence(params["seed"]).spawn(len(sizes))
+    workers = workers or os.cpu_count() or 1
+
+    counts = np.zeros(len(biomes) + 1, dtype=np.int64)
+    craters = [None] * len(sizes)
+    hazardous = 0
+    done = 0
+
+    if workers == 1 or len(sizes) == 1:
+        index = BiomeIndex(biomes)
+        for i, (size, seed) in enumerate(zip(sizes, seeds)):
+            chunk_counts, craters[i], chunk_hazardous = simulate_chunk(params, seed, size, index)
+            counts += chunk_counts
+            hazardous += chunk_hazardous
+            done += 1
+            if progress:
+                progress(done, len(sizes))
+    else:
+        local = None
+        if pool is None:
+            local = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(biomes,))
+            futures = [local.submit(simulate_chunk, params, seed, size) for size, seed in zip(sizes, seeds)]
+        else:
+            futures = pool.submit_chunks(biomes, pool_key, params, sizes, seeds)
+        try:
+            order = {future: i for i, future in enumerate(futures)}
+            for future in as_completed(futures):
+                chunk_counts, chunk_craters, chunk_hazardous = future.result()
+                counts += chunk_counts
+                craters[order[future]] = chunk_craters
+                hazardous += chunk_hazardous
+                done += 1
+                if progress:
+                    progress(done, len(sizes))
+        finally:
+            if local is not None:
+                local.shutdown()
+
+    return aggregate(biomes, params, counts, np.concatenate(craters), hazardous, time.perf_counter() - started,
+                     risks_table)
+
+
+def aggregate(biomes, params, counts, craters, hazardous, elapsed, risks_table=BIOME_RISKS):
+    n = params["n"]
+    by_biome = {}
+    by_eco = {}
+    for i, count in enumerate(counts[:-1].tolist()):
+        if count:
+            _, eco_name, biome_code, _ = biomes[i]
+            by_biome[biome_code] = by_biome.get(biome_code, 0) + count
+            by_eco[eco_name] = by_eco.get(eco_name, 0) + count
+    ocean = int(counts[-1])
+    if ocean:
+        by_biome["99"] = by_biome.get("99", 0) + ocean
+        by_eco["Ocean"] = by_eco.get("Ocean", 0) + ocean
+
+    by_risk = {}
+    for biome_code, count in by_biome.items():
+        risk_level = risks_table.get(biome_code, risks_table["Unknown"])["risk_level"]
+        by_risk[risk_level] = by_risk.get(risk_level, 0) + count
+
+    def distribution(table, key):
+        return [
+            {key: k, "count": c, "probability": c / n}
+            for k, c in sorted(table.items(), key=lambda item: -item[1])
+        ]
+
+    return {
+        "n": n,
+        "seed": params["seed"],
+        "biomes": distribution(by_biome, "biome"),
+        "risk_levels": distribution(by_risk, "risk_level"),
+        "top_eco_regions": distribution(by_eco, "eco_name")[:10],
+        "crater_diameter": {
+            f"p{p}": float(v) for p, v in zip(CRATER_PERCENTILES, np.percentile(craters, CRATER_PERCENTILES))
+        },
+        "hazardous_fraction": hazardous / n,
+        "elapsed_s": round(elapsed, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Монте-Карло симуляция места удара астероида")
+    parser.add_argument("--biomes", default="biomes.geojson")
+    parser.add_argument("-n", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--lat", type=float)
+    parser.add_argument("--lon", type=float)
+    parser.add_argument("--sigma-km", type=float, default=100)
+    parser.add_argument("--params", help="JSON с распределениями diameter/density/velocity/angle")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    data = json.loads(args.params) if args.params else {}
+    data.update({"n": args.n, "seed": args.seed, "lat": args.lat, "lon": args.lon, "sigma_km": args.sigma_km})
+    params = parse_params(data)
+    biomes = load_biomes(args.biomes)
+
+    def progress(done, total):
+        print(f"\r{done}/{total} блоков", end="", file=sys.stderr, flush=True)
+
+    result = run_simulation(biomes, params, workers=args.workers, chunk_size=args.chunk_size, progress=progress)
+    print(file=sys.stderr)
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import json
+import time
+
+from sqlite_store import SQLiteStore
+
+
+# Состояние фоновых Монте-Карло симуляций (/api/simulations) в SQLite. Задачу считает
+# процесс, который её принял, а прочитать прогресс и результат может любой процесс
+# serve.py. Завершённые задачи удаляются через ttl секунд (purge).
+class SimulationJobStore(SQLiteStore):
+    def __init__(self, db_path):
+        super().__init__(db_path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS simulation_jobs ("
+            " id TEXT PRIMARY KEY,"
+            " status TEXT NOT NULL,"
+            " done_chunks INTEGER NOT NULL DEFAULT 0,"
+            " total_chunks INTEGER,"
+            " params TEXT NOT NULL,"
+            " result TEXT,"
+            " error TEXT,"
+            " created_at REAL NOT NULL,"
+            " finished_at REAL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS simulation_jobs_finished ON simulation_jobs (finished_at)"
+        )
+        self._conn.commit()
+
+    def create(self, job_id, params):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO simulation_jobs (id, status, params, created_at) VALUES (?, 'running', ?, ?)",
+                (job_id, json.dumps(params, ensure_ascii=False), time.time())
+            )
+        return {"id": job_id, "status": "running", "done_chunks": 0, "total_chunks": None,
+                "params": params, "result": None, "error": None}
+
+    def progress(self, job_id, done, total):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE simulation_jobs SET done_chunks = ?, total_chunks = ? WHERE id = ?", (done, total, job_id)
+            )
+
+    def finish(self, job_id, result):
+        self._finish(job_id, "done", json.dumps(result, ensure_ascii=False), None)
+
+    def fail(self, job_id, error):
+        self._finish(job_id, "failed", None, error)
+
+    def _finish(self, job_id, status, result, error):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE simulation_jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+                (status, result, error, time.time(), job_id)
+            )
+
+    def get(self, job_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, status, done_chunks, total_chunks, params, result, error"
+                " FROM simulation_jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        job_id, status, done, total, params, result, error = row
+        return {"id": job_id, "status": status, "done_chunks": done, "total_chunks": total,
+                "params": json.loads(params), "result": json.loads(result) if result else None, "error": error}
+
+    def purge(self, ttl):
+        # Удаляет задачи, завершённые больше ttl секунд назад; возвращает их число
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "DELETE FROM simulation_jobs WHERE finished_at < ?", (time.time() - ttl,)
+            ).rowcount
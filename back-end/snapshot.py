@@ -0,0 +1,271 @@
+import argparse
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import shapely
+
+from asteroid_catalog import AsteroidCatalog
+from biome_index import build_lod, load_biomes
+from neows_ingest import iter_records
+
+try:
+    import fcntl
+except ImportError:  # Windows: сборка снапшотов без межпроцессной блокировки
+    fcntl = None
+
+log = logging.getLogger(__name__)
+
+
+# Бинарные снапшоты исходных данных для быстрого старта.
+# biomes.geojson -> каталог с WKB всех геометрий (один memory-mapped массив байт
+# + смещения) и колоночной таблицей атрибутов, плюс отдельный каталог с упрощёнными
+# контурами (LOD) для каждого допуска; asteroids.json -> колоночный каталог
+# (см. asteroid_catalog.py), колонки открываются через mmap.
+# Снапшот привязан к sha256 исходного файла: если файл изменился, снапшот
+# не используется, данные читаются из исходника и снапшот пересобирается.
+
+SNAPSHOT_DIR = ".snapshots"
+SNAPSHOT_FORMAT = 2
+
+
+def file_hash(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _snapshot_path(source_path, source_hash, suffix=""):
+    name = os.path.basename(source_path)
+    return os.path.join(SNAPSHOT_DIR, f"{name}-{source_hash[:16]}{suffix}")
+
+
+def _remove_stale(source_path, source_hash):
+    # Снапшоты предыдущих версий того же файла больше не нужны
+    if not os.path.isdir(SNAPSHOT_DIR):
+        return
+    prefix = os.path.basename(source_path) + "-"
+    current = os.path.basename(_snapshot_path(source_path, source_hash))
+    for entry in os.listdir(SNAPSHOT_DIR):
+        path = os.path.join(SNAPSHOT_DIR, entry)
+        if entry.startswith(prefix) and not entry.startswith(current):
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                os.remove(path)
+
+
+def _write_wkb(directory, name, geoms):
+    wkb = shapely.to_wkb(geoms)
+    offsets = np.zeros(len(wkb) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(b) for b in wkb])
+    np.save(os.path.join(directory, f"{name}.npy"), np.frombuffer(b"".join(wkb), dtype=np.uint8))
+    np.save(os.path.join(directory, f"{name}.offsets.npy"), offsets)
+
+
+def _read_wkb(directory, name):
+    wkb = np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")
+    offsets = np.load(os.path.join(directory, f"{name}.offsets.npy"))
+    return shapely.from_wkb([wkb[offsets[i]:offsets[i + 1]].tobytes() for i in range(len(offsets) - 1)])
+
+
+def _publish(tmp, target):
+    # Каталог появляется целиком или не появляется вовсе
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(tmp, target)
+
+
+def _write_snapshot(target, write):
+    # write(каталог) заполняет уникальный временный каталог рядом с target, затем он
+    # публикуется под именем target; процессы, собирающие снапшот одновременно, не пишут
+    # в один и тот же временный каталог
+    tmp = tempfile.mkdtemp(dir=os.path.dirname(target), prefix=os.path.basename(target) + ".tmp-")
+    try:
+        write(tmp)
+        _publish(tmp, target)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+
+@contextmanager
+def _build_lock(target):
+    # Межпроцессная блокировка сборки снапшота target: процессы, которым он нужен
+    # одновременно (воркеры serve.py --no-preload, подпроцессы перезагрузки данных),
+    # собирают его один раз — остальные ждут и читают готовый. Без fcntl или без прав
+    # на запись в SNAPSHOT_DIR каждый процесс собирает сам
+    lock = None
+    if fcntl is not None:
+        try:
+            os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+            lock = open(target + ".lock", "a")
+        except OSError as e:
+            log.warning(f"Could not lock snapshot {target}: {e}")
+    if lock is None:
+        yield
+        return
+    with lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _read_snapshot(path, read):
+    # read(path) -> данные или None (снапшот не подходит); None, если снапшота нет или он битый
+    if not os.path.isdir(path):
+        return None
+    try:
+        return read(path)
+    except Exception as e:
+        log.warning(f"Could not read snapshot {path}: {e}")
+        return None
+
+
+def write_biomes_snapshot(biomes, source_path, source_hash):
+    target = _snapshot_path(source_path, source_hash)
+
+    def write(tmp):
+        _write_wkb(tmp, "wkb", [geom for geom, _, _, _ in biomes])
+        with open(os.path.join(tmp, "attributes.json"), "w", encoding="utf-8") as f:
+            json.dump({
+                "format": SNAPSHOT_FORMAT,
+                "source_hash": source_hash,
+                "eco_name": [b[1] for b in biomes],
+                "biome_code": [b[2] for b in biomes],
+                "realm": [b[3] for b in biomes],
+            }, f, ensure_ascii=False)
+
+    _write_snapshot(target, write)
+    _remove_stale(source_path, source_hash)
+    return target
+
+
+def read_biomes_snapshot(path, source_hash):
+    with open(os.path.join(path, "attributes.json"), "r", encoding="utf-8") as f:
+        attributes = json.load(f)
+    if attributes.get("format") != SNAPSHOT_FORMAT or attributes.get("source_hash") != source_hash:
+        return None
+    geoms = _read_wkb(path, "wkb")
+    return list(zip(geoms.tolist(), attributes["eco_name"], attributes["biome_code"], attributes["realm"]))
+
+
+def load_biomes_cached(source_path, source_hash=None):
+    # Как load_biomes, но через снапшот; FileNotFoundError, если нет исходника
+    source_hash = source_hash or file_hash(source_path)
+    path = _snapshot_path(source_path, source_hash)
+
+    def read(p):
+        return read_biomes_snapshot(p, source_hash)
+
+    biomes = _read_snapshot(path, read)
+    if biomes is not None:
+        return biomes
+    with _build_lock(path):
+        # Пока ждали блокировку, снапшот мог собрать другой процесс
+        biomes = _read_snapshot(path, read)
+        if biomes is not None:
+            return biomes
+        biomes = load_biomes(source_path)
+        try:
+            os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+            write_biomes_snapshot(biomes, source_path, source_hash)
+        except Exception as e:
+            log.warning(f"Could not write snapshot for {source_path}: {e}")
+    return biomes
+
+
+def load_catalog_cached(source_path, source_hash=None):
+    # Каталог астероидов из JSON-списка через колоночный снапшот;
+    # FileNotFoundError, если нет исходника
+    source_hash = source_hash or file_hash(source_path)
+    path = _snapshot_path(source_path, source_hash, "-catalog")
+    catalog = _read_snapshot(path, AsteroidCatalog.load)
+    if catalog is not None:
+        return catalog
+    with _build_lock(path):
+        catalog = _read_snapshot(path, AsteroidCatalog.load)
+        if catalog is not None:
+            return catalog
+        # Файл разбирается потоково, список словарей целиком в памяти не строится
+        catalog = AsteroidCatalog.from_records(iter_records(source_path))
+        try:
+            os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+            _write_snapshot(path, catalog.save)
+            _remove_stale(source_path, source_hash)
+        except Exception as e:
+            log.warning(f"Could not write snapshot for {source_path}: {e}")
+    return catalog
+
+
+def load_lod_cached(source_path, biomes, tolerance, source_hash=None):
+    # Упрощённые контуры (см. biome_index.build_lod) строятся долго, поэтому тоже кэшируются
+    source_hash = source_hash or file_hash(source_path)
+    path = _snapshot_path(source_path, source_hash, f"-lod-{tolerance}")
+
+    def read(p):
+        inner, outer = _read_wkb(p, "inner"), _read_wkb(p, "outer")
+        return (inner, outer) if len(inner) == len(biomes) else None
+
+    def write(tmp):
+        _write_wkb(tmp, "inner", inner)
+        _write_wkb(tmp, "outer", outer)
+
+    lod = _read_snapshot(path, read)
+    if lod is not None:
+        return lod
+    with _build_lock(path):
+        lod = _read_snapshot(path, read)
+        if lod is not None:
+            return lod
+        inner, outer = build_lod(biomes, tolerance)
+        try:
+            os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+            _write_snapshot(path, write)
+        except Exception as e:
+            log.warning(f"Could not write LOD snapshot for {source_path}: {e}")
+    return inner, outer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сборка бинарных снапшотов biomes.geojson и asteroids.json")
+    parser.add_argument("--biomes", default="biomes.geojson")
+    parser.add_argument("--asteroids", default="asteroids.json")
+    parser.add_argument("--lod", type=float, default=None, help="также построить упрощённые контуры с этим допуском")
+    parser.add_argument("--no-biomes", action="store_true")
+    parser.add_argument("--no-asteroids", action="store_true")
+    args = parser.parse_args()
+
+    sources = []
+    if not args.no_biomes:
+        sources.append((args.biomes, load_biomes_cached))
+    if not args.no_asteroids:
+        sources.append((args.asteroids, load_catalog_cached))
+    for source, loader in sources:
+        if not os.path.exists(source):
+            print(f"Warning: {source} not found, пропускаем")
+            continue
+        started = time.perf_counter()
+        loader(source)
+        print(f"✅ {source}: снапшот готов за {time.perf_counter() - started:.2f} с")
+
+    if args.lod and not args.no_biomes and os.path.exists(args.biomes):
+        started = time.perf_counter()
+        load_lod_cached(args.biomes, load_biomes_cached(args.biomes), args.lod)
+        print(f"✅ {args.biomes}: LOD {args.lod} готов за {time.perf_counter() - started:.2f} с")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+
+log = logging.getLogger(__name__)
+
+
+# Общая основа хранилищ в SQLite (geo_store.py, custom_asteroid_store.py):
+# соединение в режиме WAL, служебная таблица meta и однократный перенос старого
+# JSON-файла. Соединение SQLite нельзя передавать через fork: перед запуском
+# воркеров serve.py процесс-мастер закрывает его (close), каждый воркер открывает
+# своё (reopen). Все обращения к соединению — под self._lock.
+class SQLiteStore:
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._conn.commit()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def reopen(self):
+        with self._lock:
+            self._conn = self._connect()
+            self._reopened()
+
+    def _reopened(self):
+        # Вызывается под блокировкой после reopen
+        pass
+
+    def _get_meta(self, key):
+        # Вызывается под блокировкой
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key, value):
+        # Вызывается под блокировкой, внутри транзакции записи
+        self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+    def migrate_json(self, json_path):
+        # Однократный перенос старого JSON-файла в базу. Сам файл не трогается (он лежит
+        # в git), отметка о переносе пишется в meta в той же транзакции, что и данные:
+        # процессы, стартующие одновременно (serve.py --no-preload), переносят его
+        # ровно один раз. Уже перенесённый файл при старте не разбирается
+        if not os.path.exists(json_path):
+            return 0
+        key = f"migrated:{os.path.basename(json_path)}"
+        with self._lock:
+            if self._get_meta(key) is not None:
+                return 0
+        try:
+            with open(json_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, Exception) as e:
+            log.warning(f"Could not migrate {json_path}: {e}")
+            return 0
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            # Пока файл разбирался, его мог перенести другой процесс
+            if self._get_meta(key) is not None:
+                return 0
+            count = self._import_legacy(data)
+            self._set_meta(key, count)
+        log.info(f"✅ {count} записей перенесено из {json_path} в {self.db_path}")
+        return count
+
+    def _import_legacy(self, data):
+        # Запись содержимого старого JSON-файла; вызывается внутри транзакции, возвращает число записей
+        raise NotImplementedError
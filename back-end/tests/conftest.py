@@ -0,0 +1,33 @@
+import json
+import os
+import sys
+
+import pytest
+
+# Модули бэкенда лежат плоско в back-end/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def api(tmp_path_factory):
+    # Модуль app.py над небольшими синтетическими данными. app.py при импорте читает
+    # biomes.geojson и asteroids.json и открывает базы относительно текущего каталога,
+    # поэтому до конца сессии текущим остаётся временный каталог
+    from benchmarks.synthetic import make_asteroids, make_biomes_geojson
+
+    directory = tmp_path_factory.mktemp("api")
+    with open(directory / "biomes.geojson", "w", encoding="utf-8") as f:
+        json.dump(make_biomes_geojson(n_features=30, vertices=60), f)
+    with open(directory / "asteroids.json", "w", encoding="utf-8") as f:
+        json.dump(make_asteroids(300), f)
+    previous = os.getcwd()
+    os.chdir(directory)
+    import app
+    app.app.testing = True
+    yield app
+    os.chdir(previous)
+
+
+@pytest.fixture
+def client(api):
+    return api.app.test_client()
@@ -0,0 +1,86 @@
+import pytest
+
+CUSTOM = {"name": "Test rock", "diameter": 100, "density": 3000, "velocity": 17, "angle": 45}
+
+
+def test_create_custom_asteroid(client):
+    response = client.post("/api/asteroids/custom", json=CUSTOM)
+    assert response.status_code == 201
+    asteroid = response.get_json()["asteroid"]
+    assert asteroid["mass_kg"] == pytest.approx(1_570_796_326.79, rel=1e-9)
+    footprint = client.get(f"/api/impact/footprint?lat=0&lon=0&asteroid={asteroid['id']}")
+    assert footprint.status_code == 200
+
+
+@pytest.mark.parametrize("field, value", [
+    ("diameter", None),
+    ("diameter", "100"),
+    ("diameter", True),
+    ("density", [3000]),
+    ("velocity", float("nan")),
+    ("angle", float("inf")),
+    ("diameter", 10 ** 400),
+    # Конечные параметры, но масса и энергия переполняются
+    ("diameter", 1e200),
+    ("velocity", 1e300),
+])
+def test_create_custom_asteroid_rejects_bad_numbers(api, client, field, value):
+    before = len(api.custom_store)
+    response = client.post("/api/asteroids/custom", json={**CUSTOM, field: value})
+    assert response.status_code == 400, response.get_json()
+    assert field in response.get_json()["error"] or "Параметры" in response.get_json()["error"]
+    assert len(api.custom_store) == before
+
+
+@pytest.mark.parametrize("method, path", [
+    ("post", "/api/admin/reload"),
+    ("get", "/api/admin/reload"),
+    ("post", "/api/geo/stats/rebuild"),
+])
+def test_admin_endpoints_closed_without_token(api, client, monkeypatch, method, path):
+    monkeypatch.setattr(api, "ADMIN_TOKEN", None)
+    assert getattr(client, method)(path, json={"targets": ["risks"]}).status_code == 403
+    monkeypatch.setattr(api, "ADMIN_TOKEN", "secret")
+    assert getattr(client, method)(path, json={"targets": ["risks"]}).status_code == 403
+    headers = {"X-Admin-Token": "wrong"}
+    assert getattr(client, method)(path, json={"targets": ["risks"]}, headers=headers).status_code == 403
+
+
+def test_admin_endpoints_with_token(api, client, monkeypatch):
+    monkeypatch.setattr(api, "ADMIN_TOKEN", "secret")
+    headers = {"X-Admin-Token": "secret"}
+    assert client.post("/api/admin/reload", json={"targets": ["nope"]}, headers=headers).status_code == 400
+    response = client.post("/api/admin/reload", json={"targets": ["risks"], "wait": True}, headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()["last"]["targets"] == ["risks"]
+    assert client.post("/api/geo/stats/rebuild", headers=headers).status_code == 200
+
+
+def test_query_asteroids_pages(client):
+    first = client.get("/api/asteroids?limit=250&sort=-diameter").get_json()
+    assert first["count"] == 300 and len(first["asteroids"]) == 250
+    rest = client.get(f"/api/asteroids?limit=250&sort=-diameter&cursor={first['next_cursor']}").get_json()
+    assert len(rest["asteroids"]) == 50 and rest["next_cursor"] is None
+
+
+@pytest.mark.parametrize("query", [
+    "limit=abc", "limit=1.5", "limit=0", "limit=100000", "cursor=x", "cursor=-1", "sort=mass",
+    "hazardous=maybe", "min_diameter=abc", "date_from=yesterday",
+])
+def test_query_asteroids_rejects_bad_parameters(client, query):
+    response = client.get(f"/api/asteroids?{query}")
+    assert response.status_code == 400
+    assert "error" in response.get_json()
+
+
+def test_all_asteroids_cached_body(api, client):
+    # Готовое тело совпадает с jsonify полного списка, отформатированные записи в кэше не остаются
+    with api.app.app_context():
+        expected = api.jsonify({"count": 300, "asteroids": api.format_asteroids(api.catalog_data.catalog.records())})
+    response = client.get("/api/asteroids/all")
+    assert response.data == expected.get_data()
+    assert client.get("/api/asteroids/all", headers={"If-None-Match": response.headers["ETag"]}).status_code == 304
+    body = client.get("/api/asteroids/all-with-custom").get_json()
+    assert body["nasa_count"] == 300 and body["count"] == 300 + body["custom_count"]
+    assert body["asteroids"][:300] == response.get_json()["asteroids"]
+    assert set(api.catalog_cache.keys()) <= {"all", "all-with-custom"}
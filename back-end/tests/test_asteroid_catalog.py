@@ -0,0 +1,154 @@
+import itertools
+import math
+import random
+
+import pytest
+
+from asteroid_catalog import NUMERIC_FIELDS, SORT_KEYS, AsteroidCatalog, normalize_name, parse_date
+from benchmarks.synthetic import make_asteroids
+
+FIELDS = {"date": "date", **{column: field for field, column in NUMERIC_FIELDS}}
+
+# Записи, которые не ложатся в колонки: восстанавливаются через irregular
+IRREGULAR = [
+    {"name": "No date", "hazardous": True, "estimated_diameter_m": 100},
+    {"name": "Bad date", "date": "2025-1-1", "hazardous": False, "velocity_km_s": 12.5},
+    {"name": "Null date", "date": None, "hazardous": False},
+    {"date": "2030-05-05", "hazardous": True, "estimated_diameter_m": 7.0},
+    {"name": 12345, "date": "2030-05-05", "hazardous": False},
+    {"name": "String hazard", "hazardous": "yes", "date": "2031-01-01"},
+    {"name": "No hazard", "date": "2031-01-02"},
+    {"name": "Weird numbers", "hazardous": False, "estimated_diameter_m": "big", "velocity_km_s": True,
+     "miss_distance_km": None, "mass_kg": 2 ** 60},
+    {"name": "Extra", "hazardous": False, "date": "2029-12-31", "orbit": {"a": 1.2, "e": [0.1]}, "tags": []},
+    {"name": "  Spaced  Name ", "hazardous": False, "mass_kg": 1.5e12, "estimated_diameter_m": float("inf")},
+]
+
+
+def make_records():
+    rng = random.Random(5)
+    records = make_asteroids(1500, seed=3)
+    for record in records:
+        # Много равных значений: порядок при равенстве — порядок каталога
+        record["estimated_diameter_m"] = float(round(record["estimated_diameter_m"] / 100))
+        record["velocity_km_s"] = round(record["velocity_km_s"])
+        if rng.random() < 0.1:
+            del record["miss_distance_km"]
+        if rng.random() < 0.05:
+            del record["date"]
+    # Дубликат имени: find возвращает первую запись
+    records.append({**records[10], "hazardous": not records[10]["hazardous"]})
+    records[700:700] = IRREGULAR
+    return records
+
+
+RECORDS = make_records()
+
+
+@pytest.fixture(scope="module", params=["memory", "mmap"])
+def catalog(request, tmp_path_factory):
+    catalog = AsteroidCatalog.from_records(RECORDS)
+    if request.param == "mmap":
+        directory = tmp_path_factory.mktemp("catalog")
+        catalog.save(str(directory))
+        catalog = AsteroidCatalog.load(str(directory))
+    return catalog
+
+
+def column_value(record, key):
+    # Значение записи в колонке key, как его видит каталог (None — нет значения)
+    field = FIELDS[key]
+    value = record.get(field)
+    if key == "date":
+        return parse_date(value)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    if isinstance(value, int) and abs(value) > 2 ** 53:
+        return None
+    return value
+
+
+def scan(hazardous=None, ranges=None, sort=None):
+    # Эталон: полный перебор списка записей
+    rows = []
+    for i, record in enumerate(RECORDS):
+        if hazardous is not None and bool(record.get("hazardous")) != hazardous:
+            continue
+        ok = True
+        for key, (low, high) in (ranges or {}).items():
+            value = column_value(record, key)
+            if value is None or (low is not None and value < low) or (high is not None and value > high):
+                ok = False
+        if ok:
+            rows.append(i)
+    if sort is not None:
+        key, sign = sort.lstrip("-"), -1 if sort.startswith("-") else 1
+
+        def order(i):
+            value = column_value(RECORDS[i], key)
+            missing = value is None or math.isnan(value)
+            return (missing, 0 if missing else sign * value, i)
+
+        rows.sort(key=order)
+    return rows
+
+
+def read_all_pages(catalog, limit, **query):
+    rows, cursor, pages = [], 0, 0
+    while cursor is not None:
+        page, total, cursor = catalog.query(limit=limit, cursor=cursor, **query)
+        assert len(page) <= limit
+        rows += page
+        pages += 1
+        assert pages <= len(RECORDS) + 1
+    return rows, total
+
+
+QUERIES = [
+    {},
+    {"hazardous": True},
+    {"hazardous": False, "sort": "-diameter"},
+    {"ranges": {"date": (parse_date("2015-01-01"), parse_date("2025-06-30"))}},
+    {"ranges": {"diameter": (3.0, 12.0), "velocity": (10, None)}, "sort": "-velocity"},
+    {"ranges": {"diameter": (None, 5.0), "date": (parse_date("2020-01-01"), None)}, "hazardous": True,
+     "sort": "date"},
+    {"ranges": {"miss_distance": (1e6, 3e7), "velocity": (None, 25)}, "sort": "-miss_distance"},
+    {"ranges": {"velocity": (100, None)}},
+    {"ranges": {"diameter": (8.0, 8.0)}, "sort": "-date"},
+] + [{"sort": sort} for sort in itertools.chain(SORT_KEYS, ("-" + key for key in SORT_KEYS))]
+
+
+@pytest.mark.parametrize("query", QUERIES)
+@pytest.mark.parametrize("limit", [3, 100, 5000])
+def test_query_matches_list_scan(catalog, query, limit):
+    rows, total = read_all_pages(catalog, limit, **query)
+    expected = scan(**query)
+    assert total == len(expected)
+    assert rows == expected
+
+
+def test_cursor_past_the_end(catalog):
+    assert catalog.query(cursor=len(RECORDS) + 5) == ([], len(RECORDS), None)
+    assert catalog.query(hazardous=True, cursor=len(RECORDS))[2] is None
+
+
+def test_records_round_trip(catalog):
+    assert catalog.records() == RECORDS
+    for i in range(700, 700 + len(IRREGULAR)):
+        assert catalog.record(i) == RECORDS[i]
+    rows = [705, 3, 1200, 707, 3]
+    assert catalog.records(rows) == [RECORDS[i] for i in rows]
+
+
+def test_find_matches_list_scan(catalog):
+    def expected(name):
+        # Как в исходном поиске: запись без имени считается записью с именем ""
+        key = normalize_name(name)
+        return next((i for i, r in enumerate(RECORDS) if isinstance(r.get("name", ""), str)
+                     and normalize_name(r.get("name", "")) == key), None)
+
+    names = [r["name"] for r in RECORDS[::97] if isinstance(r.get("name"), str)]
+    names += [RECORDS[10]["name"], "spacedname", "SPACED NAME", "12345", "missing rock", ""]
+    for name in names:
+        assert catalog.find(name) == expected(name), name
+    assert catalog.find(RECORDS[10]["name"]) == 10
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+import shapely
+
+import biome_raster
+from benchmarks.bench_find_biome import boundary_points, linear_locate
+from benchmarks.synthetic import make_biomes_geojson, random_points
+from biome_index import BiomeIndex, build_lod
+
+LOD_TOLERANCE = 0.01
+
+
+@pytest.fixture(scope="module")
+def biomes():
+    # Синтетические "материки" (соседние слегка перекрываются) плюс явное перекрытие:
+    # при нескольких содержащих полигонах выигрывает первый в порядке biomes
+    biomes = [
+        (shapely.geometry.shape(ft["geometry"]), ft["properties"]["ECO_NAME"], ft["properties"]["BIOME"],
+         ft["properties"]["REALM"])
+        for ft in make_biomes_geojson(n_features=120, vertices=300)["features"]
+    ]
+    first = biomes[0][0]
+    biomes.append((shapely.buffer(first, 0.5), "Overlap", 5.0, "PA"))
+    return biomes
+
+
+@pytest.fixture(scope="module")
+def points(biomes):
+    # Случайные точки, точки в полосе LOD у вершин и совсем рядом с границей
+    return (
+        random_points(3000)
+        + boundary_points(biomes, 3000, LOD_TOLERANCE * 2, seed=1)
+        + boundary_points(biomes, 3000, LOD_TOLERANCE / 100, seed=2)
+    )
+
+
+@pytest.fixture(scope="module")
+def exact(biomes, points):
+    return [linear_locate(biomes, lat, lon) for lat, lon in points]
+
+
+@pytest.fixture(scope="module")
+def indexes(biomes):
+    lod = build_lod(biomes, LOD_TOLERANCE)
+    raster = biome_raster.build_raster(biomes, 0.7)
+    return {
+        "index": BiomeIndex(biomes),
+        "lod": BiomeIndex(biomes, lod=lod),
+        "raster": BiomeIndex(biomes, raster=raster),
+        "raster+lod": BiomeIndex(biomes, raster=raster, lod=lod),
+    }
+
+
+@pytest.mark.parametrize("name", ["index", "lod", "raster", "raster+lod"])
+def test_locate_matches_linear_scan(indexes, points, exact, name):
+    index = indexes[name]
+    found = [index.locate(lat, lon) for lat, lon in points]
+    mismatches = [(p, a, b) for p, a, b in zip(points, exact, found) if a != b]
+    assert not mismatches, mismatches[:5]
+
+
+@pytest.mark.parametrize("name", ["index", "lod", "raster", "raster+lod"])
+def test_locate_many_matches_linear_scan(indexes, points, exact, name):
+    index = indexes[name]
+    lats, lons = (np.array(c) for c in zip(*points))
+    found = [None if i < 0 else i for i in index.locate_many(lats, lons).tolist()]
+    assert found == exact
+
+
+def test_points_cover_land_ocean_and_overlap(biomes, exact):
+    # Проверка самого теста: в выборке есть океан, суша и обе стороны границы перекрытия
+    assert None in exact
+    assert sum(i is not None for i in exact) > 1000
+    assert 0 in exact and len(biomes) - 1 in exact
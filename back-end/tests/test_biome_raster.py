@@ -0,0 +1,75 @@
+import itertools
+
+import numpy as np
+import pytest
+import shapely
+
+import biome_raster
+from biome_index import BiomeIndex
+
+
+# Полигоны, чьи края лежат рядом с полюсом и антимеридианом, но не на них
+BIOMES = [
+    (shapely.box(0, 80, 60, 89.92), "North cap", "11", "PA"),
+    (shapely.box(170, -10, 179.85, 10), "East edge", "1", "OC"),
+    (shapely.box(-180, -90, -170, -80), "South-west corner", "1", "AN"),
+    (shapely.box(-20, -20, 20, 20), "Centre", "7", "AT"),
+    (shapely.box(-10, -10, 10, 10), "Centre overlap", "8", "AT"),
+]
+
+EDGE_LATS = (-90, -89.999, -89.95, -80, -10, 0, 10, 80, 89.9, 89.919, 89.95, 89.999, 90)
+EDGE_LONS = (-180, -179.999, -170, -20, 0, 10, 20, 170, 179.8, 179.849, 179.9, 179.999, 180)
+
+
+def raster_answer(raster, lat, lon):
+    # None — океан, индекс полигона или MIXED (решает точная проверка)
+    code = raster.lookup(lat, lon)
+    if code == raster.MIXED:
+        return raster.MIXED
+    return None if code == raster.OCEAN else code - 1
+
+
+@pytest.mark.parametrize("resolution", [0.7, 0.25, 1.0, 7.0, 45.0])
+def test_raster_agrees_with_exact_lookup_at_edges(resolution):
+    raster = biome_raster.build_raster(BIOMES, resolution)
+    assert raster.grid.shape == biome_raster.grid_shape(resolution)
+    exact = BiomeIndex(BIOMES)
+    fast = BiomeIndex(BIOMES, raster=raster)
+
+    rng = np.random.default_rng(0)
+    lats = list(EDGE_LATS) + rng.uniform(-90, 90, 2000).tolist()
+    lons = list(EDGE_LONS) + rng.uniform(-180, 180, 2000).tolist()
+    points = list(itertools.product(EDGE_LATS, EDGE_LONS)) + list(zip(lats, lons))
+    for lat, lon in points:
+        expected = exact.locate(lat, lon)
+        answer = raster_answer(raster, lat, lon)
+        assert answer == raster.MIXED or answer == expected, (lat, lon)
+        assert fast.locate(lat, lon) == expected, (lat, lon)
+
+    lat_arr, lon_arr = np.array([p[0] for p in points]), np.array([p[1] for p in points])
+    expected = exact.locate_many(lat_arr, lon_arr)
+    assert np.array_equal(fast.locate_many(lat_arr, lon_arr), expected)
+
+
+def test_resolution_that_does_not_divide_180_covers_pole():
+    # Пример из ревью: при округлении размера сетки точка (89.95, 10) попадала
+    # в ячейку [89.2, 89.9] внутри полигона, хотя сама вне его
+    raster = biome_raster.build_raster(BIOMES, 0.7)
+    assert BiomeIndex(BIOMES).locate(89.95, 10) is None
+    assert raster_answer(raster, 89.95, 10) in (None, raster.MIXED)
+
+
+def test_save_and_load_round_trip(tmp_path):
+    path = str(tmp_path / "raster.npy")
+    raster = biome_raster.build_raster(BIOMES, 0.7, source_hash="abc")
+    raster.save(path)
+    loaded = biome_raster.load_raster_for(path, "abc")
+    assert np.array_equal(np.asarray(loaded.grid), raster.grid)
+    assert loaded.resolution == 0.7
+    assert biome_raster.load_raster_for(path, "other") is None
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["raster.npy", "raster.npy.json"]
+
+
+def test_invalid_resolution_rejected():
+    with pytest.raises(ValueError):
+        biome_raster.build_raster(BIOMES, 0)
@@ -0,0 +1,89 @@
+import multiprocessing
+import sys
+import threading
+
+import pytest
+
+from custom_asteroid_store import CustomAsteroidStore
+
+FIELDS = {"diameter": 100, "density": 3000, "velocity": 17, "angle": 45}
+
+
+def churn(store, n, per_worker):
+    # Создаёт per_worker записей и каждую вторую сразу удаляет; возвращает id оставшихся
+    kept = []
+    for i in range(per_worker):
+        record = store.create({"name": f"load-{n}-{i}", **FIELDS})
+        if i % 2:
+            assert store.delete(record["id"])
+        else:
+            kept.append(record["id"])
+    return kept
+
+
+def run_threads(stores, per_worker):
+    kept, errors = [], []
+    lock = threading.Lock()
+
+    def worker(n, store):
+        try:
+            ids = churn(store, n, per_worker)
+        except Exception as e:
+            errors.append(e)
+            return
+        with lock:
+            kept.extend(ids)
+
+    threads = [threading.Thread(target=worker, args=(n, store)) for n, store in enumerate(stores)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    return kept
+
+
+def assert_no_lost_updates(db_path, stores, kept):
+    expected = set(kept)
+    assert len(kept) == len(expected)
+    for store in stores:
+        assert {a["id"] for a in store.all()} == expected
+        assert len(store) == len(expected)
+    assert {a["id"] for a in CustomAsteroidStore(db_path).all()} == expected
+
+
+def test_concurrent_create_delete_shared_store(tmp_path):
+    # Потоки одного процесса работают с одним хранилищем
+    db_path = str(tmp_path / "custom.db")
+    store = CustomAsteroidStore(db_path)
+    kept = run_threads([store] * 8, 60)
+    assert_no_lost_updates(db_path, [store], kept)
+
+
+def test_concurrent_create_delete_separate_connections(tmp_path):
+    # Каждый поток со своим соединением — как воркеры serve.py над одной базой
+    db_path = str(tmp_path / "custom.db")
+    stores = [CustomAsteroidStore(db_path) for _ in range(6)]
+    kept = run_threads(stores, 40)
+    assert_no_lost_updates(db_path, stores, kept)
+
+
+def churn_in_process(db_path, n, per_worker, queue):
+    queue.put(churn(CustomAsteroidStore(db_path), n, per_worker))
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="нужен fork")
+def test_concurrent_create_delete_processes(tmp_path):
+    db_path = str(tmp_path / "custom.db")
+    store = CustomAsteroidStore(db_path)
+    context = multiprocessing.get_context("fork")
+    queue = context.Queue()
+    processes = [context.Process(target=churn_in_process, args=(db_path, n, 30, queue)) for n in range(4)]
+    for p in processes:
+        p.start()
+    kept = [i for _ in processes for i in queue.get(timeout=60)]
+    for p in processes:
+        p.join(timeout=60)
+        assert p.exitcode == 0
+    kept += churn(store, len(processes), 10)
+    assert_no_lost_updates(db_path, [store], kept)
@@ -0,0 +1,51 @@
+import os
+import signal
+
+import pytest
+
+from data_reload import RELOAD_TARGETS, ReloadChannel, check_targets
+
+
+@pytest.fixture
+def channel_path(tmp_path):
+    # Мастер — сам процесс теста: SIGHUP только отмечается
+    received = []
+    previous = signal.signal(signal.SIGHUP, lambda signum, frame: received.append(signum))
+    yield str(tmp_path / "reload.jsonl"), received
+    signal.signal(signal.SIGHUP, previous)
+
+
+def test_check_targets():
+    assert check_targets(["risks", "catalog", "risks"]) == ["catalog", "risks"]
+    for bad in (["nope"], "catalog", [1], None, [["catalog"]]):
+        with pytest.raises(ValueError):
+            check_targets(bad)
+
+
+def test_channel_delivers_targets_and_force_to_every_worker(channel_path):
+    path, received = channel_path
+    sender = ReloadChannel(path, os.getpid())
+    other = ReloadChannel(path, os.getpid())
+
+    sender.send(["catalog"], force=True)
+    sender.send(["risks"])
+    assert received == [signal.SIGHUP, signal.SIGHUP]
+    assert other.receive() == (["catalog", "risks"], True)
+    assert sender.receive() == (["catalog", "risks"], True)
+    # Сигнал без новых запросов (kill -HUP мастеру) — все цели без force
+    assert other.receive() == (list(RELOAD_TARGETS), False)
+
+    # Воркер, запущенный позже, старые запросы не выполняет
+    late = ReloadChannel(path, os.getpid())
+    assert late.receive() == (list(RELOAD_TARGETS), False)
+
+
+def test_channel_skips_bad_and_unfinished_lines(channel_path):
+    path, _ = channel_path
+    worker = ReloadChannel(path, os.getpid())
+    with open(path, "a") as f:
+        f.write('{"targets": ["nope"]}\n{broken\n{"targets": ["biomes"], "force": false}\n{"targets": ["cat')
+    assert worker.receive() == (["biomes"], False)
+    with open(path, "a") as f:
+        f.write('alog"], "force": true}\n')
+    assert worker.receive() == (["catalog"], True)
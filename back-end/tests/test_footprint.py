@@ -0,0 +1,46 @@
+import math
+
+import pytest
+import shapely
+
+import footprint
+from biome_index import BiomeIndex
+
+
+BIOMES = [
+    (shapely.box(-10, -10, 0, 10), "West", "1", "AT"),
+    (shapely.box(0, -10, 10, 10), "East", "7", "AT"),
+]
+
+
+@pytest.fixture(scope="module")
+def index():
+    return BiomeIndex(BIOMES)
+
+
+def test_footprint_fractions(index):
+    result = footprint.analyze_footprint(index, 0.0, 0.0, 100_000)
+    assert result["ocean_fraction"] == pytest.approx(0, abs=1e-9)
+    assert [b["fraction"] for b in result["biomes"]] == pytest.approx([0.5, 0.5], abs=1e-6)
+    assert result["area_km2"] == pytest.approx(math.pi * 100 ** 2, rel=1e-3)
+
+
+@pytest.mark.parametrize("lat, lon, radius_m", [
+    (0.0, 0.0, math.nan),
+    (0.0, 0.0, math.inf),
+    (0.0, 0.0, -math.inf),
+    (0.0, 0.0, 0.0),
+    (0.0, 0.0, -5.0),
+    (math.nan, 0.0, 1000.0),
+    (0.0, math.nan, 1000.0),
+    (math.inf, 0.0, 1000.0),
+    (0.0, -math.inf, 1000.0),
+    (90.5, 0.0, 1000.0),
+    (-91.0, 0.0, 1000.0),
+    (0.0, 180.5, 1000.0),
+    (0.0, -200.0, 1000.0),
+])
+def test_invalid_input_is_rejected(index, lat, lon, radius_m):
+    # Ошибка FootprintError — в API это ответ 400, а не 500 из shapely
+    with pytest.raises(footprint.FootprintError):
+        footprint.analyze_footprint(index, lat, lon, radius_m)
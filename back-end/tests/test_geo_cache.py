@@ -0,0 +1,127 @@
+import pytest
+
+import geo_cache
+from geo_cache import QuantizedLRUCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(geo_cache.time, "monotonic", clock)
+    return clock
+
+
+class Compute:
+    # Считает вызовы; ответ зависит только от (округлённой) точки и номера вызова
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, lat, lon):
+        self.calls.append((lat, lon))
+        return (lat, lon, len(self.calls))
+
+
+def test_quantized_key_and_hit():
+    cache, compute = QuantizedLRUCache(precision=2), Compute()
+    first = cache.get(10.123, -0.001, 1, compute)
+    assert compute.calls == [(10.12, 0.0)]
+    # Другая точка с тем же ключом и -0.0 вместо 0.0 — попадание
+    assert cache.get(10.1249, -0.0, 1, compute) is first
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_ttl_expiry(clock):
+    cache, compute = QuantizedLRUCache(ttl=60.0), Compute()
+    cache.get(1.0, 2.0, 1, compute)
+    clock.now += 59.9
+    cache.get(1.0, 2.0, 1, compute)
+    assert len(compute.calls) == 1
+    clock.now += 0.1
+    assert cache.get(1.0, 2.0, 1, compute)[2] == 2
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["expired"], stats["size"]) == (1, 2, 1, 1)
+    # Пересчитанная запись живёт ttl заново
+    clock.now += 59.9
+    cache.get(1.0, 2.0, 1, compute)
+    assert len(compute.calls) == 2
+
+
+def test_no_ttl(clock):
+    cache, compute = QuantizedLRUCache(ttl=None), Compute()
+    cache.get(1.0, 2.0, 1, compute)
+    clock.now += 10 ** 9
+    cache.get(1.0, 2.0, 1, compute)
+    assert len(compute.calls) == 1 and cache.stats()["expired"] == 0
+
+
+def test_version_change_invalidates():
+    cache, compute = QuantizedLRUCache(), Compute()
+    cache.get(1.0, 2.0, 1, compute)
+    cache.get(3.0, 4.0, 1, compute)
+    assert cache.get(1.0, 2.0, 2, compute)[2] == 3
+    stats = cache.stats()
+    assert (stats["invalidations"], stats["size"]) == (1, 1)
+    cache.get(1.0, 2.0, 2, compute)
+    assert len(compute.calls) == 3
+
+
+def test_stale_version_bypasses_cache():
+    cache, compute = QuantizedLRUCache(), Compute()
+    cache.get(1.0, 2.0, 5, compute)
+    # Запрос, начатый до перезагрузки: считается без кэша и не трогает записи версии 5
+    assert cache.get(1.0, 2.0, 4, compute)[2] == 2
+    assert cache.get(7.0, 8.0, 4, compute)[2] == 3
+    assert cache.get(1.0, 2.0, 5, compute)[2] == 1
+    stats = cache.stats()
+    assert (stats["size"], stats["invalidations"], stats["hits"], stats["misses"]) == (1, 0, 1, 3)
+
+
+def test_result_for_replaced_version_is_not_stored():
+    cache = QuantizedLRUCache()
+
+    def compute_during_reload(lat, lon):
+        # Пока считался промах версии 1, пришёл запрос с версией 2
+        cache.get(9.0, 9.0, 2, lambda lat, lon: "v2")
+        return "v1"
+
+    assert cache.get(1.0, 2.0, 1, compute_during_reload) == "v1"
+    assert cache.get(1.0, 2.0, 2, lambda lat, lon: "fresh") == "fresh"
+    assert cache.stats()["size"] == 2
+
+
+def test_lru_eviction_counts():
+    cache, compute = QuantizedLRUCache(max_entries=3), Compute()
+    for i in range(3):
+        cache.get(float(i), 0.0, 1, compute)
+    cache.get(0.0, 0.0, 1, compute)           # 0 — самая свежая, вытесняется 1
+    cache.get(3.0, 0.0, 1, compute)
+    cache.get(4.0, 0.0, 1, compute)           # вытесняется 2
+    assert cache.stats()["evictions"] == 2 and cache.stats()["size"] == 3
+    calls = len(compute.calls)
+    for i in (0, 3, 4):
+        cache.get(float(i), 0.0, 1, compute)
+    assert len(compute.calls) == calls
+    cache.get(1.0, 0.0, 1, compute)
+    cache.get(2.0, 0.0, 1, compute)
+    stats = cache.stats()
+    assert len(compute.calls) == calls + 2
+    assert (stats["evictions"], stats["size"], stats["hits"]) == (4, 3, 4)
+
+
+def test_clear_and_bad_size():
+    cache = QuantizedLRUCache()
+    cache.clear()
+    assert cache.stats()["invalidations"] == 0
+    cache.get(1.0, 2.0, 1, Compute())
+    cache.clear()
+    assert cache.stats()["invalidations"] == 1 and cache.stats()["size"] == 0
+    with pytest.raises(ValueError):
+        QuantizedLRUCache(max_entries=0)
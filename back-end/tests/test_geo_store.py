@@ -0,0 +1,66 @@
+import json
+import math
+import os
+
+from benchmarks.synthetic import make_geo_results
+from geo_store import GeoResultStore
+
+# Записи, которые /geo пишет для точек без биома, и записи старых форматов
+ODD_RESULTS = [
+    {"lat": 10.0, "lon": 20.0, "biome": "Unknown", "realm": "Unknown", "risk_level": "unknown"},
+    {"lat": 10.5, "lon": 20.5},
+    {"lat": math.nan, "lon": 0.0, "biome": 9.0, "risk_level": "Unknown"},
+    {"lat": -90.0, "lon": 180.0, "biome": " 9 ", "realm": "PA", "risk_level": "High"},
+    {"biome": None, "realm": "", "risk_level": None},
+]
+
+
+def test_rebuild_matches_incremental_counts(tmp_path):
+    store = GeoResultStore(str(tmp_path / "geo.db"), cell_deg=5.0)
+    store.append_many(make_geo_results(500))
+    for result in ODD_RESULTS:
+        store.append(result)
+    incremental = store.stats()
+    assert store.rebuild_stats() == 505
+    assert store.stats() == incremental
+    assert incremental["total"] == 505
+    assert sum(cell[2] for cell in incremental["heatmap"]["cells"]) == 503
+
+
+def test_unknown_risk_level_is_one_bucket(tmp_path):
+    store = GeoResultStore(str(tmp_path / "geo.db"))
+    for result in ODD_RESULTS:
+        store.append(result)
+    stats = store.stats(heatmap=False)
+    assert stats["by_risk_level"] == {"unknown": 4, "high": 1}
+    assert stats["by_biome"] == {"Unknown": 3, "9": 2}
+    assert stats["by_realm"] == {"Unknown": 4, "PA": 1}
+
+
+def test_clear_resets_stats(tmp_path):
+    store = GeoResultStore(str(tmp_path / "geo.db"))
+    store.append_many(make_geo_results(50))
+    store.clear()
+    assert store.stats() == {
+        "total": 0, "by_biome": {}, "by_realm": {}, "by_risk_level": {},
+        "heatmap": {"cell_deg": 1.0, "columns": ["lat", "lon", "count"], "cells": []},
+    }
+    assert store.rebuild_stats() == 0
+
+
+def test_legacy_json_is_migrated_once(tmp_path, caplog):
+    db_path, legacy = str(tmp_path / "geo.db"), str(tmp_path / "geo_result.json")
+    with open(legacy, "w", encoding="utf-8") as f:
+        json.dump(make_geo_results(20), f)
+    store = GeoResultStore(db_path, legacy_json_path=legacy)
+    assert store.count() == 20
+    # Новые записи в старом формате шли первыми — в журнале они последние
+    assert store.page(limit=1)[0][0] == make_geo_results(20)[0]
+    assert os.path.exists(legacy)
+    store.close()
+
+    # Перенесённый файл больше не разбирается: даже испорченный он не мешает старту
+    with open(legacy, "w", encoding="utf-8") as f:
+        f.write("{broken")
+    assert GeoResultStore(db_path, legacy_json_path=legacy).count() == 20
+    assert "Could not migrate" not in caplog.text
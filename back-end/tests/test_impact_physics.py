@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+import impact_physics
+
+# Значения посчитаны формулами, которые были в app.py до выноса физики в impact_physics.py
+# (скалярный math, по одному астероиду)
+
+CUSTOM_CASES = [
+    # (diameter, density, velocity, angle) -> (mass_kg, kinetic_energy_joules, crater_diameter,
+    #                                          ejecta_radius, dust_height, is_hazardous)
+    ((1, 1000, 11, 45), (523.5987755982989, 31677725923.697083, 14.14213562373095,
+                         16.97056274847714, 1.414213562373095, False)),
+    ((10, 1000, 11, 15), (523598.7755982989, 31677725923697.082, 51.76380902050415,
+                          62.11657082460498, 5.176380902050415, True)),
+    ((100, 3000, 17, 45), (1570796326.7948964, 2.2698006922186253e+17, 1414.2135623730949,
+                           1697.056274847714, 141.42135623730948, True)),
+    ((250, 2500, 20, 30), (20453077171.808548, 4.0906154343617096e+18, 2499.9999999999995,
+                           2999.9999999999995, 249.99999999999997, True)),
+    ((1000, 8000, 72, 90), (4188790204786.39, 1.0857344210806323e+22, 20000.0,
+                            24000.0, 2000.0, True)),
+    ((50, 1500, 30, 60), (98174770.42468102, 4.417864669110646e+16, 866.0254037844386,
+                          1039.2304845413262, 86.60254037844386, True)),
+]
+
+CATALOG_CASES = [
+    # (diameter, mass_kg, velocity) -> (kinetic_energy_joules, crater_diameter, dust_radius, dust_height)
+    ((35, 128625000, 12.5), (1.0048828125e+16, 1040.0876816848377, 1248.105218021805, 104.00876816848377)),
+    ((120, 2.7e9, 20), (5.4e+17, 2816.044661264903, 3379.2535935178835, 281.6044661264903)),
+    ((1500, 10125000000000, 25.1), (3.189425625e+21, 24687.05121904883, 29624.461462858595, 2468.705121904883)),
+    ((3, 42.0, 5), (525000000.0, 15.724647699655943, 18.86957723958713, 1.5724647699655945)),
+]
+
+# NumPy (SIMD pow/sin) может расходиться с libm на 1 ulp
+REL = 1e-12
+
+
+@pytest.mark.parametrize("inputs,expected", CUSTOM_CASES)
+def test_custom_asteroid_effects(inputs, expected):
+    diameter, density, velocity, angle = inputs
+    effects = impact_physics.impact_effects(diameter, density, velocity, angle)
+    mass, energy, crater, ejecta, dust, hazardous = expected
+    assert float(effects["mass_kg"]) == pytest.approx(mass, rel=REL)
+    assert float(effects["kinetic_energy_joules"]) == pytest.approx(energy, rel=REL)
+    assert float(effects["crater_diameter"]) == pytest.approx(crater, rel=REL)
+    assert float(effects["ejecta_radius"]) == pytest.approx(ejecta, rel=REL)
+    assert float(effects["dust_height"]) == pytest.approx(dust, rel=REL)
+    assert bool(effects["is_hazardous"]) is hazardous
+
+
+@pytest.mark.parametrize("inputs,expected", CATALOG_CASES)
+def test_catalog_asteroid_effects(inputs, expected):
+    diameter, mass, velocity = inputs
+    effects = impact_physics.impact_effects(diameter, None, velocity, 45, mass=mass,
+                                            crater_model=impact_physics.CRATER_MODEL_ENERGY)
+    energy, crater, dust_radius, dust_height = expected
+    assert float(effects["mass_kg"]) == pytest.approx(mass, rel=REL)
+    assert float(effects["kinetic_energy_joules"]) == pytest.approx(energy, rel=REL)
+    assert float(effects["crater_diameter"]) == pytest.approx(crater, rel=REL)
+    assert float(effects["ejecta_radius"]) == pytest.approx(dust_radius, rel=REL)
+    assert float(effects["dust_height"]) == pytest.approx(dust_height, rel=REL)
+
+
+def test_columns_match_scalars():
+    # Векторный вызов по всем случаям сразу даёт те же значения, что и по одному
+    inputs = np.array([case[0] for case in CUSTOM_CASES], dtype=float)
+    effects = impact_physics.impact_effects(inputs[:, 0], inputs[:, 1], inputs[:, 2], inputs[:, 3])
+    expected = np.array([case[1][:5] for case in CUSTOM_CASES])
+    columns = ("mass_kg", "kinetic_energy_joules", "crater_diameter", "ejecta_radius", "dust_height")
+    for i, name in enumerate(columns):
+        assert effects[name] == pytest.approx(expected[:, i], rel=REL)
+    assert effects["is_hazardous"].tolist() == [case[1][5] for case in CUSTOM_CASES]
+
+
+def test_unknown_crater_model():
+    with pytest.raises(ValueError):
+        impact_physics.impact_effects(10, 3000, 20, 45, crater_model="nope")
@@ -0,0 +1,78 @@
+from decimal import Decimal
+
+import pytest
+from flask import Flask, jsonify
+
+import json_stream
+
+ITEMS = [
+    {"name": "(2024 AB) Ёж", "diameter": 123.456, "hazardous": False, "date": None, "tiny": 1e-7},
+    {"name": " \"quoted\"\\", "nested": {"b": [1, 2.5, {"c": None}], "a": "z"}},
+    {"big": 2 ** 62, "neg": -0.0, "exp": 1.5e300},
+]
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.json = json_stream.FastJSONProvider(app)
+    return app
+
+
+def assert_same_as_jsonify(app, head, key, items):
+    with app.app_context():
+        expected = jsonify({**head, key: items}).get_data()
+        assert app.json.list_body(head, key, items) == expected
+
+
+@pytest.mark.parametrize("head, items", [
+    ({"count": 3}, ITEMS),
+    ({"count": 3, "nasa_count": 2, "custom_count": 1}, ITEMS * 2500),
+    ({}, ITEMS),
+    ({"count": 0}, []),
+    ({}, []),
+    # Элементы, которые orjson не сериализует: jsonify уходит в стандартный json целиком
+    ({"count": 2}, ITEMS + [{"price": Decimal("1.10")}]),
+    ({"count": 1}, ITEMS + [{"huge": 2 ** 70}]),
+    # key уже в head: порядок ключей как у словаря {**head, key: items}
+    ({"asteroids": None, "count": 1}, ITEMS),
+])
+def test_list_body_matches_jsonify(app, head, items):
+    assert_same_as_jsonify(app, head, "asteroids", items)
+
+
+def test_list_body_matches_jsonify_with_indent(app):
+    app.debug = True
+    assert_same_as_jsonify(app, {"count": 3}, "asteroids", ITEMS)
+    app.debug = False
+    app.json.compact = False
+    assert_same_as_jsonify(app, {"count": 3}, "asteroids", ITEMS)
+
+
+def test_list_body_matches_jsonify_without_orjson(app, monkeypatch):
+    monkeypatch.setattr(json_stream, "orjson", None)
+    assert_same_as_jsonify(app, {"count": 3}, "asteroids", ITEMS)
+
+
+class Reiterable:
+    # Коллекция без индексации: каждый обход — новый генератор
+    def __init__(self, items):
+        self.items = items
+        self.passes = 0
+
+    def __iter__(self):
+        self.passes += 1
+        return (dict(item) for item in self.items)
+
+
+@pytest.mark.parametrize("items, passes", [
+    (ITEMS * 10, 1),
+    # orjson не сериализует последний элемент: запасной путь обходит коллекцию заново
+    (ITEMS + [{"huge": 2 ** 70}], 2),
+])
+def test_list_body_accepts_reiterable(app, items, passes):
+    reiterable = Reiterable(items)
+    with app.app_context():
+        assert app.json.list_body({"count": len(items)}, "asteroids", reiterable) == \
+            jsonify({"count": len(items), "asteroids": items}).get_data()
+    assert reiterable.passes == passes
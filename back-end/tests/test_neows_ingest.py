@@ -0,0 +1,48 @@
+import json
+import random
+
+import neows_ingest
+from asteroid_catalog import AsteroidCatalog
+from benchmarks.bench_ingest import make_neo
+
+
+def write_jsonl(path, lines):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines))
+
+
+def test_truncated_last_jsonl_line_is_skipped_and_counted(tmp_path):
+    rng = random.Random(0)
+    neos = [make_neo(rng, i, "2025-01-01") for i in range(3)]
+    lines = [json.dumps(neo) for neo in neos]
+    # Недокачанный файл: последняя строка обрезана посередине объекта
+    lines.append(json.dumps(make_neo(rng, 3, "2025-01-01"))[:57])
+    path = str(tmp_path / "feed.jsonl")
+    write_jsonl(path, lines)
+
+    errors = {}
+    records = list(neows_ingest.iter_records(path, "2025-01-01", errors))
+    assert [r["name"] for r in records] == [neo["name"] for neo in neos]
+    assert errors["skipped"] == 1
+    assert errors["first_error"].startswith(f"{path}:4: ")
+
+
+def test_bad_lines_in_the_middle_do_not_stop_ingest(tmp_path):
+    rng = random.Random(1)
+    lines = [
+        json.dumps(make_neo(rng, 0, "2025-01-01")),
+        "{not json",
+        "",
+        json.dumps({"name": "broken", "estimated_diameter": {}}),
+        json.dumps(make_neo(rng, 1, "2025-01-01")),
+        '{"name": "cut',
+    ]
+    path = str(tmp_path / "feed.ndjson")
+    write_jsonl(path, lines)
+
+    output = str(tmp_path / "catalog")
+    summary = neows_ingest.ingest([path], output, reference_date="2025-01-01")
+    assert summary["records"] == 2
+    assert summary["skipped"] == 3
+    assert summary["first_error"].startswith(f"{path}:2: ")
+    assert len(AsteroidCatalog.load(output)) == 2
@@ -0,0 +1,39 @@
+import threading
+
+from flask import Flask
+
+import observability
+
+
+def test_profiler_profiles_one_request_at_a_time(tmp_path):
+    app = Flask(__name__)
+    profiler = observability.SlowRequestProfiler(0, str(tmp_path))
+    observability.instrument(app, observability.Registry(), profiler)
+    entered, release = threading.Event(), threading.Event()
+
+    @app.route("/slow")
+    def slow():
+        entered.set()
+        release.wait(5)
+        return "slow"
+
+    @app.route("/fast")
+    def fast():
+        return "fast"
+
+    statuses = []
+    client = app.test_client()
+    first = threading.Thread(target=lambda: statuses.append(client.get("/slow").status_code))
+    first.start()
+    assert entered.wait(5)
+    # Пока профилируется /slow, параллельные запросы обслуживаются без профиля
+    for _ in range(3):
+        statuses.append(client.get("/fast").status_code)
+    release.set()
+    first.join()
+    # Профилировщик освобождён: следующий запрос снова профилируется
+    statuses.append(client.get("/fast").status_code)
+
+    assert statuses.count(200) == 5
+    assert profiler.skipped == 3
+    assert len(list(tmp_path.glob("*.prof"))) == 2
@@ -0,0 +1,80 @@
+import gzip
+
+import pytest
+from flask import Flask
+
+from response_cache import CachedBody, ResponseCache, cached_response
+
+BODY = b'{"asteroids":[' + b",".join([b'{"name":"rock"}'] * 200) + b"]}\n"
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    cached = CachedBody(BODY)
+    plain = CachedBody(BODY, compress=False)
+    app.add_url_rule("/gz", "gz", lambda: cached_response(cached))
+    app.add_url_rule("/plain", "plain", lambda: cached_response(plain))
+    return app.test_client()
+
+
+def test_identity_response(client):
+    response = client.get("/gz")
+    assert response.status_code == 200
+    assert response.data == BODY
+    assert "Content-Encoding" not in response.headers
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert response.headers["Cache-Control"] == "no-cache"
+    assert response.get_etag() == (CachedBody(BODY).etag, False)
+
+
+def test_gzip_response(client):
+    response = client.get("/gz", headers={"Accept-Encoding": "gzip, deflate"})
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(response.data) == BODY
+    assert response.get_etag()[0].endswith("-gz")
+
+
+def test_gzip_refused_or_unavailable(client):
+    response = client.get("/gz", headers={"Accept-Encoding": "gzip;q=0, identity"})
+    assert response.data == BODY and "Content-Encoding" not in response.headers
+    response = client.get("/plain", headers={"Accept-Encoding": "gzip"})
+    assert response.data == BODY and "Content-Encoding" not in response.headers
+
+
+@pytest.mark.parametrize("encoding", ["", "gzip"])
+def test_not_modified(client, encoding):
+    # Любой из двух ETag подтверждает кэш клиента, независимо от текущего Accept-Encoding
+    etags = [client.get("/gz", headers={"Accept-Encoding": e}).get_etag()[0] for e in ("", "gzip")]
+    for etag in etags:
+        response = client.get("/gz", headers={"If-None-Match": f'"{etag}"', "Accept-Encoding": encoding})
+        assert response.status_code == 304
+        assert response.data == b""
+        assert response.get_etag()[0] == (etags[1] if encoding else etags[0])
+
+
+def test_stale_etag_gets_body(client):
+    response = client.get("/gz", headers={"If-None-Match": '"0123456789abcdef"'})
+    assert response.status_code == 200
+    assert response.data == BODY
+
+
+def test_cache_versions():
+    cache = ResponseCache()
+    builds = []
+
+    def build(value):
+        builds.append(value)
+        return value
+
+    assert cache.get("all", 1, lambda: build("v1")) == "v1"
+    assert cache.get("all", 1, lambda: build("again")) == "v1"
+    assert cache.get("all", 2, lambda: build("v2")) == "v2"
+    # Запрос, начатый до перезагрузки: ответ строится, но более новую запись не вытесняет
+    assert cache.get("all", 1, lambda: build("old")) == "old"
+    assert cache.get("all", 2, lambda: build("again")) == "v2"
+    cache.put("all", 1, "older")
+    assert cache.get("all", 2, lambda: build("again")) == "v2"
+    assert builds == ["v1", "v2", "old"]
+    assert cache.stats() == {"entries": 1, "hits": 3, "misses": 3}
@@ -0,0 +1,76 @@
+import json
+
+import numpy as np
+import pytest
+
+import impact_physics
+import scenarios
+
+
+def strict_loads(line):
+    # json.loads по умолчанию принимает NaN и Infinity, которых нет в стандарте JSON
+    def reject(constant):
+        raise ValueError(f"не JSON: {constant}")
+    return json.loads(line, parse_constant=reject)
+
+
+def grid(**overrides):
+    data = {
+        "diameter": {"min": 10, "max": 1000, "steps": 7},
+        "density": [1500, 3000, 8000],
+        "velocity": {"min": 11, "max": 70, "steps": 5},
+        "angle": [15, 45, 90],
+    }
+    data.update(overrides)
+    return scenarios.parse_axes(data)
+
+
+def test_ndjson_rows_are_valid_json():
+    axes = grid()
+    rows = [strict_loads(line) for chunk in scenarios.stream_ndjson(axes, chunk_size=50)
+            for line in chunk.splitlines()]
+    assert len(rows) == scenarios.grid_size(axes)
+    effects = impact_physics.impact_effects(rows[-1]["diameter"], rows[-1]["density"],
+                                            rows[-1]["velocity"], rows[-1]["angle"])
+    assert rows[-1]["kinetic_energy_joules"] == pytest.approx(float(effects["kinetic_energy_joules"]))
+
+
+@pytest.mark.filterwarnings("ignore::RuntimeWarning")
+def test_ndjson_overflow_is_null():
+    # Энергия переполняет float64 при огромных диаметре и скорости
+    axes = grid(diameter=[1e100], velocity=[1e110], density=[3000], angle=[45])
+    row = strict_loads(next(scenarios.stream_ndjson(axes)))
+    assert row["kinetic_energy_joules"] is None
+    assert row["mass_kg"] is not None
+
+
+def test_summary_exact_for_small_grid():
+    axes = grid()
+    result = scenarios.summarize(axes)
+    assert result["percentile_sample"] == result["count"] == scenarios.grid_size(axes)
+    values = np.concatenate([effects["crater_diameter"] for _, _, effects in scenarios.sweep_chunks(axes)])
+    stats = result["summary"]["crater_diameter"]
+    assert stats["min"] == pytest.approx(values.min())
+    assert stats["max"] == pytest.approx(values.max())
+    assert stats["mean"] == pytest.approx(values.mean())
+    assert stats["p50"] == pytest.approx(np.percentile(values, 50))
+
+
+def test_summary_samples_percentiles_for_large_grid():
+    axes = grid(diameter={"min": 10, "max": 1000, "steps": 100}, velocity={"min": 11, "max": 70, "steps": 100})
+    result = scenarios.summarize(axes, sample_size=5000)
+    assert result["percentile_sample"] == 5000
+    values = np.concatenate([effects["mass_kg"] for _, _, effects in scenarios.sweep_chunks(axes)])
+    stats = result["summary"]["mass_kg"]
+    # min, max и среднее — точные, перцентили — по выборке
+    assert stats["min"] == pytest.approx(values.min())
+    assert stats["max"] == pytest.approx(values.max())
+    assert stats["mean"] == pytest.approx(values.mean())
+    assert stats["p5"] <= stats["p50"] <= stats["p95"]
+    assert np.mean(values <= stats["p50"]) == pytest.approx(0.5, abs=0.03)
+
+
+@pytest.mark.filterwarnings("ignore::RuntimeWarning")
+def test_summary_overflow_is_null():
+    axes = grid(diameter=[1e100], velocity=[1e110], density=[3000], angle=[45])
+    assert json.dumps(scenarios.summarize(axes), allow_nan=False)
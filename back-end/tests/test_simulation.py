@@ -0,0 +1,80 @@
+import threading
+
+import shapely
+
+import simulation
+from simulation_store import SimulationJobStore
+
+
+def make_biomes(n):
+    # n полос шириной 10° по долготе от 0° на север и юг
+    return [
+        (shapely.box(i * 10, -80, i * 10 + 10, 80), f"Region {i}", str(i % 14 + 1), "PA")
+        for i in range(n)
+    ]
+
+
+def test_in_process_simulations_do_not_share_index():
+    # Две симуляции в потоках одного процесса по биомам разной длины
+    params = simulation.parse_params({"n": 40_000, "seed": 1})
+    results = {}
+    errors = []
+
+    def run(n_biomes):
+        try:
+            biomes = make_biomes(n_biomes)
+            for _ in range(5):
+                results[n_biomes] = simulation.run_simulation(biomes, params, workers=1, chunk_size=2_000)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(n,)) for n in (3, 30)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+    for n_biomes, result in results.items():
+        expected = simulation.run_simulation(make_biomes(n_biomes), params, workers=1, chunk_size=2_000)
+        assert result["biomes"] == expected["biomes"]
+        assert sum(b["count"] for b in result["biomes"]) == params["n"]
+
+
+def test_shared_pool_matches_in_process():
+    # Блоки в общем пуле дают тот же результат, что и в одном процессе; смена версии биомов
+    # пересоздаёт пул с новым индексом
+    params = simulation.parse_params({"n": 20_000, "seed": 2})
+    pool = simulation.SimulationPool(2)
+    try:
+        for version, n_biomes in ((1, 3), (2, 30)):
+            biomes = make_biomes(n_biomes)
+            pooled = simulation.run_simulation(biomes, params, workers=2, chunk_size=5_000, pool=pool,
+                                               pool_key=version)
+            expected = simulation.run_simulation(biomes, params, workers=1, chunk_size=5_000)
+            assert pooled["biomes"] == expected["biomes"]
+            assert pooled["crater_diameter"] == expected["crater_diameter"]
+    finally:
+        pool.shutdown()
+
+
+def test_job_store_lifecycle_and_purge(tmp_path):
+    db_path = str(tmp_path / "simulations.db")
+    store = SimulationJobStore(db_path)
+    store.create("a", {"n": 10})
+    store.progress("a", 1, 4)
+    # Второе соединение — другой процесс serve.py
+    other = SimulationJobStore(db_path)
+    job = other.get("a")
+    assert (job["status"], job["done_chunks"], job["total_chunks"], job["params"]) == ("running", 1, 4, {"n": 10})
+
+    store.finish("a", {"n": 10, "biomes": []})
+    store.create("b", {})
+    store.fail("b", "boom")
+    assert other.get("a")["result"] == {"n": 10, "biomes": []}
+    assert other.get("b")["error"] == "boom"
+
+    assert store.purge(3600) == 0
+    store.create("c", {})
+    assert store.purge(-1) == 2
+    assert store.get("a") is None and store.get("b") is None
+    assert store.get("c")["status"] == "running"
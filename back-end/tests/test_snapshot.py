@@ -0,0 +1,71 @@
+import json
+import multiprocessing
+import os
+import time
+
+import pytest
+
+import snapshot
+from benchmarks.synthetic import make_biomes_geojson
+
+WORKERS = 4
+
+
+@pytest.fixture
+def source(tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshot, "SNAPSHOT_DIR", str(tmp_path / ".snapshots"))
+    path = str(tmp_path / "biomes.geojson")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(make_biomes_geojson(n_features=20, vertices=50), f)
+
+    # Сборка медленная и оставляет отметку в builds.log: видно, сколько процессов её делали
+    real_load_biomes = snapshot.load_biomes
+    builds = str(tmp_path / "builds.log")
+
+    def slow_load_biomes(p):
+        with open(builds, "a") as f:
+            f.write(f"{os.getpid()}\n")
+        time.sleep(0.3)
+        return real_load_biomes(p)
+
+    monkeypatch.setattr(snapshot, "load_biomes", slow_load_biomes)
+    return path, builds
+
+
+def load_in_workers(path):
+    # Процессы через fork: подмены monkeypatch действуют и в них
+    ctx = multiprocessing.get_context("fork")
+    with ctx.Pool(WORKERS) as pool:
+        return pool.map(_load_names, [path] * WORKERS)
+
+
+def _load_names(path):
+    return [name for _, name, _, _ in snapshot.load_biomes_cached(path)]
+
+
+def leftovers():
+    return [e for e in os.listdir(snapshot.SNAPSHOT_DIR) if ".tmp-" in e]
+
+
+def test_concurrent_builds_run_once(source):
+    path, builds = source
+    results = load_in_workers(path)
+    assert all(r == results[0] for r in results) and len(results[0]) == 20
+    with open(builds) as f:
+        assert len(f.read().split()) == 1
+    assert not leftovers()
+    # Готовый снапшот читается без сборки
+    assert _load_names(path) == results[0]
+    with open(builds) as f:
+        assert len(f.read().split()) == 1
+
+
+def test_concurrent_builds_without_lock_do_not_collide(source, monkeypatch):
+    path, builds = source
+    monkeypatch.setattr(snapshot, "fcntl", None)
+    results = load_in_workers(path)
+    assert all(r == results[0] for r in results) and len(results[0]) == 20
+    assert not leftovers()
+    assert snapshot.read_biomes_snapshot(
+        snapshot._snapshot_path(path, snapshot.file_hash(path)), snapshot.file_hash(path)
+    ) is not None